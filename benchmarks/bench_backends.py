@@ -0,0 +1,91 @@
+"""
+Compare pandas and arrow pipeline backends on a synthetic multi-sample cohort.
+
+Each backend runs in its own subprocess so peak RSS is measured independently:
+
+    python benchmarks/bench_backends.py --rows 1000000 --samples 2000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+GENES = ["blaTEM-1", "blaTEM-1B", "blaCTX-M-15", "blaOXA-48", "tet(A)", "tetA", "sul1", "sul2", "qnrS1", "aac(6')-Ib"]
+CLASSES = ["beta-lactam", "Tetracycline", "sulfonamide", "fluoroquinolone", "aminoglycoside", "carbapenem"]
+COLUMNS = {
+    "amrfinder": ["Gene symbol", "% Identity to reference sequence", "% Coverage of reference sequence", "Class"],
+    "rgi": ["Best_Hit_ARO", "% Identity", "% Length of Reference Sequence", "Drug Class"],
+    "resfinder": ["Gene", "%Identity", "%Coverage", "Phenotype"],
+}
+
+
+def make_inputs(outdir: Path, rows: int, samples: int, seed: int = 0) -> dict[str, str]:
+    rng = np.random.default_rng(seed)
+    paths = {}
+    for tool, cols in COLUMNS.items():
+        df = pd.DataFrame(
+            {
+                "Name": np.char.add("S", rng.integers(0, samples, rows).astype(str)),
+                cols[0]: rng.choice(GENES, rows),
+                cols[1]: np.round(rng.uniform(70, 100, rows), 1),
+                cols[2]: np.round(rng.uniform(50, 100, rows), 1),
+                cols[3]: rng.choice(CLASSES, rows),
+            }
+        )
+        paths[tool] = str(outdir / f"{tool}.tsv")
+        df.to_csv(paths[tool], sep="\t", index=False)
+    return paths
+
+
+def run_one(backend: str, inputs: dict[str, str]) -> dict:
+    from amr_fusion_lab.pipeline import FusionPipeline
+
+    start = time.perf_counter()
+    result = FusionPipeline(min_identity=80, min_coverage=60, backend=backend).run(sample_column="Name", **inputs)
+    elapsed = time.perf_counter() - start
+    return {
+        "backend": backend,
+        "seconds": round(elapsed, 3),
+        "hits_per_second": int(len(result.hits) / elapsed),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "genes": len(result.gene_summary),
+        "timings": result.timings,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500_000, help="Rows per tool input")
+    parser.add_argument("--samples", type=int, default=1_000)
+    parser.add_argument("--backends", default="pandas,arrow")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        backend, inputs = json.loads(args.worker)
+        print(json.dumps(run_one(backend, inputs)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inputs = make_inputs(Path(tmp), args.rows, args.samples)
+        for backend in args.backends.split(","):
+            out = subprocess.run(
+                [sys.executable, __file__, "--worker", json.dumps([backend, inputs])],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            print(out.stdout.strip())
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,8 @@ from typing import Any
 import pandas as pd
 import requests
 
+from .serialization import write_json
+
 
 SYSTEM_PROMPT = (
     "You are an AMR interpretation assistant for microbiology/public-health workflows. "
@@ -220,9 +222,7 @@ def _write_ai_outputs(sample_id: str, outdir: str, ai: dict[str, Any]) -> None:
     p = Path(outdir)
     p.mkdir(parents=True, exist_ok=True)
 
-    (p / f"{sample_id}.ai_summary.json").write_text(
-        json.dumps(ai, indent=2, ensure_ascii=False), encoding="utf-8"
-    )
+    write_json(p / f"{sample_id}.ai_summary.json", ai, pretty=True)
 
     md = [f"# AI Summary - {sample_id}", "", "## Executive summary", str(ai["executive_summary"]), ""]
 
@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from .compression import detect_compression, input_delimiter, open_binary, read_head
+from .fusion import GENE_LEVELS, TOOL_RELIABILITY, build_gene_summary as _pandas_gene_summary
+from .genes import GeneIndex, default_gene_index
+from .ontology import OntologyIndex, default_index
+from .parsers import CANONICAL_COLUMNS, PARSER_COLUMNS, check_sample_ids, is_json_input
+from .registry import Detection, get_parser
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - exercised only without pyarrow
+    pa = None
+
+_DEDUPE_COLUMNS = ["sample_id", "tool", "gene", "drug_class", "identity", "coverage"]
+
+
+def require_pyarrow() -> None:
+    if pa is None:
+        raise ValueError("The arrow backend requires the 'pyarrow' package (pip install amr-fusion-lab[arrow])")
+
+
+class ArrowBackend:
+    """Pipeline stages on pyarrow Tables; results match the pandas stages column for column."""
+
+    name = "arrow"
+
+    @staticmethod
+    def parse(
+        tool: str,
+        source: str | bytes | pd.DataFrame,
+        sample_id: str | None,
+        sample_column: str | None,
+        detection: Detection | None = None,
+    ):
+        """Read one tool export straight into a canonical Arrow table (with a detection's delimiter, if given)."""
+        table = detection is not None and detection.kind == "table"
+        # JSON, DataFrame and third-party inputs go through the tool's pandas parser
+        if tool not in PARSER_COLUMNS or isinstance(source, pd.DataFrame) or (not table and is_json_input(source)):
+            df = get_parser(tool).parse_input(source, sample_id, sample_column, detection)
+            return _typed(pa.Table.from_pandas(df, preserve_index=False))
+
+        compression = detect_compression(source)
+        if table and detection.delimiter:
+            delimiter = detection.delimiter
+        else:
+            delimiter = input_delimiter(source, lambda: read_head(source, compression=compression))
+        options = dict(
+            parse_options=pacsv.ParseOptions(delimiter=delimiter),
+            convert_options=pacsv.ConvertOptions(strings_can_be_null=True),
+        )
+        if compression is None and isinstance(source, str):
+            # plain str: library-side caches must not keep a SpooledInput (and its temp file) alive
+            raw = pacsv.read_csv(str(source), **options)
+        else:
+            with open_binary(source, compression) as fh:
+                raw = pacsv.read_csv(fh, **options)
+        return _canonical_table(raw, tool, sample_id, sample_column, detection.columns if table else None)
+
+    @staticmethod
+    def concat(tables: list) -> Any:
+        return pa.concat_tables(tables, promote_options="permissive")
+
+    @staticmethod
+    def filter(table, min_identity: float, min_coverage: float, deduplicate: bool):
+        """Arrow counterpart of quality.normalize_and_filter_hits."""
+        for col in ("identity", "coverage"):
+            table = table.set_column(table.schema.get_field_index(col), col, _to_float(table[col]))
+
+        mask = None
+        for col, threshold in (("identity", min_identity), ("coverage", min_coverage)):
+            if threshold > 0:
+                keep = pc.or_kleene(pc.is_null(table[col]), pc.greater_equal(table[col], threshold))
+                mask = keep if mask is None else pc.and_kleene(mask, keep)
+        if mask is not None:
+            table = table.filter(pc.fill_null(mask, False))
+
+        if deduplicate and table.num_rows:
+            cols = [c for c in _DEDUPE_COLUMNS if c in table.column_names]
+            rows = table.append_column("_row", pa.array(np.arange(table.num_rows)))
+            first = rows.group_by(cols, use_threads=False).aggregate([("_row", "min")])["_row_min"]
+            table = table.take(np.sort(first.to_numpy()))
+        return table
+
+    @staticmethod
+    def harmonize(table, ontology: OntologyIndex | None, genes: GeneIndex | None):
+        """Arrow counterpart of harmonize_drug_classes followed by canonicalize_genes."""
+        ontology = ontology or default_index()
+        genes = genes or default_gene_index()
+
+        (normalized,) = _map_distinct(table["drug_class"], lambda v: (ontology.normalize(v),))
+        table = table.append_column("drug_class_normalized", normalized)
+        if ontology.parents:
+            (parent,) = _map_distinct(normalized, lambda v: (ontology.roots.get(v, v),))
+            table = table.append_column("drug_class_parent", parent)
+
+        canonical, family = _map_distinct(table["gene"], genes.resolve, width=2)
+        return table.append_column("gene_canonical", canonical).append_column("gene_family", family)
+
+    @staticmethod
+    def score(table):
+        """Arrow counterpart of scoring.score_hits."""
+        ident, cov = table["identity"], table["coverage"]
+        i_score, i_reason = _banded(ident, [(95, 0.5, "identity>=95"), (90, 0.35, "identity>=90")], "identity<90")
+        c_score, c_reason = _banded(cov, [(90, 0.5, "coverage>=90"), (70, 0.3, "coverage>=70")], "coverage<70")
+
+        score = pc.add(i_score, c_score)
+        confidence = pc.if_else(
+            pc.greater_equal(score, 0.85), "high", pc.if_else(pc.greater_equal(score, 0.6), "medium", "low")
+        )
+        rationale = pc.coalesce(
+            pc.binary_join_element_wise(i_reason, c_reason, "; "), i_reason, c_reason, "insufficient metrics"
+        )
+        return (
+            table.append_column("confidence_score", pc.round(score, 3))
+            .append_column("confidence", confidence)
+            .append_column("rationale", rationale)
+        )
+
+    @staticmethod
+    def fuse(table, level: str = "gene"):
+        """Arrow counterpart of fusion.build_gene_summary."""
+        if level not in GENE_LEVELS:
+            raise ValueError(f"Unsupported gene level: {level}. Use one of: {', '.join(GENE_LEVELS)}")
+        if table.num_rows == 0:
+            return pa.Table.from_pandas(_pandas_gene_summary(pd.DataFrame()), preserve_index=False)
+
+        key = GENE_LEVELS[level]
+        table = table.sort_by([("sample_id", "ascending"), (key, "ascending")])
+        gid = _group_ids(table["sample_id"], table[key])
+        n_groups = int(gid[-1].as_py()) + 1
+
+        reliability = pc.fill_null(
+            pc.take(pa.array(list(TOOL_RELIABILITY.values())), pc.index_in(table["tool"], pa.array(list(TOOL_RELIABILITY)))),
+            0.85,
+        )
+        weighted = pc.multiply(pc.fill_null(table["confidence_score"], 0.0), reliability)
+        work = pa.table(
+            {
+                "_gid": gid,
+                "sample_id": table["sample_id"],
+                "gene": table[key],
+                "identity": table["identity"],
+                "coverage": table["coverage"],
+                "confidence_score": table["confidence_score"],
+                "weighted": weighted,
+            }
+        )
+        # groups arrive in sorted (sample_id, key) order because the table is sorted and threads are off
+        agg = work.group_by("_gid", use_threads=False).aggregate(
+            [
+                ("sample_id", "first"),
+                ("gene", "first"),
+                ("identity", "max"),
+                ("coverage", "max"),
+                ("confidence_score", "max"),
+                ("weighted", "max"),
+            ]
+        )
+
+        tools = _joined_sets(gid, table["tool"], n_groups)
+        columns = {
+            "sample_id": agg["sample_id_first"],
+            "gene": agg["gene_first"],
+            "tools_detected": tools,
+            "tool_count": _distinct_counts(gid, table["tool"], n_groups),
+            "normalized_drug_classes": _joined_sets(gid, table["drug_class_normalized"], n_groups),
+            "best_identity": agg["identity_max"],
+            "best_coverage": agg["coverage_max"],
+            "max_confidence_score": agg["confidence_score_max"],
+            "weighted_consensus_score": agg["weighted_max"],
+        }
+        if key != "gene":
+            columns["gene_variants"] = _joined_sets(gid, table["gene"], n_groups)
+
+        best = agg["weighted_max"]
+        columns["consensus_level"] = pc.if_else(pc.greater_equal(columns["tool_count"], 2), "multi-tool", "single-tool")
+        columns["consensus_tier"] = pc.if_else(
+            pc.greater_equal(best, 0.90),
+            "very-high",
+            pc.if_else(pc.greater_equal(best, 0.75), "high", pc.if_else(pc.greater_equal(best, 0.55), "moderate", "low")),
+        )
+        columns["weighted_consensus_score"] = pc.round(best, 3)
+        return pa.table(columns)
+
+    @staticmethod
+    def disagreements(summary):
+        if summary.num_rows == 0:
+            return summary
+        return summary.filter(pc.equal(summary["tool_count"], 1))
+
+    @staticmethod
+    def to_pandas(table) -> pd.DataFrame:
+        return table.to_pandas()
+
+    @staticmethod
+    def sample_ids(table) -> list[str]:
+        return [str(s) for s in pc.unique(table["sample_id"]).to_pylist()]
+
+
+def write_parquet(table, path: str | Path) -> None:
+    """Write an Arrow table to Parquet without a pandas round-trip."""
+    pq.write_table(table, str(path))
+
+
+def split_table_by_sample(table) -> dict[str, Any]:
+    """
+    Per-sample tables, keeping each sample's original row order.
+
+    When every sample's rows are contiguous (fused and single-tool tables) the
+    parts are zero-copy slices; otherwise the table is first regrouped with a
+    stable sort, which copies it once.
+    """
+    if table.num_rows == 0:
+        return {}
+    samples = table["sample_id"].to_numpy(zero_copy_only=False).astype(str)
+    starts = np.flatnonzero(np.r_[True, samples[1:] != samples[:-1]])
+    if len(np.unique(samples[starts])) < len(starts):
+        order = pc.sort_indices(table, sort_keys=[("sample_id", "ascending")])
+        table = table.take(order)
+        samples = samples[order.to_numpy()]
+        starts = np.flatnonzero(np.r_[True, samples[1:] != samples[:-1]])
+    ends = np.r_[starts[1:], len(samples)]
+    return {samples[s]: table.slice(s, e - s) for s, e in zip(starts, ends)}
+
+
+def _canonical_table(
+    raw, tool: str, sample_id: str | None, sample_column: str | None, mapping: dict[str, str] | None = None
+):
+    """Canonical columns picked as parsers._canonicalize does: the first header column of each alias (or ``mapping``)."""
+    if sample_column is not None and sample_column not in raw.column_names:
+        raise ValueError(f"Sample column '{sample_column}' not found in input columns: {raw.column_names}")
+
+    if mapping is None:
+        mapping = get_parser(tool).column_map(tuple(c for c in raw.column_names if c != sample_column))
+    columns = {canonical: raw[col] for canonical, col in mapping.items() if col != sample_column and col in raw.column_names}
+    n = raw.num_rows
+    out = {c: columns.get(c, pa.nulls(n)) for c in CANONICAL_COLUMNS}
+
+    if tool == "rgi":
+        # RGI Best_Hit_ARO may look like 'ARO:3000001|blaTEM-1'
+        out["gene"] = pc.replace_substring_regex(out["gene"].cast(pa.string()), r"^.*\|", "")
+
+    if sample_column is not None:
+        out["sample_id"] = raw[sample_column].cast(pa.string())
+        check_sample_ids(pc.unique(out["sample_id"]).to_pylist())
+    elif sample_id is None:
+        raise ValueError("Provide either sample_id or sample_column")
+    else:
+        check_sample_ids([sample_id])
+        out["sample_id"] = pa.repeat(pa.scalar(sample_id, pa.string()), n)
+    out["tool"] = pa.repeat(pa.scalar(tool, pa.string()), n)
+    return _typed(pa.table(out))
+
+
+def _typed(table):
+    """Give all-null columns concrete types so tables from different inputs concatenate."""
+    types = {"gene": pa.string(), "drug_class": pa.string(), "sample_id": pa.string(), "tool": pa.string()}
+    for col, typ in types.items():
+        if col in table.column_names and not table.schema.field(col).type.equals(typ):
+            table = table.set_column(table.schema.get_field_index(col), col, table[col].cast(typ))
+    for col in ("identity", "coverage"):
+        if col in table.column_names:
+            table = table.set_column(table.schema.get_field_index(col), col, _to_float(table[col]))
+    return table
+
+
+def _to_float(column):
+    """pd.to_numeric(errors='coerce') semantics: unparseable values become null."""
+    if pa.types.is_floating(column.type):
+        return column.cast(pa.float64())
+    try:
+        return column.cast(pa.float64())
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        values = pd.to_numeric(pd.Series(column.to_pylist(), dtype=object), errors="coerce")
+        return pa.chunked_array([pa.array(values.to_numpy(dtype=float), from_pandas=True)])
+
+
+def _map_distinct(column, resolve, width: int = 1) -> list:
+    """Resolve each distinct non-null value once (resolve returns a ``width``-tuple) and broadcast back by dictionary index."""
+    encoded = pc.dictionary_encode(column.combine_chunks())
+    resolved = [resolve(v) for v in encoded.dictionary.to_pylist()]
+    return [pc.take(pa.array([r[i] for r in resolved], type=pa.string()), encoded.indices) for i in range(width)]
+
+
+def _banded(values, bands: list[tuple[float, float, str]], below: str):
+    """Score and rationale for the first band whose threshold the value reaches; null values add nothing."""
+    score = pa.scalar(0.0)
+    reason = pa.scalar(below)
+    for threshold, points, label in reversed(bands):
+        hit = pc.greater_equal(values, threshold)
+        score = pc.if_else(hit, points, score)
+        reason = pc.if_else(hit, label, reason)
+    return pc.fill_null(score, 0.0), reason
+
+
+def _group_ids(*keys) -> Any:
+    """Dense group id per row of a table sorted on ``keys``; nulls compare equal to each other."""
+    n = len(keys[0])
+    changed = np.zeros(n, dtype=bool)
+    changed[0] = True
+    for key in keys:
+        cur, prev = key.slice(1), key.slice(0, n - 1)
+        same_null = pc.and_(pc.is_null(cur), pc.is_null(prev))
+        differs = pc.if_else(same_null, False, pc.fill_null(pc.not_equal(cur, prev), True))
+        changed[1:] |= differs.to_numpy(zero_copy_only=False)
+    return pa.array(np.cumsum(changed) - 1)
+
+
+def _distinct_pairs(gid, values):
+    pairs = pa.table({"_gid": gid, "value": values})
+    pairs = pairs.filter(pc.is_valid(pairs["value"])).group_by(["_gid", "value"], use_threads=False).aggregate([])
+    return pairs.sort_by([("_gid", "ascending"), ("value", "ascending")])
+
+
+def _joined_sets(gid, values, n_groups: int):
+    """','-joined sorted distinct non-null values per group ('' for groups with none)."""
+    pairs = _distinct_pairs(gid, values.cast(pa.string()))
+    lists = pairs.group_by("_gid", use_threads=False).aggregate([("value", "list")])
+    joined = pc.binary_join(lists["value_list"], ",").to_numpy(zero_copy_only=False)
+    out = np.full(n_groups, "", dtype=object)
+    out[lists["_gid"].to_numpy()] = joined
+    return pa.array(out, type=pa.string())
+
+
+def _distinct_counts(gid, values, n_groups: int):
+    pairs = _distinct_pairs(gid, values)
+    counts = np.bincount(pairs["_gid"].to_numpy(), minlength=n_groups)
+    return pa.array(counts.astype(np.int64))
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Callable
+
+import pandas as pd
+
+from . import __version__
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - exercised only without pyarrow
+    pa = None
+
+# Bump when a stage's output layout or results change so old snapshots are never reused
+CHECKPOINT_VERSION = 2
+
+
+def file_fingerprint(path: str | None) -> list[Any] | None:
+    """Cheap identity of an input file: resolved path, size and mtime."""
+    if not path:
+        return None
+    p = Path(path)
+    try:
+        st = p.stat()
+    except OSError:
+        return [str(p), None, None]
+    return [str(p.resolve()), st.st_size, st.st_mtime_ns]
+
+
+def stage_key(*parts: Any) -> str:
+    """Hash of a stage's upstream key and parameters."""
+    payload = json.dumps([CHECKPOINT_VERSION, __version__, *parts], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class StageCache:
+    """
+    Per-stage table snapshots (DataFrames or Arrow tables) keyed by each stage's inputs and parameters.
+
+    Stage keys are chained (each includes its upstream key), so changing a
+    parameter invalidates that stage and everything downstream while earlier
+    snapshots stay valid. Stages are resolved lazily from the last one
+    requested: a reused snapshot means no upstream stage is loaded or run.
+    With no directory configured every stage is simply computed. DataFrames
+    are pickled; Arrow tables are written as Arrow IPC files and memory-mapped
+    when reused.
+    """
+
+    def __init__(self, directory: str | None = None):
+        self.directory = Path(directory) if directory else None
+        self.stages: dict[str, str] = {}
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def stage(self, name: str, key: str, compute: Callable[[], Any]) -> Any:
+        path = self._path(name, key)
+        if path is not None:
+            df = _load_snapshot(path)
+            if df is not None:
+                self.stages[name] = "reused"
+                return df
+
+        df = compute()
+        if path is not None:
+            _store_snapshot(path, df)
+        self.stages[name] = "computed"
+        return df
+
+    def report(self, names: list[str]) -> dict[str, str]:
+        """Status for every pipeline stage; stages never consulted were skipped via a downstream reuse."""
+        return {n: self.stages.get(n, "skipped") for n in names}
+
+    def _path(self, name: str, key: str) -> Path | None:
+        if self.directory is None:
+            return None
+        # suffix-less stem; the snapshot file adds .arrow or .pkl for its format
+        return self.directory / f"{name}-{key[:24]}"
+
+
+def _load_snapshot(stem: Path) -> Any:
+    arrow_path = stem.with_name(stem.name + ".arrow")
+    if pa is not None and arrow_path.exists():
+        try:
+            with pa.memory_map(str(arrow_path)) as source:
+                return pa.ipc.open_file(source).read_all()
+        except (OSError, pa.ArrowInvalid):
+            pass
+    pickle_path = stem.with_name(stem.name + ".pkl")
+    if pickle_path.exists():
+        try:
+            return pd.read_pickle(pickle_path)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            pass
+    return None
+
+
+def _store_snapshot(stem: Path, df: Any) -> None:
+    arrow = pa is not None and isinstance(df, pa.Table)
+    path = stem.with_name(stem.name + (".arrow" if arrow else ".pkl"))
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    if arrow:
+        with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, df.schema) as writer:
+            writer.write_table(df)
+    else:
+        pd.to_pickle(df, tmp)
+    os.replace(tmp, path)
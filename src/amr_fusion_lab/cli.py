@@ -1,24 +1,35 @@
 from __future__ import annotations
 
+import os
+from pathlib import Path
+
 import pandas as pd
 import typer
 from rich import print
 
 from .parsers import parse_resfinder, parse_amrfinder, parse_rgi
-from .scoring import score_hits
-from .fusion import build_gene_summary, build_disagreement_table
+from .fusion import GENE_LEVELS
+from .genes import canonicalize_genes, load_gene_index, GeneIndexError
 from .quality import normalize_and_filter_hits
-from .ontology import harmonize_drug_classes
-from .reporting import write_outputs
-from .validation import validate_canonical_hits
-from .config import load_config, write_default_config, ConfigError
+from .pipeline import FusionPipeline, ValidationFailed
+from .serialization import JSON_FORMATS
+from .compression import check_output_compression
+from .config import load_config, load_sample_sheet, write_default_config, ConfigError, INPUT_TOOLS
 from .ai_summary import generate_ai_summary
+from .dashboard import build_cohort_dashboard
+from .outofcore import fuse_out_of_core
+from .diff import diff_results, write_diff
+from .rerender import rerender_reports
+from .sweep import parse_grid, threshold_sweep
+from .preflight import preflight_inputs, preflight_frame, InputCheck
+from .registry import Detection, discover_inputs
+from .workqueue import WorkQueue, default_worker_id, run_worker, HEARTBEAT_SECONDS, STALE_AFTER_SECONDS
 
 app = typer.Typer(help="AMR Fusion Lab CLI")
 
 
 def _execute_run(
-    sample_id: str,
+    sample_id: str | None,
     outdir: str,
     resfinder: str | None = None,
     amrfinder: str | None = None,
@@ -32,89 +43,190 @@ def _execute_run(
     min_coverage: float = 0.0,
     deduplicate: bool = True,
     strict_validation: bool = False,
+    sample_column: str | None = None,
+    ontology: list[str] | None = None,
+    gene_level: str = "gene",
+    gene_aliases: str | None = None,
+    json_format: str = "json",
+    json_pretty: bool = True,
+    checkpoint_dir: str | None = None,
+    preflight: bool = True,
+    backend: str = "pandas",
+    compress: str = "none",
+    compress_level: int | None = None,
+    inputs: list[str] | None = None,
+    pdf: bool = True,
+    pdf_workers: int | None = None,
 ) -> None:
-    frames: list[pd.DataFrame] = []
+    if not sample_id and not sample_column:
+        raise typer.BadParameter("Provide --sample-id, or --sample-column for multi-sample inputs")
 
-    if resfinder:
-        frames.append(parse_resfinder(resfinder, sample_id))
-    if amrfinder:
-        frames.append(parse_amrfinder(amrfinder, sample_id))
-    if rgi:
-        frames.append(parse_rgi(rgi, sample_id))
-
-    if not frames:
-        raise typer.BadParameter("Provide at least one input: --resfinder, --amrfinder, or --rgi")
+    if not (resfinder or amrfinder or rgi or inputs):
+        raise typer.BadParameter("Provide at least one input: --resfinder, --amrfinder, --rgi, or --input")
 
     if min_identity < 0 or min_identity > 100:
         raise typer.BadParameter("--min-identity must be between 0 and 100")
     if min_coverage < 0 or min_coverage > 100:
         raise typer.BadParameter("--min-coverage must be between 0 and 100")
+    if gene_level not in GENE_LEVELS:
+        raise typer.BadParameter(f"--gene-level must be one of: {', '.join(GENE_LEVELS)}")
+    if json_format not in JSON_FORMATS:
+        raise typer.BadParameter(f"--json-format must be one of: {', '.join(JSON_FORMATS)}")
+    try:
+        check_output_compression(compress, compress_level)
+    except ValueError as e:
+        raise typer.BadParameter(str(e)) from e
 
-    fused = pd.concat(frames, ignore_index=True)
-    fused = normalize_and_filter_hits(
-        fused,
-        min_identity=min_identity,
-        min_coverage=min_coverage,
-        deduplicate=deduplicate,
-    )
-    fused = harmonize_drug_classes(fused)
+    try:
+        detected = _detected_inputs(inputs)
+    except ValueError as e:
+        raise typer.BadParameter(str(e)) from e
+    if not (resfinder or amrfinder or rgi or detected):
+        raise typer.BadParameter("No recognised tool outputs in --input")
 
-    validation_messages = validate_canonical_hits(fused, strict=strict_validation)
-    for msg in validation_messages:
-        if msg.startswith("WARN:"):
-            print(f"[yellow]{msg}[/yellow]")
-        elif msg.startswith("ERROR:"):
-            raise typer.BadParameter(msg)
-
-    scored = score_hits(fused)
-    gene_summary = build_gene_summary(scored)
-    disagreements = build_disagreement_table(gene_summary)
-
-    run_meta = {
-        "quality_filters": {
-            "min_identity": min_identity,
-            "min_coverage": min_coverage,
-            "deduplicate": deduplicate,
-            "strict_validation": strict_validation,
-        },
-        "validation_messages": validation_messages,
-        "ai": {
-            "enabled": ai_enable,
-            "provider": ai_provider,
-            "model": ai_model,
-        },
-    }
-
-    write_outputs(
-        scored,
-        outdir=outdir,
-        sample_id=sample_id,
-        gene_summary=gene_summary,
-        disagreements=disagreements,
-        run_meta=run_meta,
-    )
+    if preflight:
+        named = _tool_inputs(resfinder, amrfinder, rgi)
+        entries = [(sample_id, tool, path) for tool, path in named + _input_pairs(detected)]
+        checks = preflight_inputs(entries, sample_column=sample_column)
+        _report_preflight(checks, fail=True)
+        # reuse the preflight's header read for 'auto' files instead of detecting them again
+        detected = [
+            (check.detection() or item) if isinstance(item, str) else item
+            for item, check in zip(detected, checks[len(named) :])
+        ]
 
-    if ai_enable:
-        ai = generate_ai_summary(
+    try:
+        pipeline = FusionPipeline(
+            min_identity=min_identity,
+            min_coverage=min_coverage,
+            deduplicate=deduplicate,
+            strict_validation=strict_validation,
+            ontology=ontology,
+            gene_level=gene_level,
+            gene_aliases=gene_aliases,
+            checkpoint_dir=checkpoint_dir,
+            backend=backend,
+        )
+        result = pipeline.run(
             sample_id=sample_id,
-            scored_df=scored,
-            gene_summary_df=gene_summary,
-            disagreements_df=disagreements,
-            outdir=outdir,
-            model=ai_model,
-            provider=ai_provider,
-            api_base=ai_api_base,
-            api_key=ai_api_key,
+            resfinder=resfinder,
+            amrfinder=amrfinder,
+            rgi=rgi,
+            sample_column=sample_column,
+            inputs=detected,
         )
-        print("[cyan]AI summary generated[/cyan]")
-        print(f"[dim]{ai.get('executive_summary', '')}[/dim]")
+    except ValidationFailed as e:
+        _print_warnings(e.messages)
+        raise typer.BadParameter(str(e)) from e
+    except ValueError as e:
+        raise typer.BadParameter(str(e)) from e
+    _print_warnings(result.validation_messages)
+
+    ai_meta = {"ai": {"enabled": ai_enable, "provider": ai_provider, "model": ai_model}}
+    written = result.write(
+        outdir,
+        json_format=json_format,
+        json_pretty=json_pretty,
+        run_meta=ai_meta,
+        compression=compress,
+        compression_level=compress_level,
+        pdf=pdf,
+        # the library renders in-process by default; the CLI spreads the PDF stage over every CPU
+        pdf_workers=pdf_workers or os.cpu_count(),
+    )
 
+    if ai_enable:
+        parts = result.split()
+        for sid, sample_outdir in written.items():
+            part = parts[sid]
+            ai = generate_ai_summary(
+                sample_id=sid,
+                scored_df=part.hits,
+                gene_summary_df=part.gene_summary,
+                disagreements_df=part.disagreements,
+                outdir=sample_outdir,
+                model=ai_model,
+                provider=ai_provider,
+                api_base=ai_api_base,
+                api_key=ai_api_key,
+            )
+            print(f"[cyan]AI summary generated[/cyan] ({sid})")
+            print(f"[dim]{ai.get('executive_summary', '')}[/dim]")
+
+    if sample_column is not None:
+        print(f"[green]Processed {len(written)} samples[/green] from column [bold]{sample_column}[/bold]")
     print(f"[green]Done[/green] -> outputs written to [bold]{outdir}[/bold]")
 
 
+def _print_warnings(messages: list[str]) -> None:
+    for msg in messages:
+        if msg.startswith("WARN:"):
+            print(f"[yellow]{msg}[/yellow]")
+
+
+def _tool_inputs(resfinder: str | None, amrfinder: str | None, rgi: str | None) -> list[tuple[str, str]]:
+    return [(tool, path) for tool, path in zip(INPUT_TOOLS, (resfinder, amrfinder, rgi)) if path]
+
+
+def _detected_inputs(paths: list[str] | None) -> list[Detection | str]:
+    """Detections for --input directory entries and plain paths for files, which are detected once later; unrecognised entries skipped."""
+    items: list[Detection | str] = []
+    for raw in paths or []:
+        if not Path(raw).is_dir():
+            items.append(raw)
+            continue
+        detections, skipped = discover_inputs([raw])
+        items.extend(detections)
+        for path in skipped:
+            print(f"[yellow]WARN: skipping unrecognised file {path}[/yellow]")
+    return items
+
+
+def _input_pairs(items: list[Detection | str]) -> list[tuple[str, str]]:
+    """(tool, path) for preflight; undetected files are checked as 'auto'."""
+    return [("auto", item) if isinstance(item, str) else (item.tool, item.source) for item in items]
+
+
+def _report_preflight(checks: list[InputCheck], fail: bool, limit: int = 20) -> int:
+    """Print preflight problems; returns the number of failing inputs (or raises when ``fail``)."""
+    problems = [c for c in checks if c.messages]
+    for c in problems[:limit]:
+        label = f"{c.sample_id}/{c.tool}" if c.sample_id else c.tool
+        for msg in c.messages:
+            color = "red" if msg.startswith("ERROR:") else "yellow"
+            print(f"[{color}]{msg}[/{color}] ({label}: {c.path})")
+    if len(problems) > limit:
+        print(f"[dim]... {len(problems) - limit} more inputs with problems[/dim]")
+
+    errors = sum(not c.ok for c in checks)
+    if errors and fail:
+        raise typer.BadParameter(f"Preflight failed for {errors} input(s); fix them or pass --no-preflight")
+    return errors
+
+
+def _parse_inputs(
+    sample_id: str | None,
+    sample_column: str | None,
+    resfinder: str | None,
+    amrfinder: str | None,
+    rgi: str | None,
+) -> pd.DataFrame:
+    frames: list[pd.DataFrame] = []
+    try:
+        if resfinder:
+            frames.append(parse_resfinder(resfinder, sample_id, sample_column=sample_column))
+        if amrfinder:
+            frames.append(parse_amrfinder(amrfinder, sample_id, sample_column=sample_column))
+        if rgi:
+            frames.append(parse_rgi(rgi, sample_id, sample_column=sample_column))
+    except ValueError as e:
+        raise typer.BadParameter(str(e)) from e
+    return pd.concat(frames, ignore_index=True)
+
+
 @app.command()
 def run(
-    sample_id: str = typer.Option(..., help="Sample identifier"),
+    sample_id: str | None = typer.Option(None, help="Sample identifier (single-sample inputs)"),
     outdir: str = typer.Option("outputs", help="Output directory"),
     resfinder: str | None = typer.Option(None, help="Path to ResFinder output (tsv/csv)"),
     amrfinder: str | None = typer.Option(None, help="Path to AMRFinder output (tsv/csv)"),
@@ -131,6 +243,35 @@ def run(
     min_coverage: float = typer.Option(0.0, help="Minimum coverage threshold (0-100)"),
     deduplicate: bool = typer.Option(True, help="Drop duplicate tool-level hits"),
     strict_validation: bool = typer.Option(False, help="Treat validation warnings as errors"),
+    sample_column: str | None = typer.Option(
+        None,
+        help="Input column holding sample IDs (e.g. Name) for multi-sample tables; outputs go to OUTDIR/<sample>",
+    ),
+    ontology: list[str] | None = typer.Option(
+        None,
+        help="Drug-class ontology file (.obo/.json/.tsv); repeat to layer lab synonyms over CARD",
+    ),
+    gene_level: str = typer.Option("gene", help="Fusion level: gene | allele | family"),
+    gene_aliases: str | None = typer.Option(None, help="Gene alias mapping file (alias, canonical, family)"),
+    json_format: str = typer.Option("json", help="Record output format: json | ndjson"),
+    json_pretty: bool = typer.Option(True, "--json-pretty/--json-compact", help="Indent JSON array outputs"),
+    checkpoint_dir: str | None = typer.Option(
+        None,
+        help="Directory for per-stage snapshots; reruns resume from the first stage whose inputs changed",
+    ),
+    preflight: bool = typer.Option(True, help="Check input headers before parsing"),
+    backend: str = typer.Option("pandas", help="Compute backend: pandas | arrow (requires pyarrow; adds Parquet outputs)"),
+    compress: str = typer.Option("none", help="Compress CSV/JSON outputs: none | gzip | xz | zstd"),
+    compress_level: int | None = typer.Option(None, help="Compression level (gzip 1-9, xz 0-9, zstd 1-22)"),
+    inputs: list[str] | None = typer.Option(
+        None,
+        "--input",
+        help="Tool output or directory of outputs; the tool is detected from the header (repeatable)",
+    ),
+    pdf: bool = typer.Option(True, help="Render PDF reports (requires reportlab)"),
+    pdf_workers: int | None = typer.Option(
+        None, help="Processes for the batched PDF stage of multi-sample runs (default: CPU count)"
+    ),
 ):
     """Fuse AMR hits from supported tools and generate report files."""
     _execute_run(
@@ -148,6 +289,20 @@ def run(
         min_coverage=min_coverage,
         deduplicate=deduplicate,
         strict_validation=strict_validation,
+        sample_column=sample_column,
+        ontology=ontology,
+        gene_level=gene_level,
+        gene_aliases=gene_aliases,
+        json_format=json_format,
+        json_pretty=json_pretty,
+        checkpoint_dir=checkpoint_dir,
+        preflight=preflight,
+        backend=backend,
+        compress=compress,
+        compress_level=compress_level,
+        inputs=inputs,
+        pdf=pdf,
+        pdf_workers=pdf_workers,
     )
 
 
@@ -162,7 +317,7 @@ def run_config(
         raise typer.BadParameter(str(e)) from e
 
     _execute_run(
-        sample_id=cfg["sample_id"],
+        sample_id=cfg.get("sample_id"),
         outdir=cfg["outdir"],
         resfinder=cfg.get("resfinder"),
         amrfinder=cfg.get("amrfinder"),
@@ -176,7 +331,322 @@ def run_config(
         min_coverage=float(cfg.get("min_coverage", 0.0)),
         deduplicate=bool(cfg.get("deduplicate", True)),
         strict_validation=bool(cfg.get("strict_validation", False)),
+        sample_column=cfg.get("sample_column"),
+        ontology=_as_list(cfg.get("ontology")),
+        gene_level=cfg.get("gene_level", "gene"),
+        gene_aliases=cfg.get("gene_aliases"),
+        json_format=cfg.get("json_format", "json"),
+        json_pretty=bool(cfg.get("json_pretty", True)),
+        checkpoint_dir=cfg.get("checkpoint_dir"),
+        preflight=bool(cfg.get("preflight", True)),
+        backend=cfg.get("backend", "pandas"),
+        compress=cfg.get("compress", "none"),
+        compress_level=cfg.get("compress_level"),
+        inputs=_as_list(cfg.get("inputs")),
+        pdf=bool(cfg.get("pdf", True)),
+        pdf_workers=cfg.get("pdf_workers"),
+    )
+
+
+def _as_list(value) -> list[str] | None:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return [value]
+    return [str(v) for v in value]
+
+
+@app.command("preflight")
+def preflight_cmd(
+    config: list[str] | None = typer.Option(None, "--config", help="YAML run config to check (repeatable)"),
+    sample_sheet: list[str] | None = typer.Option(
+        None, help="TSV/CSV sample sheet with sample_id and resfinder/amrfinder/rgi (or inputs) path columns (repeatable)"
+    ),
+    sample_id: str | None = typer.Option(None, help="Sample identifier for --resfinder/--amrfinder/--rgi"),
+    sample_column: str | None = typer.Option(None, help="Sample ID column expected in every input header"),
+    resfinder: str | None = typer.Option(None, help="Path to ResFinder output (tsv/csv)"),
+    amrfinder: str | None = typer.Option(None, help="Path to AMRFinder output (tsv/csv)"),
+    rgi: str | None = typer.Option(None, help="Path to RGI output (tsv/csv)"),
+    inputs: list[str] | None = typer.Option(None, "--input", help="Tool output or directory; tool detected from the header"),
+    workers: int | None = typer.Option(None, help="Threads used to read file headers"),
+    report: str | None = typer.Option(None, help="Write a per-input CSV report here"),
+):
+    """Check every input's existence, compression, delimiter and header mapping without parsing it."""
+    # sample column -> (sample_id, tool, path); inputs sharing a sample column are checked together
+    groups: dict[str | None, list[tuple[str | None, str, str]]] = {}
+    try:
+        for path in config or []:
+            cfg = load_config(path)
+            entries = groups.setdefault(cfg.get("sample_column"), [])
+            entries.extend(
+                (cfg.get("sample_id"), tool, p)
+                for tool, p in _tool_inputs(*(cfg.get(t) for t in INPUT_TOOLS)) + _input_pairs(_detected_inputs(_as_list(cfg.get("inputs"))))
+            )
+        for path in sample_sheet or []:
+            entries = groups.setdefault(sample_column, [])
+            for row in load_sample_sheet(path):
+                entries.extend(
+                    (row["sample_id"], tool, p)
+                    for tool, p in _tool_inputs(*(row.get(t) for t in INPUT_TOOLS)) + _input_pairs(_detected_inputs(_as_list(row.get("inputs"))))
+                )
+        groups.setdefault(sample_column, []).extend(
+            (sample_id, tool, p) for tool, p in _tool_inputs(resfinder, amrfinder, rgi) + _input_pairs(_detected_inputs(inputs))
+        )
+    except ValueError as e:
+        raise typer.BadParameter(str(e)) from e
+
+    checks: list[InputCheck] = []
+    for column, entries in groups.items():
+        checks.extend(preflight_inputs(entries, sample_column=column, max_workers=workers))
+    if not checks:
+        raise typer.BadParameter("Nothing to check: pass --config, --sample-sheet or tool inputs")
+
+    if report:
+        Path(report).parent.mkdir(parents=True, exist_ok=True)
+        preflight_frame(checks).to_csv(report, index=False)
+    errors = _report_preflight(checks, fail=False)
+    warned = sum(c.ok and bool(c.messages) for c in checks)
+    print(f"Checked {len(checks)} inputs: {len(checks) - errors - warned} ok, {warned} with warnings, {errors} failing")
+    if errors:
+        raise typer.Exit(code=1)
+    print("[green]Preflight passed[/green]")
+
+
+@app.command()
+def dashboard(
+    results_dir: str = typer.Option(..., help="Directory containing per-sample run outputs"),
+    outdir: str = typer.Option("cohort_dashboard", help="Dashboard output directory"),
+):
+    """Build or refresh the cohort HTML dashboard from per-sample gene summaries."""
+    info = build_cohort_dashboard(results_dir, outdir)
+    print(
+        f"[green]Dashboard updated[/green]: {info['samples']} samples "
+        f"({info['samples_read']} read, sections rewritten: {', '.join(info['sections_written']) or 'none'})"
+    )
+    print(f"[green]Done[/green] -> open [bold]{info['index']}[/bold]")
+
+
+@app.command("fuse-cohort")
+def fuse_cohort(
+    inputs: list[str] = typer.Option(..., "--input", help="Scored *.amr_fused.csv table or results directory (repeatable)"),
+    outdir: str = typer.Option("cohort_fusion", help="Output directory"),
+    memory_budget_mb: int = typer.Option(
+        512,
+        help="Approximate memory budget for each partition. Sizes of .xz and streamed .zst inputs are estimated "
+        "at 8x their compressed size; gzip and sized zstd inputs use their recorded size",
+    ),
+    partitions: int | None = typer.Option(None, help="Spill partitions (default: derived from input size and budget)"),
+    gene_level: str = typer.Option("gene", help="Fusion level: gene | allele | family"),
+    gene_aliases: str | None = typer.Option(None, help="Gene alias mapping file (alias, canonical, family)"),
+    workdir: str | None = typer.Option(None, help="Directory for spill files (default: system temp)"),
+):
+    """Out-of-core gene summary/disagreement fusion over cohort-scale hit tables."""
+    try:
+        info = fuse_out_of_core(
+            inputs,
+            outdir=outdir,
+            memory_budget_mb=memory_budget_mb,
+            partitions=partitions,
+            level=gene_level,
+            # without an alias file the gene keys already stored in the run outputs are used
+            gene_index=load_gene_index(gene_aliases) if gene_aliases else None,
+            workdir=workdir,
+        )
+    except (ValueError, FileNotFoundError) as e:
+        raise typer.BadParameter(str(e)) from e
+
+    print(
+        f"[green]Fused[/green] {info['input_rows']} hits from {info['input_files']} files "
+        f"in {info['partitions']} partitions -> {info['gene_summary_rows']} genes, "
+        f"{info['disagreement_rows']} disagreements"
+    )
+    print(f"[green]Done[/green] -> outputs written to [bold]{outdir}[/bold]")
+
+
+@app.command("diff")
+def diff_runs(
+    old: str = typer.Argument(..., help="Baseline results directory"),
+    new: str = typer.Argument(..., help="Results directory to compare against the baseline"),
+    outdir: str = typer.Option("fusion_diff", help="Where to write diff tables"),
+):
+    """Report hit, consensus-tier and disagreement changes between two result sets."""
+    try:
+        result = diff_results(old, new)
+    except FileNotFoundError as e:
+        raise typer.BadParameter(str(e)) from e
+    write_diff(result, outdir)
+
+    summary = result["summary"]
+    samples = summary["samples"]
+    print(
+        f"Samples: {len(samples['changed'])} changed, {len(samples['added'])} added, "
+        f"{len(samples['removed'])} removed, {samples['unchanged_skipped']} unchanged (skipped)"
+    )
+    print(f"Hits: {summary['hits']}")
+    print(f"Tier transitions: {summary['tier_transitions']}  Disagreements: {summary['disagreements']}")
+    print(f"[green]Done[/green] -> diff written to [bold]{outdir}[/bold]")
+
+
+@app.command()
+def report(
+    results_dir: str = typer.Option(..., help="Directory containing per-sample run outputs"),
+    samples: list[str] | None = typer.Option(None, "--sample", help="Only re-render these samples (repeatable)"),
+    workers: int | None = typer.Option(None, help="Worker processes (default: CPU count)"),
+    pdf: bool = typer.Option(True, help="Render PDF reports (requires reportlab)"),
+    pdf_only: bool = typer.Option(False, help="Only render PDFs; leave markdown/HTML reports untouched"),
+    cohort_pdf: str | None = typer.Option(None, help="Also write one combined PDF of all samples, with a table of contents"),
+    ai_enable: bool = typer.Option(False, help="Also regenerate AI interpretation summaries"),
+    ai_provider: str = typer.Option("openai_compatible", help="AI provider: openai_compatible | anthropic | ollama"),
+    ai_model: str = typer.Option("gpt-4o-mini", help="Model name (e.g., claude-3-5-sonnet-latest)"),
+    ai_api_base: str | None = typer.Option(None, help="Provider API base URL override"),
+    ai_api_key: str | None = typer.Option(None, help="Provider API key override"),
+):
+    """Regenerate markdown/HTML/PDF reports from existing fused outputs without rerunning the pipeline."""
+    ai = (
+        {"provider": ai_provider, "model": ai_model, "api_base": ai_api_base, "api_key": ai_api_key}
+        if ai_enable
+        else None
+    )
+    if pdf_only and not pdf:
+        raise typer.BadParameter("--pdf-only cannot be combined with --no-pdf")
+    try:
+        results = rerender_reports(
+            results_dir, samples=samples, workers=workers, pdf=pdf, ai=ai, text=not pdf_only, cohort_pdf=cohort_pdf
+        )
+    except FileNotFoundError as e:
+        raise typer.BadParameter(str(e)) from e
+    if not results:
+        raise typer.BadParameter(f"No run manifests found under {results_dir}")
+
+    failed = [r for r in results if r["error"]]
+    for r in failed[:20]:
+        print(f"[red]{r['sample_id']}[/red]: {r['error']}")
+    print(f"Re-rendered reports for {len(results) - len(failed)} samples ({len(failed)} failed)")
+    if failed:
+        raise typer.Exit(code=1)
+    if cohort_pdf:
+        print(f"Cohort PDF: [bold]{cohort_pdf}[/bold]")
+    print(f"[green]Done[/green] -> reports refreshed under [bold]{results_dir}[/bold]")
+
+
+@app.command()
+def sweep(
+    output: str = typer.Option("threshold_sweep.csv", help="Where to write the sweep table (CSV)"),
+    sample_id: str | None = typer.Option(None, help="Sample identifier (single-sample inputs)"),
+    sample_column: str | None = typer.Option(None, help="Input column holding sample IDs for multi-sample tables"),
+    resfinder: str | None = typer.Option(None, help="Path to ResFinder output (tsv/csv)"),
+    amrfinder: str | None = typer.Option(None, help="Path to AMRFinder output (tsv/csv)"),
+    rgi: str | None = typer.Option(None, help="Path to RGI output (tsv/csv)"),
+    identity_grid: str = typer.Option("80:100:1", help="Identity thresholds: start:stop:step or comma list"),
+    coverage_grid: str = typer.Option("50:100:1", help="Coverage thresholds: start:stop:step or comma list"),
+    gene_level: str = typer.Option("gene", help="Fusion level: gene | allele | family"),
+    gene_aliases: str | None = typer.Option(None, help="Gene alias mapping file (alias, canonical, family)"),
+    deduplicate: bool = typer.Option(True, help="Drop duplicate tool-level hits"),
+    per_sample: bool = typer.Option(True, "--per-sample/--cohort-only", help="Include one block of rows per sample"),
+):
+    """Evaluate an identity x coverage threshold grid in a single pass over the hits."""
+    if not sample_id and not sample_column:
+        raise typer.BadParameter("Provide --sample-id, or --sample-column for multi-sample inputs")
+    if not (resfinder or amrfinder or rgi):
+        raise typer.BadParameter("Provide at least one input: --resfinder, --amrfinder, or --rgi")
+    if gene_level not in GENE_LEVELS:
+        raise typer.BadParameter(f"--gene-level must be one of: {', '.join(GENE_LEVELS)}")
+    try:
+        identities = parse_grid(identity_grid)
+        coverages = parse_grid(coverage_grid)
+        gene_index = load_gene_index(gene_aliases)
+    except (ValueError, GeneIndexError) as e:
+        raise typer.BadParameter(str(e)) from e
+
+    hits = normalize_and_filter_hits(
+        _parse_inputs(sample_id, sample_column, resfinder, amrfinder, rgi),
+        deduplicate=deduplicate,
+    )
+    if gene_level != "gene":
+        hits = canonicalize_genes(hits, gene_index)
+
+    result = threshold_sweep(hits, identities, coverages, level=gene_level, per_sample=per_sample)
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    result.to_csv(output, index=False)
+    print(
+        f"[green]Swept[/green] {len(identities)} x {len(coverages)} thresholds over {len(hits)} hits "
+        f"-> [bold]{output}[/bold]"
+    )
+
+
+@app.command()
+def worker(
+    sample_sheet: str = typer.Option(..., help="TSV/CSV sample sheet with sample_id and resfinder/amrfinder/rgi (or inputs) path columns"),
+    queue_dir: str = typer.Option(..., help="Shared queue directory (claims, done and failed markers)"),
+    outdir: str = typer.Option("outputs", help="Shared output directory; results go to OUTDIR/<sample>"),
+    worker_id: str | None = typer.Option(None, help="Worker name recorded in markers (default: host-pid)"),
+    heartbeat: float = typer.Option(HEARTBEAT_SECONDS, help="Seconds between claim heartbeats"),
+    stale_after: float = typer.Option(STALE_AFTER_SECONDS, help="Seconds without heartbeat before a claim is reclaimed"),
+    max_samples: int | None = typer.Option(None, help="Stop after processing this many samples"),
+    max_attempts: int = typer.Option(
+        1, help="Attempts per sample before it stays failed; rerun with a higher value to retry failed samples"
+    ),
+    wait: bool = typer.Option(True, help="Keep polling while other workers hold claims (reclaims dead workers' samples)"),
+    min_identity: float = typer.Option(0.0, help="Minimum identity threshold (0-100)"),
+    min_coverage: float = typer.Option(0.0, help="Minimum coverage threshold (0-100)"),
+    deduplicate: bool = typer.Option(True, help="Drop duplicate tool-level hits"),
+    strict_validation: bool = typer.Option(False, help="Treat validation warnings as errors"),
+    ontology: list[str] | None = typer.Option(None, help="Drug-class ontology file (.obo/.json/.tsv); repeatable"),
+    gene_level: str = typer.Option("gene", help="Fusion level: gene | allele | family"),
+    gene_aliases: str | None = typer.Option(None, help="Gene alias mapping file (alias, canonical, family)"),
+    json_format: str = typer.Option("json", help="Record output format: json | ndjson"),
+    json_pretty: bool = typer.Option(True, "--json-pretty/--json-compact", help="Indent JSON array outputs"),
+    backend: str = typer.Option("pandas", help="Compute backend: pandas | arrow"),
+    compress: str = typer.Option("none", help="Compress CSV/JSON outputs: none | gzip | xz | zstd"),
+    compress_level: int | None = typer.Option(None, help="Compression level (gzip 1-9, xz 0-9, zstd 1-22)"),
+):
+    """Process samples from a sheet as one of many workers sharing a queue directory (e.g. on NFS)."""
+    if json_format not in JSON_FORMATS:
+        raise typer.BadParameter(f"--json-format must be one of: {', '.join(JSON_FORMATS)}")
+    worker_id = worker_id or default_worker_id()
+    try:
+        samples = load_sample_sheet(sample_sheet)
+        check_output_compression(compress, compress_level)
+        queue = WorkQueue(queue_dir, outdir, heartbeat=heartbeat, stale_after=stale_after, max_attempts=max_attempts)
+        # compiled once, reused for every sample this worker claims
+        pipeline = FusionPipeline(
+            min_identity=min_identity,
+            min_coverage=min_coverage,
+            deduplicate=deduplicate,
+            strict_validation=strict_validation,
+            ontology=ontology,
+            gene_level=gene_level,
+            gene_aliases=gene_aliases,
+            backend=backend,
+        )
+    except ValueError as e:
+        raise typer.BadParameter(str(e)) from e
+
+    def process(row: dict, sample_outdir) -> None:
+        result = pipeline.run(
+            sample_id=row["sample_id"],
+            inputs=_detected_inputs(_as_list(row.get("inputs"))),
+            **{t: row.get(t) for t in INPUT_TOOLS if row.get(t)},
+        )
+        result.write(
+            str(sample_outdir),
+            json_format=json_format,
+            json_pretty=json_pretty,
+            run_meta={"worker": worker_id},
+            compression=compress,
+            compression_level=compress_level,
+        )
+
+    stats = run_worker(samples, queue, process, worker_id=worker_id, max_samples=max_samples, wait=wait)
+    print(
+        f"[green]Worker {worker_id}[/green]: {len(stats.processed)} processed, {len(stats.failed)} failed, "
+        f"{len(stats.reclaimed)} reclaimed in {stats.seconds}s"
     )
+    for sid in stats.lost:
+        print(f"[yellow]WARN: {sid} was taken over by another worker; this worker's result was discarded[/yellow]")
+    for sid in stats.failed:
+        print(f"[yellow]WARN: {sid} failed; see {Path(queue_dir) / 'failed' / (sid + '.json')}[/yellow]")
+    print(f"Queue: {queue.status([row['sample_id'] for row in samples])}")
 
 
 @app.command("init-config")
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import lzma
+from pathlib import Path
+from typing import IO, Callable
+
+import pandas as pd
+
+# Leading bytes of each supported container format
+_MAGIC = [
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+]
+
+_EXTENSIONS = {
+    ".gz": "gzip",
+    ".gzip": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".zst": "zstd",
+    ".zstd": "zstd",
+}
+
+# Candidate delimiters, in tie-break order
+_DELIMITERS = ("\t", ",", ";", "|")
+
+# Uncompressed inputs at or above this size are memory-mapped instead of buffered
+MMAP_THRESHOLD_BYTES = 64 * 1024 * 1024
+
+# Codecs available for written outputs ('none' writes plain files)
+OUTPUT_COMPRESSIONS = ("none", "gzip", "xz", "zstd")
+
+_OUTPUT_SUFFIXES = {"gzip": ".gz", "xz": ".xz", "zstd": ".zst"}
+
+# (default, min, max) level per output codec; defaults favour write throughput
+_OUTPUT_LEVELS = {"gzip": (6, 1, 9), "xz": (6, 0, 9), "zstd": (3, 1, 22)}
+
+
+def detect_compression(path: str | Path | bytes) -> str | None:
+    """Return 'gzip', 'bz2', 'xz', 'zstd' or None using magic bytes, then the extension."""
+    if isinstance(path, bytes):
+        head = path[:8]
+    else:
+        try:
+            with Path(path).open("rb") as fh:
+                head = fh.read(8)
+        except OSError:
+            head = b""
+
+    for magic, name in _MAGIC:
+        if head.startswith(magic):
+            return name
+    if head or isinstance(path, bytes):
+        return None
+    return _EXTENSIONS.get(Path(path).suffix.lower())
+
+
+def strip_compression_suffix(path: str | Path | bytes) -> str:
+    """Return the file name without a trailing compression extension (e.g. 'x.tsv.gz' -> 'x.tsv')."""
+    if isinstance(path, bytes):
+        return ""
+    name = Path(path).name
+    suffix = Path(name).suffix.lower()
+    if suffix in _EXTENSIONS:
+        return name[: -len(suffix)]
+    return name
+
+
+def open_binary(path: str | Path | bytes, compression: str | None = "infer") -> IO[bytes]:
+    """Open a file (or in-memory bytes) for streaming binary reads, decompressing on the fly ('infer' detects the format)."""
+    if compression == "infer":
+        compression = detect_compression(path)
+    source = io.BytesIO(path) if isinstance(path, bytes) else path
+
+    if compression is None:
+        return source if isinstance(source, io.BytesIO) else open(source, "rb")
+    if compression == "gzip":
+        return gzip.open(source, "rb")
+    if compression == "bz2":
+        return bz2.open(source, "rb")
+    if compression == "xz":
+        return lzma.open(source, "rb")
+    if compression == "zstd":
+        zstandard = _require_zstandard()
+        raw = source if isinstance(source, io.BytesIO) else open(source, "rb")
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+def open_text(path: str | Path | bytes, compression: str | None = "infer", encoding: str = "utf-8") -> IO[str]:
+    """Open a (possibly compressed) file for streaming text reads."""
+    return io.TextIOWrapper(open_binary(path, compression), encoding=encoding, newline="")
+
+
+def read_head(path: str | Path | bytes, size: int = 64 * 1024, compression: str | None = "infer") -> str:
+    """Read at most ``size`` decompressed characters from the start of a file."""
+    with open_text(path, compression, encoding="utf-8-sig") as fh:
+        return fh.read(size)
+
+
+def sniff_delimiter(sample: str, default: str = "\t") -> str:
+    """Guess the delimiter from the header line of a delimited text sample."""
+    header = sample.splitlines()[0] if sample else ""
+    # header lines are plain column names, so the most frequent candidate wins;
+    # a full csv.Sniffer pass costs ~100x more and dominates bulk header scans
+    counts = {d: header.count(d) for d in _DELIMITERS}
+    best = max(counts, key=counts.get)
+    return best if counts[best] else default
+
+
+def input_delimiter(path: str | Path | bytes, head: Callable[[], str]) -> str:
+    """Delimiter for a tabular input: ',' for .csv names, otherwise sniffed from ``head()``."""
+    if strip_compression_suffix(path).lower().endswith(".csv"):
+        return ","
+    return sniff_delimiter(head())
+
+
+def output_suffix(compression: str | None) -> str:
+    """File name suffix for an output codec ('' for uncompressed outputs)."""
+    return _OUTPUT_SUFFIXES.get(_output_codec(compression), "")
+
+
+def check_output_compression(compression: str | None, level: int | None = None) -> str | None:
+    """Validate an output codec and level; returns the codec name, or None for uncompressed outputs."""
+    codec = _output_codec(compression)
+    if codec is None:
+        if level is not None:
+            raise ValueError("A compression level requires a compression codec")
+        return None
+    _, low, high = _OUTPUT_LEVELS[codec]
+    if level is not None and not low <= level <= high:
+        raise ValueError(f"{codec} compression level must be between {low} and {high}")
+    if codec == "zstd":
+        _require_zstandard()
+    return codec
+
+
+def open_binary_writer(path: str | Path, compression: str | None = None, level: int | None = None) -> IO[bytes]:
+    """Open a file for streaming binary writes, compressing on the fly."""
+    codec = check_output_compression(compression, level)
+    if codec is None:
+        return open(path, "wb")
+    if level is None:
+        level = _OUTPUT_LEVELS[codec][0]
+    if codec == "gzip":
+        return gzip.open(path, "wb", compresslevel=level)
+    if codec == "xz":
+        return lzma.open(path, "wb", preset=level)
+    zstandard = _require_zstandard()
+    return zstandard.ZstdCompressor(level=level).stream_writer(open(path, "wb"), closefd=True)
+
+
+def open_text_writer(
+    path: str | Path, compression: str | None = None, level: int | None = None, encoding: str = "utf-8"
+) -> IO[str]:
+    """Open a (possibly compressed) file for streaming text writes."""
+    return io.TextIOWrapper(open_binary_writer(path, compression, level), encoding=encoding, newline="")
+
+
+def read_output_csv(path: str | Path, **kwargs) -> pd.DataFrame:
+    """Read a CSV written by this package (or iterate it with ``chunksize``), decompressing outputs transparently."""
+    return pd.read_csv(path, compression=pandas_compression(detect_compression(path)), **kwargs)
+
+
+def uncompressed_size(path: str | Path) -> int | None:
+    """
+    Decompressed size recorded in a compressed file, or None when the container does not store it.
+
+    Reads the gzip ISIZE trailer (single-member files under 4 GiB) or the zstd
+    frame header's content size; xz/bz2 and streamed zstd frames give None.
+    """
+    codec = detect_compression(path)
+    size = Path(path).stat().st_size
+    with open(path, "rb") as fh:
+        if codec == "gzip" and size >= 18:
+            fh.seek(-4, io.SEEK_END)
+            isize = int.from_bytes(fh.read(4), "little")
+            # ISIZE is the size modulo 2**32; a value below the compressed size has wrapped
+            return isize if isize >= size else None
+        if codec == "zstd":
+            try:
+                import zstandard
+            except ImportError:
+                return None
+            content = zstandard.frame_content_size(fh.read(18))
+            return content if content >= 0 else None
+    return None
+
+
+def pandas_compression(compression: str | None) -> str | None:
+    """Translate a detected compression name into pandas' ``compression`` argument."""
+    if compression == "zstd":
+        _require_zstandard()
+    return compression
+
+
+def _output_codec(compression: str | None) -> str | None:
+    if compression in (None, "", "none"):
+        return None
+    if compression not in _OUTPUT_LEVELS:
+        raise ValueError(f"Unsupported output compression: {compression}. Use one of: {', '.join(OUTPUT_COMPRESSIONS)}")
+    return compression
+
+
+def _require_zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ValueError("zstd compressed files require the 'zstandard' package (pip install zstandard)") from e
+    return zstandard
@@ -3,8 +3,15 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any
 
+import pandas as pd
 import yaml
 
+from .compression import input_delimiter, read_head
+from .parsers import check_sample_ids
+
+# Tool input columns recognised in sample sheets (and config files)
+INPUT_TOOLS = ["resfinder", "amrfinder", "rgi"]
+
 
 class ConfigError(ValueError):
     pass
@@ -19,7 +26,8 @@ def load_config(path: str) -> dict[str, Any]:
     if not isinstance(data, dict):
         raise ConfigError("Config must be a YAML object")
 
-    required = ["sample_id", "outdir"]
+    # multi-sample inputs carry their sample IDs in a column instead
+    required = ["outdir"] if data.get("sample_column") else ["sample_id", "outdir"]
     missing = [k for k in required if k not in data]
     if missing:
         raise ConfigError(f"Missing required config keys: {missing}")
@@ -27,6 +35,36 @@ def load_config(path: str) -> dict[str, Any]:
     return data
 
 
+def load_sample_sheet(path: str) -> list[dict[str, Any]]:
+    """Read a TSV/CSV sample sheet with a sample_id column and one path column per tool."""
+    p = Path(path)
+    if not p.exists():
+        raise ConfigError(f"Sample sheet not found: {path}")
+
+    sep = input_delimiter(p, lambda: read_head(p))
+    sheet = pd.read_csv(p, sep=sep, dtype=str, keep_default_na=False)
+    sheet.columns = [c.strip().lower() for c in sheet.columns]
+    if "sample_id" not in sheet.columns:
+        raise ConfigError(f"Sample sheet {path} needs a 'sample_id' column")
+    # an 'inputs' column holds a file or directory whose tool outputs are detected from their headers
+    tools = [t for t in INPUT_TOOLS + ["inputs"] if t in sheet.columns]
+    if not tools:
+        raise ConfigError(f"Sample sheet {path} needs at least one of: {', '.join(INPUT_TOOLS + ['inputs'])}")
+    duplicated = sorted(set(sheet.loc[sheet["sample_id"].duplicated(), "sample_id"]))
+    if duplicated:
+        raise ConfigError(f"Duplicate sample IDs in sample sheet {path}: {duplicated[:5]}")
+    # sample IDs name claim files and output directories on every worker node
+    try:
+        check_sample_ids(sheet["sample_id"])
+    except ValueError as e:
+        raise ConfigError(f"Sample sheet {path}: {e}") from e
+
+    return [
+        {"sample_id": row["sample_id"], **{t: (row[t].strip() or None) for t in tools}}
+        for row in sheet.to_dict("records")
+    ]
+
+
 def write_default_config(path: str, force: bool = False) -> Path:
     p = Path(path)
     if p.exists() and not force:
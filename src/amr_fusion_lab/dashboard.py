@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from .compression import read_output_csv
+from .serialization import dumps, write_json
+
+# Bump when the per-sample partial layout changes so old state is discarded
+DASHBOARD_STATE_VERSION = 1
+
+SECTIONS = ["overview", "gene_prevalence", "tiers", "disagreements", "tool_rates", "samples"]
+
+_SUMMARY_COLUMNS = ["sample_id", "gene", "tools_detected", "tool_count", "consensus_tier"]
+
+
+def build_cohort_dashboard(results_dir: str, outdir: str) -> dict[str, Any]:
+    """
+    Build (or incrementally refresh) a cohort HTML dashboard from per-sample gene summaries.
+
+    Each gene summary is reduced to a small partial aggregate that is kept in
+    dashboard_state.json; only new or modified sample files are re-read, and
+    only sections whose aggregated data changed are rewritten.
+    """
+    root = Path(results_dir)
+    out = Path(outdir)
+    (out / "data").mkdir(parents=True, exist_ok=True)
+    state_path = out / "dashboard_state.json"
+    state = _load_state(state_path)
+
+    seen: dict[str, dict] = {}
+    read = 0
+    for path in sorted(root.rglob("*.gene_summary.csv*")):
+        if out in path.parents:
+            continue
+        st = path.stat()
+        key = str(path.relative_to(root))
+        prev = state["samples"].get(key)
+        if prev and prev["size"] == st.st_size and prev["mtime_ns"] == st.st_mtime_ns:
+            seen[key] = prev
+            continue
+        partial = _sample_partial(path)
+        partial.update({"size": st.st_size, "mtime_ns": st.st_mtime_ns})
+        seen[key] = partial
+        read += 1
+
+    removed = len(set(state["samples"]) - set(seen))
+    state["samples"] = seen
+
+    written = []
+    for name, blob in _build_sections(list(seen.values())).items():
+        payload = dumps(blob)
+        digest = hashlib.sha256(payload).hexdigest()
+        target = out / "data" / f"{name}.js"
+        if state["sections"].get(name) == digest and target.exists():
+            continue
+        target.write_bytes(b"window.AMR_DASHBOARD=window.AMR_DASHBOARD||{};window.AMR_DASHBOARD[" + dumps(name) + b"]=" + payload + b";\n")
+        state["sections"][name] = digest
+        written.append(name)
+
+    index = out / "index.html"
+    if not index.exists() or state.get("template") != _template_digest():
+        index.write_text(_HTML_TEMPLATE, encoding="utf-8")
+        state["template"] = _template_digest()
+
+    _store_state(state_path, state)
+    return {
+        "samples": len(seen),
+        "samples_read": read,
+        "samples_removed": removed,
+        "sections_written": written,
+        "index": str(index),
+    }
+
+
+def _sample_partial(path: Path) -> dict[str, Any]:
+    """Reduce one gene summary to the counts the cohort sections need."""
+    df = read_output_csv(path, usecols=lambda c: c in _SUMMARY_COLUMNS)
+    sample_id = str(df["sample_id"].iloc[0]) if len(df) else path.name.split(".gene_summary")[0]
+
+    genes = df["gene"].dropna().astype(str)
+    tool_count = pd.to_numeric(df.get("tool_count"), errors="coerce").fillna(0)
+    tools = df.get("tools_detected", pd.Series([], dtype=object)).fillna("").astype(str)
+
+    tool_genes: Counter = Counter()
+    for detected in tools:
+        tool_genes.update(t for t in detected.split(",") if t)
+
+    single = df[tool_count == 1]
+    return {
+        "sample_id": sample_id,
+        "genes": sorted(set(genes)),
+        "tiers": {str(k): int(v) for k, v in df.get("consensus_tier", pd.Series([], dtype=object)).value_counts().items()},
+        "disagreements": {str(g): str(t) for g, t in zip(single["gene"], single.get("tools_detected", ""))},
+        "tool_genes": dict(tool_genes),
+        "multi_tool": int((tool_count >= 2).sum()),
+    }
+
+
+def _build_sections(partials: list[dict]) -> dict[str, dict]:
+    n_samples = len(partials)
+    prevalence: Counter = Counter()
+    tiers: Counter = Counter()
+    hotspots: Counter = Counter()
+    hotspot_tools: dict[str, Counter] = {}
+    tool_genes: Counter = Counter()
+    tool_samples: Counter = Counter()
+    sample_rows = []
+    total_genes = 0
+
+    for p in partials:
+        prevalence.update(p["genes"])
+        tiers.update(p["tiers"])
+        hotspots.update(p["disagreements"].keys())
+        for gene, tool in p["disagreements"].items():
+            hotspot_tools.setdefault(gene, Counter())[tool] += 1
+        tool_genes.update(p["tool_genes"])
+        tool_samples.update(p["tool_genes"].keys())
+        total_genes += len(p["genes"])
+        sample_rows.append([p["sample_id"], len(p["genes"]), p["multi_tool"], len(p["disagreements"])])
+
+    def pct(n: int, d: int) -> float:
+        return round(100.0 * n / d, 2) if d else 0.0
+
+    tier_total = sum(tiers.values())
+    return {
+        "overview": {
+            "columns": ["metric", "value"],
+            "rows": [
+                ["samples", n_samples],
+                ["distinct genes", len(prevalence)],
+                ["gene detections", total_genes],
+                ["mean genes per sample", round(total_genes / n_samples, 2) if n_samples else 0],
+                ["single-tool detections", sum(hotspots.values())],
+            ],
+        },
+        "gene_prevalence": {
+            "columns": ["gene", "samples", "prevalence_pct"],
+            "rows": [[g, n, pct(n, n_samples)] for g, n in prevalence.most_common()],
+        },
+        "tiers": {
+            "columns": ["consensus_tier", "genes", "share_pct"],
+            "rows": [[t, n, pct(n, tier_total)] for t, n in tiers.most_common()],
+        },
+        "disagreements": {
+            "columns": ["gene", "single_tool_samples", "share_of_detections_pct", "most_common_tool"],
+            "rows": [
+                [g, n, pct(n, prevalence[g]), hotspot_tools[g].most_common(1)[0][0]]
+                for g, n in hotspots.most_common()
+            ],
+        },
+        "tool_rates": {
+            "columns": ["tool", "gene_detections", "detection_rate_pct", "samples_with_hits"],
+            "rows": [[t, n, pct(n, total_genes), tool_samples[t]] for t, n in tool_genes.most_common()],
+        },
+        "samples": {
+            "columns": ["sample_id", "genes", "multi_tool_genes", "disagreements"],
+            "rows": sorted(sample_rows),
+        },
+    }
+
+
+def _load_state(path: Path) -> dict[str, Any]:
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        state = {}
+    if state.get("version") != DASHBOARD_STATE_VERSION:
+        state = {"version": DASHBOARD_STATE_VERSION, "samples": {}, "sections": {}}
+    return state
+
+
+def _store_state(path: Path, state: dict[str, Any]) -> None:
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    write_json(tmp, state, pretty=False)
+    os.replace(tmp, path)
+
+
+def _template_digest() -> str:
+    return hashlib.sha256(_HTML_TEMPLATE.encode("utf-8")).hexdigest()
+
+
+_TITLES = {
+    "overview": "Cohort overview",
+    "gene_prevalence": "Gene prevalence",
+    "tiers": "Consensus tier distribution",
+    "disagreements": "Disagreement hotspots",
+    "tool_rates": "Per-tool detection rates",
+    "samples": "Samples",
+}
+
+# Data blobs are plain <script> files so the report also opens from file:// without a server
+_HTML_TEMPLATE = (
+    "<!doctype html><html><head><meta charset='utf-8'>"
+    "<title>AMR Fusion Cohort Dashboard</title>"
+    "<style>body{font-family:Arial,sans-serif;max-width:1100px;margin:40px auto;line-height:1.4;}"
+    "table{border-collapse:collapse;width:100%;margin:8px 0;}th,td{border:1px solid #ddd;padding:4px 8px;text-align:left;}"
+    "th{background:#f4f4f4;cursor:pointer;}.pager{margin-bottom:24px;}.pager button{margin-right:4px;}"
+    "input{margin:4px 0;padding:3px;}</style>"
+    + "".join(f"<script src='data/{name}.js'></script>" for name in SECTIONS)
+    + "</head><body><h1>AMR Fusion Cohort Dashboard</h1>"
+    + "".join(f"<h2>{_TITLES[name]}</h2><div class='section' id='{name}'></div>" for name in SECTIONS)
+    + "<script>"
+    "var PAGE=50;"
+    "function render(id){var el=document.getElementById(id),d=(window.AMR_DASHBOARD||{})[id];"
+    "if(!d){el.textContent='No data';return;}"
+    "var st={page:0,q:'',sort:-1,desc:true,rows:d.rows};"
+    "var input=document.createElement('input');input.placeholder='Filter';"
+    "var table=document.createElement('table'),pager=document.createElement('div');pager.className='pager';"
+    "el.appendChild(input);el.appendChild(table);el.appendChild(pager);"
+    "input.oninput=function(){st.q=input.value.toLowerCase();st.page=0;draw();};"
+    "function draw(){var rows=d.rows;if(st.q){rows=rows.filter(function(r){return String(r[0]).toLowerCase().indexOf(st.q)>=0;});}"
+    "if(st.sort>=0){var k=st.sort,s=st.desc?-1:1;rows=rows.slice().sort(function(a,b){return a[k]<b[k]?-s:a[k]>b[k]?s:0;});}"
+    "var pages=Math.max(1,Math.ceil(rows.length/PAGE));st.page=Math.min(st.page,pages-1);"
+    "var h='<tr>'+d.columns.map(function(c,i){return '<th data-i='+i+'>'+c+'</th>';}).join('')+'</tr>';"
+    "rows.slice(st.page*PAGE,(st.page+1)*PAGE).forEach(function(r){h+='<tr>'+r.map(function(v){"
+    "return '<td>'+String(v).replace(/&/g,'&amp;').replace(/</g,'&lt;')+'</td>';}).join('')+'</tr>';});"
+    "table.innerHTML=h;"
+    "table.querySelectorAll('th').forEach(function(th){th.onclick=function(){var i=+th.dataset.i;"
+    "st.desc=st.sort===i?!st.desc:true;st.sort=i;draw();};});"
+    "pager.innerHTML='';if(pages>1){var prev=document.createElement('button'),next=document.createElement('button');"
+    "prev.textContent='Prev';next.textContent='Next';prev.onclick=function(){if(st.page>0){st.page--;draw();}};"
+    "next.onclick=function(){if(st.page<pages-1){st.page++;draw();}};pager.appendChild(prev);pager.appendChild(next);"
+    "pager.appendChild(document.createTextNode(' Page '+(st.page+1)+' / '+pages+' ('+rows.length+' rows)'));}}"
+    "draw();}"
+    + "".join(f"render('{name}');" for name in SECTIONS)
+    + "</script></body></html>"
+)
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from .compression import read_output_csv
+from .hashing import row_hashes
+from .serialization import write_json
+
+HIT_KEY = ["sample_id", "gene", "tool"]
+GENE_KEY = ["sample_id", "gene"]
+
+_HIT_COLUMNS = ["sample_id", "gene", "tool", "change"]
+_TIER_COLUMNS = ["sample_id", "gene", "old_tier", "new_tier"]
+_DISAGREEMENT_COLUMNS = ["sample_id", "gene", "change", "tools_detected"]
+
+
+def discover_runs(results_dir: str) -> dict[str, tuple[Path, dict]]:
+    """Map sample_id -> (run directory, manifest) for every run manifest under results_dir."""
+    runs: dict[str, tuple[Path, dict]] = {}
+    root = Path(results_dir)
+    if not root.is_dir():
+        raise FileNotFoundError(f"Results directory not found: {results_dir}")
+    for path in sorted(root.rglob("*.run_manifest.json")):
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+        runs[str(manifest.get("sample_id", path.name.split(".run_manifest")[0]))] = (path.parent, manifest)
+    return runs
+
+
+def diff_results(old_dir: str, new_dir: str) -> dict[str, Any]:
+    """
+    Compare two result sets keyed on (sample_id, gene, tool).
+
+    Samples whose manifest content hashes match are skipped without reading
+    their tables; the rest are compared with per-row hashes.
+    """
+    old_runs = discover_runs(old_dir)
+    new_runs = discover_runs(new_dir)
+
+    added_samples = sorted(set(new_runs) - set(old_runs))
+    removed_samples = sorted(set(old_runs) - set(new_runs))
+    unchanged: list[str] = []
+    changed: list[str] = []
+
+    hits, tiers, disagreements = [], [], []
+    for sid in sorted(set(old_runs) | set(new_runs)):
+        old = old_runs.get(sid)
+        new = new_runs.get(sid)
+        if old and new and _same_content(old[1], new[1]):
+            unchanged.append(sid)
+            continue
+        if old and new:
+            changed.append(sid)
+
+        old_hits, old_genes = _load_run(sid, old)
+        new_hits, new_genes = _load_run(sid, new)
+        hits.append(_diff_hits(old_hits, new_hits))
+        t, d = _diff_genes(old_genes, new_genes)
+        tiers.append(t)
+        disagreements.append(d)
+
+    hit_diff = _concat(hits, _HIT_COLUMNS)
+    tier_diff = _concat(tiers, _TIER_COLUMNS)
+    disagreement_diff = _concat(disagreements, _DISAGREEMENT_COLUMNS)
+    differing = _samples_with_changes(hit_diff, tier_diff, disagreement_diff)
+
+    summary = {
+        "old": str(old_dir),
+        "new": str(new_dir),
+        "samples": {
+            "added": added_samples,
+            "removed": removed_samples,
+            "changed": sorted(set(changed) & differing),
+            "unchanged_skipped": len(unchanged),
+        },
+        "hits": {k: int((hit_diff["change"] == k).sum()) for k in ("added", "removed", "changed")},
+        "tier_transitions": int(((tier_diff["old_tier"].notna()) & (tier_diff["new_tier"].notna())).sum()),
+        "disagreements": {k: int((disagreement_diff["change"] == k).sum()) for k in ("entered", "left")},
+    }
+    return {
+        "summary": summary,
+        "hits": hit_diff,
+        "tiers": tier_diff,
+        "disagreements": disagreement_diff,
+    }
+
+
+def write_diff(result: dict[str, Any], outdir: str) -> list[str]:
+    p = Path(outdir)
+    p.mkdir(parents=True, exist_ok=True)
+    result["hits"].to_csv(p / "diff.hits.csv", index=False)
+    result["tiers"].to_csv(p / "diff.tiers.csv", index=False)
+    result["disagreements"].to_csv(p / "diff.disagreements.csv", index=False)
+    write_json(p / "diff.summary.json", result["summary"], pretty=True)
+    return ["diff.hits.csv", "diff.tiers.csv", "diff.disagreements.csv", "diff.summary.json"]
+
+
+def _same_content(old_manifest: dict, new_manifest: dict) -> bool:
+    old_hashes = old_manifest.get("content_hashes")
+    new_hashes = new_manifest.get("content_hashes")
+    return bool(old_hashes) and bool(old_hashes.get("amr_fused")) and old_hashes == new_hashes
+
+
+def _load_run(sid: str, run: tuple[Path, dict] | None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    if run is None:
+        return pd.DataFrame(columns=HIT_KEY), pd.DataFrame(columns=GENE_KEY + ["consensus_tier", "tool_count"])
+    run_dir, manifest = run
+    return (
+        read_output_csv(_output_path(run_dir, manifest, sid, "amr_fused")),
+        read_output_csv(_output_path(run_dir, manifest, sid, "gene_summary")),
+    )
+
+
+def _output_path(run_dir: Path, manifest: dict, sid: str, stem: str) -> Path:
+    prefix = f"{sid}.{stem}.csv"
+    for name in manifest.get("output_files", []):
+        if name.startswith(prefix):
+            return run_dir / name
+    return run_dir / prefix
+
+
+def _diff_hits(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    value_cols = sorted((set(old.columns) & set(new.columns)) - set(HIT_KEY))
+    old, new = _keyed(old, value_cols), _keyed(new, value_cols)
+
+    key = HIT_KEY + ["_occurrence"]
+    merged = old.merge(new, on=key, how="outer", suffixes=("_old", "_new"), indicator=True)
+    change = pd.Series("changed", index=merged.index, dtype=object)
+    change[merged["_merge"] == "left_only"] = "removed"
+    change[merged["_merge"] == "right_only"] = "added"
+    same = (merged["_merge"] == "both") & (merged["_hash_old"] == merged["_hash_new"])
+
+    merged["change"] = change
+    return merged.loc[~same, _HIT_COLUMNS].reset_index(drop=True)
+
+
+def _keyed(df: pd.DataFrame, value_cols: list[str]) -> pd.DataFrame:
+    for c in HIT_KEY:
+        if c not in df.columns:
+            df[c] = None
+    out = df[HIT_KEY].astype(str).copy()
+    # the same tool can report a gene more than once; pair repeats in order
+    out["_occurrence"] = out.groupby(HIT_KEY).cumcount()
+    values = df[value_cols].copy()
+    # integer-looking CSV columns re-read as int in one run and float in another must hash alike
+    for c in values.columns:
+        if pd.api.types.is_numeric_dtype(values[c]) and not pd.api.types.is_bool_dtype(values[c]):
+            values[c] = values[c].astype("float64")
+    out["_hash"] = row_hashes(values, value_cols).to_numpy()
+    return out
+
+
+def _diff_genes(old: pd.DataFrame, new: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    cols = GENE_KEY + ["consensus_tier", "tool_count", "tools_detected"]
+    old = old.reindex(columns=cols).astype({"sample_id": str, "gene": str})
+    new = new.reindex(columns=cols).astype({"sample_id": str, "gene": str})
+    merged = old.merge(new, on=GENE_KEY, how="outer", suffixes=("_old", "_new"))
+
+    tier_changed = merged["consensus_tier_old"].fillna("") != merged["consensus_tier_new"].fillna("")
+    tiers = merged.loc[tier_changed, GENE_KEY + ["consensus_tier_old", "consensus_tier_new"]]
+    tiers = tiers.rename(columns={"consensus_tier_old": "old_tier", "consensus_tier_new": "new_tier"})
+
+    old_single = pd.to_numeric(merged["tool_count_old"], errors="coerce") == 1
+    new_single = pd.to_numeric(merged["tool_count_new"], errors="coerce") == 1
+    entered = merged[new_single & ~old_single].assign(change="entered", tools_detected=lambda x: x["tools_detected_new"])
+    left = merged[old_single & ~new_single].assign(change="left", tools_detected=lambda x: x["tools_detected_old"])
+    disagreements = pd.concat([entered, left], ignore_index=True).reindex(columns=_DISAGREEMENT_COLUMNS)
+    return tiers.reset_index(drop=True), disagreements
+
+
+def _concat(frames: list[pd.DataFrame], columns: list[str]) -> pd.DataFrame:
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _samples_with_changes(*frames: pd.DataFrame) -> set[str]:
+    return set().union(*(set(f["sample_id"].astype(str)) for f in frames))
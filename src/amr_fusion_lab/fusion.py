@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import pandas as pd
 
+from .genes import canonicalize_genes
+
 # Baseline reliability priors (tunable with validation studies)
 TOOL_RELIABILITY = {
     "amrfinder": 1.00,
@@ -9,9 +11,19 @@ TOOL_RELIABILITY = {
     "resfinder": 0.92,
 }
 
+# Grouping key per fusion level; 'gene' keeps the raw reported name
+GENE_LEVELS = {
+    "gene": "gene",
+    "allele": "gene_canonical",
+    "family": "gene_family",
+}
+
+
+def build_gene_summary(scored_df: pd.DataFrame, level: str = "gene") -> pd.DataFrame:
+    """Aggregate row-level hits into gene-, allele- or family-level fused evidence."""
+    if level not in GENE_LEVELS:
+        raise ValueError(f"Unsupported gene level: {level}. Use one of: {', '.join(GENE_LEVELS)}")
 
-def build_gene_summary(scored_df: pd.DataFrame) -> pd.DataFrame:
-    """Aggregate row-level hits into gene-level fused evidence."""
     if scored_df.empty:
         return pd.DataFrame(
             columns=[
@@ -26,12 +38,17 @@ def build_gene_summary(scored_df: pd.DataFrame) -> pd.DataFrame:
             ]
         )
 
-    work = scored_df.copy()
+    key = GENE_LEVELS[level]
+    work = scored_df.copy() if key in scored_df.columns else canonicalize_genes(scored_df)
     work["tool_reliability"] = work["tool"].map(lambda t: TOOL_RELIABILITY.get(str(t), 0.85))
     work["weighted_row_score"] = work["confidence_score"].fillna(0.0) * work["tool_reliability"]
 
+    extra = {}
+    if key != "gene":
+        extra["gene_variants"] = ("gene", lambda x: ",".join(sorted({str(v) for v in x if pd.notna(v)})))
+
     g = (
-        work.groupby(["sample_id", "gene"], dropna=False)
+        work.groupby(["sample_id", key], dropna=False)
         .agg(
             tools_detected=("tool", lambda x: ",".join(sorted(set(map(str, x))))),
             tool_count=("tool", "nunique"),
@@ -43,8 +60,10 @@ def build_gene_summary(scored_df: pd.DataFrame) -> pd.DataFrame:
             best_coverage=("coverage", "max"),
             max_confidence_score=("confidence_score", "max"),
             weighted_consensus_score=("weighted_row_score", "max"),
+            **extra,
         )
         .reset_index()
+        .rename(columns={key: "gene"})
     )
 
     def _consensus(n: int) -> str:
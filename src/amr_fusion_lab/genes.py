@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import csv
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+# Beta-lactamase families that some tools report without the 'bla' prefix
+_BLA_FAMILIES = (
+    "TEM", "SHV", "CTX-M", "OXA", "KPC", "NDM", "VIM", "IMP", "CMY", "GES",
+    "PER", "VEB", "DHA", "ACT", "ACC", "FOX", "MOX", "SME", "IMI", "NMC",
+    "SPM", "GIM", "SIM", "AIM", "DIM", "LEN", "OKP", "ADC", "PDC", "OXY",
+)
+
+_BARE_BLA_RE = re.compile(r"^(?:" + "|".join(re.escape(f) for f in _BLA_FAMILIES) + r")(?=[-\d]|$)")
+
+# Sub-allele designators ('mcr-1.1' -> 'mcr-1'). Other trailing numbers are not stripped: 'sul1' and 'sul2'
+# are different genes, so families beyond the bla table come only from the alias file
+_SUB_ALLELE_RE = re.compile(r"(?<=\d)\.\d+$")
+
+_TERMINAL = ""
+
+
+class GeneIndexError(ValueError):
+    pass
+
+
+@dataclass
+class GeneIndex:
+    """
+    Alias map plus a prefix trie of allele families for cross-tool gene matching.
+
+    Only the built-in bla families and families named in an alias file group
+    alleles; any other gene is its own family (minus a sub-allele '.N' suffix).
+    """
+
+    aliases: dict[str, str] = field(default_factory=dict)
+    families: dict[str, str] = field(default_factory=dict)
+    trie: dict = field(default_factory=dict)
+
+    def add_alias(self, alias: str, canonical: str, family: str | None = None) -> None:
+        alias, canonical = alias.strip(), canonical.strip()
+        if alias and canonical:
+            self.aliases[alias.casefold()] = canonical
+            self.aliases.setdefault(canonical.casefold(), canonical)
+        if family:
+            self.families[canonical] = family.strip()
+            self.add_family(family)
+
+    def add_family(self, family: str) -> None:
+        node = self.trie
+        for ch in family.strip():
+            node = node.setdefault(ch, {})
+        node[_TERMINAL] = family.strip()
+
+    def resolve(self, name: object) -> tuple[str | None, str | None]:
+        """Return (canonical allele, family) for a raw gene name."""
+        if name is None:
+            return None, None
+        text = str(name).strip()
+        # RGI Best_Hit_ARO may look like 'ARO:3000001|blaTEM-1'
+        if "|" in text:
+            text = text.rsplit("|", 1)[-1].strip()
+        if not text:
+            return None, None
+
+        canonical = self.aliases.get(text.casefold())
+        if canonical is None:
+            canonical = f"bla{text}" if _BARE_BLA_RE.match(text) else text
+
+        family = self.families.get(canonical) or self._longest_family(canonical)
+        if family is None:
+            family = _SUB_ALLELE_RE.sub("", canonical)
+        return canonical, family
+
+    def _longest_family(self, name: str) -> str | None:
+        node, found = self.trie, None
+        for i, ch in enumerate(name):
+            node = node.get(ch)
+            if node is None:
+                break
+            nxt = name[i + 1] if i + 1 < len(name) else ""
+            # require a boundary so 'blaOXA' does not claim a hypothetical 'blaOXAB-1'
+            if _TERMINAL in node and not nxt.isalpha():
+                found = node[_TERMINAL]
+        return found
+
+
+def default_gene_index() -> GeneIndex:
+    index = GeneIndex()
+    for family in _BLA_FAMILIES:
+        index.add_family(f"bla{family}")
+    return index
+
+
+def load_gene_index(path: str | None = None) -> GeneIndex:
+    """
+    Build a GeneIndex from a mapping file layered over the built-in bla families.
+
+    TSV/CSV files need 'alias' and 'canonical' columns (optional 'family');
+    JSON may be a {alias: canonical} object or a list of such records.
+    """
+    index = default_gene_index()
+    if not path:
+        return index
+
+    p = Path(path)
+    if not p.exists():
+        raise GeneIndexError(f"Gene alias file not found: {path}")
+
+    if p.suffix.lower() == ".json":
+        data = json.loads(p.read_text(encoding="utf-8"))
+        records = [{"alias": k, "canonical": v} for k, v in data.items()] if isinstance(data, dict) else data
+    else:
+        with p.open(encoding="utf-8", newline="") as fh:
+            records = list(csv.DictReader(fh, delimiter="," if p.suffix.lower() == ".csv" else "\t"))
+
+    for rec in records:
+        if not isinstance(rec, dict) or "alias" not in rec or "canonical" not in rec:
+            raise GeneIndexError(f"Gene alias records need 'alias' and 'canonical' fields: {path}")
+        index.add_alias(str(rec["alias"]), str(rec["canonical"]), rec.get("family") or None)
+    return index
+
+
+def canonicalize_genes(df: pd.DataFrame, index: GeneIndex | None = None) -> pd.DataFrame:
+    """Add gene_canonical and gene_family columns, resolving each distinct gene name once."""
+    out = df.copy()
+    if "gene" not in out.columns:
+        out["gene"] = None
+
+    index = index or default_gene_index()
+    codes, uniques = pd.factorize(out["gene"])
+    resolved = [index.resolve(v) for v in uniques] + [(None, None)]
+    lookup = pd.DataFrame(resolved, columns=["gene_canonical", "gene_family"], dtype=object)
+
+    out["gene_canonical"] = lookup["gene_canonical"].to_numpy()[codes]
+    out["gene_family"] = lookup["gene_family"].to_numpy()[codes]
+    return out
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import hashlib
+
+import pandas as pd
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    """Content hash of a table (column names, order and values; index ignored)."""
+    h = hashlib.sha256("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    if len(df):
+        h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def row_hashes(df: pd.DataFrame, columns: list[str]) -> pd.Series:
+    """Per-row uint64 hashes over the given columns, aligned to df's index."""
+    if not columns:
+        return pd.Series(0, index=df.index, dtype="uint64")
+    return pd.util.hash_pandas_object(df[columns], index=False).set_axis(df.index)
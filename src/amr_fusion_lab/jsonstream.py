@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+from .compression import open_text
+
+# Characters read from the (decompressed) stream per refill
+_CHUNK_CHARS = 1024 * 1024
+
+# Largest single member (e.g. one RGI ORF) buffered before the document is rejected as truncated or malformed
+MAX_MEMBER_CHARS = 256 * 1024 * 1024
+
+_WHITESPACE = " \t\r\n"
+
+
+class JsonStreamError(ValueError):
+    pass
+
+
+def iter_object_items(path: str | Path, key_path: tuple[str, ...] = ()) -> Iterator[tuple[str, Any]]:
+    """
+    Yield (key, value) for each member of the JSON object at ``key_path``, one member at a time.
+
+    Only the member currently being decoded is held in memory, so documents of
+    any size stream in bounded memory as long as each member is small (e.g. one
+    RGI ORF, one ResFinder seq_region). Members outside ``key_path`` are decoded
+    and dropped. Compressed inputs are decompressed on the fly.
+    """
+    with open_text(path) as fh:
+        yield from _Reader(fh).object_items(key_path)
+
+
+class _Reader:
+    def __init__(self, fh: IO[str]):
+        self.fh = fh
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def object_items(self, key_path: tuple[str, ...]) -> Iterator[tuple[str, Any]]:
+        self._expect("{")
+        if self._peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self._decode()
+            if not isinstance(key, str):
+                raise JsonStreamError(f"Expected an object key, got {key!r}")
+            self._expect(":")
+            if key_path:
+                if key == key_path[0] and self._peek() == "{":
+                    yield from self.object_items(key_path[1:])
+                else:
+                    self._decode()
+            else:
+                yield key, self._decode()
+            sep = self._peek()
+            self.pos += 1
+            if sep == "}":
+                return
+            if sep != ",":
+                raise JsonStreamError(f"Expected ',' or '}}' in object, got {sep!r}")
+
+    def _fill(self, size: int | None = None) -> bool:
+        if self.eof:
+            return False
+        # drop consumed text so the buffer only ever holds the current member
+        self.buf = self.buf[self.pos :]
+        self.pos = 0
+        chunk = self.fh.read(size or _CHUNK_CHARS)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise JsonStreamError("Unexpected end of JSON document")
+
+    def _expect(self, ch: str) -> None:
+        got = self._peek()
+        if got != ch:
+            raise JsonStreamError(f"Expected {ch!r}, got {got!r}")
+        self.pos += 1
+
+    def _decode(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if not self._grow():
+                    raise JsonStreamError(f"Malformed JSON: {e}") from e
+                continue
+            # a number or literal ending exactly at the buffer edge may continue in the next chunk
+            if end == len(self.buf) and self._grow():
+                continue
+            self.pos = end
+            return value
+
+    def _grow(self) -> bool:
+        """Read more of an incomplete member; the read doubles the pending text so re-decoding stays linear."""
+        pending = len(self.buf) - self.pos
+        if pending >= MAX_MEMBER_CHARS:
+            raise JsonStreamError(
+                f"JSON member exceeds {MAX_MEMBER_CHARS} characters without completing; the file is truncated or malformed"
+            )
+        return self._fill(max(_CHUNK_CHARS, pending))
@@ -1,6 +1,14 @@
 from __future__ import annotations
 
+import csv
+import hashlib
+import json
+import os
+import pickle
 import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
 import pandas as pd
 
 # Lightweight harmonization dictionary (extend over time)
@@ -17,33 +25,293 @@ _DRUG_CLASS_SYNONYMS = {
     "phenicol": ["phenicol", "chloramphenicol"],
 }
 
+# Bump when the OntologyIndex layout changes so stale caches are ignored
+ONTOLOGY_INDEX_VERSION = 2
+
+# Longest multi-word synonym considered during token lookups
+_MAX_NGRAM = 6
+
+# Shortest synonym matched as a substring (e.g. 'sulfa' in 'sulfamethoxazole'); shorter ones only match whole tokens
+_MIN_SUBSTRING = 4
+
+_TOKEN_RE = re.compile(r"[^\s;,()\[\]]+")
+
+
+class OntologyError(ValueError):
+    pass
+
+
+@dataclass
+class OntologyIndex:
+    """Compiled drug-class lookup: exact-match map, token n-gram and substring lookups, and parent roll-ups."""
+
+    exact: dict[str, str] = field(default_factory=dict)
+    rank: dict[str, int] = field(default_factory=dict)
+    parents: dict[str, str] = field(default_factory=dict)
+    roots: dict[str, str] = field(default_factory=dict)
+    max_ngram: int = 1
+    substring_lengths: tuple[int, ...] = ()
+    sources: list[str] = field(default_factory=list)
+
+    def add_term(self, canonical: str, synonyms: list[str] | tuple[str, ...] = (), parent: str | None = None) -> None:
+        canonical = _clean(canonical)
+        if not canonical:
+            return
+        self.rank.setdefault(canonical, len(self.rank))
+        for variant in [canonical, *synonyms]:
+            key = _clean(variant)
+            if key:
+                self.exact[key] = canonical
+                self.max_ngram = min(_MAX_NGRAM, max(self.max_ngram, len(key.split(" "))))
+        if parent:
+            parent = _clean(parent)
+            if parent and parent != canonical:
+                self.rank.setdefault(parent, len(self.rank))
+                self.exact.setdefault(parent, parent)
+                self.parents[canonical] = parent
+
+    def finalize(self) -> OntologyIndex:
+        """Precompute top-level roll-ups and the synonym lengths probed by the substring lookup."""
+        self.roots = {c: self._walk_to_root(c) for c in self.rank}
+        self.substring_lengths = tuple(sorted({len(k) for k in self.exact if len(k) >= _MIN_SUBSTRING}))
+        return self
+
+    def normalize(self, value: object) -> str | None:
+        if value is None:
+            return None
+        text = _clean(str(value))
+        if not text:
+            return None
+
+        hit = self.exact.get(text)
+        if hit is not None:
+            return hit
+
+        # token n-grams: O(tokens * max_ngram) hash probes, earliest-defined class wins
+        tokens = _TOKEN_RE.findall(text)
+        best = None
+        for n in range(1, self.max_ngram + 1):
+            for i in range(len(tokens) - n + 1):
+                hit = self.exact.get(" ".join(tokens[i : i + n]))
+                if hit is not None and (best is None or self.rank[hit] < self.rank[best]):
+                    best = hit
 
-def harmonize_drug_classes(df: pd.DataFrame) -> pd.DataFrame:
+        # substrings ('beta-lactams', 'sulfamethoxazole'): O(len(text) * distinct synonym lengths) hash probes;
+        # ranked together with the token matches so 'tetracycline; beta-lactams' still resolves to beta-lactam
+        for n in self.substring_lengths:
+            if n > len(text):
+                break
+            for i in range(len(text) - n + 1):
+                hit = self.exact.get(text[i : i + n])
+                if hit is not None and (best is None or self.rank[hit] < self.rank[best]):
+                    best = hit
+        if best is not None:
+            return best
+
+        # fallback: keep cleaned string for traceability
+        return text
+
+    def _walk_to_root(self, canonical: str) -> str:
+        seen = {canonical}
+        node = canonical
+        while node in self.parents and self.parents[node] not in seen:
+            node = self.parents[node]
+            seen.add(node)
+        return node
+
+
+def harmonize_drug_classes(df: pd.DataFrame, index: OntologyIndex | None = None) -> pd.DataFrame:
     """Add standardized drug class column for cross-tool comparability."""
     out = df.copy()
     if "drug_class" not in out.columns:
         out["drug_class"] = None
 
-    out["drug_class_normalized"] = out["drug_class"].apply(_normalize_single)
+    index = index or default_index()
+
+    # resolve each distinct raw value once, then broadcast by code
+    codes, uniques = pd.factorize(out["drug_class"])
+    resolved = [index.normalize(v) for v in uniques] + [None]
+    normalized = pd.Series(resolved, dtype=object).to_numpy()[codes]
+    out["drug_class_normalized"] = normalized
+
+    if index.parents:
+        out["drug_class_parent"] = [index.roots.get(v, v) if v is not None else None for v in normalized]
     return out
 
 
-def _normalize_single(value: object) -> str | None:
-    if value is None:
-        return None
-    text = str(value).strip().lower()
-    if not text:
-        return None
+_DEFAULT_INDEX: OntologyIndex | None = None
+
+
+def default_index() -> OntologyIndex:
+    """Index built from the bundled synonym table."""
+    global _DEFAULT_INDEX
+    if _DEFAULT_INDEX is None:
+        _DEFAULT_INDEX = _builtin_index()
+    return _DEFAULT_INDEX
+
+
+def compile_ontology(
+    paths: list[str] | tuple[str, ...],
+    include_builtin: bool = True,
+    cache_dir: str | None = None,
+) -> OntologyIndex:
+    """
+    Compile OBO/JSON/TSV ontology files into an OntologyIndex.
+
+    The compiled index is cached on disk keyed by the index version and the
+    source files' paths, sizes and mtimes, so later runs skip re-parsing.
+    Pass cache_dir="" to disable caching.
+    """
+    if not paths:
+        return default_index()
 
+    for path in paths:
+        if not Path(path).exists():
+            raise OntologyError(f"Ontology file not found: {path}")
+
+    cache_path = _cache_path(paths, include_builtin, cache_dir)
+    if cache_path is not None:
+        cached = _load_cached(cache_path)
+        if cached is not None:
+            return cached
+
+    index = _builtin_index() if include_builtin else OntologyIndex()
+    for path in paths:
+        _load_into(index, path)
+        index.sources.append(str(path))
+    index.finalize()
+
+    if cache_path is not None:
+        _store_cached(cache_path, index)
+    return index
+
+
+def _builtin_index() -> OntologyIndex:
+    index = OntologyIndex(sources=["builtin"])
+    for canonical, variants in _DRUG_CLASS_SYNONYMS.items():
+        index.add_term(canonical, variants)
+    return index.finalize()
+
+
+def _clean(text: str) -> str:
+    text = str(text).strip().lower()
     # normalize separators
     text = re.sub(r"[_/]+", " ", text)
-    text = re.sub(r"\s+", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _load_into(index: OntologyIndex, path: str) -> None:
+    suffix = Path(path).suffix.lower()
+    if suffix == ".obo":
+        _load_obo(index, path)
+    elif suffix == ".json":
+        _load_json(index, path)
+    elif suffix in {".tsv", ".csv", ".txt"}:
+        _load_table(index, path)
+    else:
+        raise OntologyError(f"Unsupported ontology format: {path} (use .obo, .json, .tsv or .csv)")
+
+
+def _load_obo(index: OntologyIndex, path: str) -> None:
+    terms: list[dict] = []
+    current: dict | None = None
+    for raw in Path(path).read_text(encoding="utf-8").splitlines():
+        line = raw.strip()
+        if line.startswith("["):
+            current = {"synonyms": [], "is_a": []} if line == "[Term]" else None
+            if current is not None:
+                terms.append(current)
+            continue
+        if current is None or ":" not in line:
+            continue
+        key, _, value = line.partition(":")
+        value = value.strip()
+        if key == "id":
+            current["id"] = value
+        elif key == "name":
+            current["name"] = value
+        elif key == "synonym" and value.startswith('"'):
+            current["synonyms"].append(value[1:].split('"', 1)[0])
+        elif key == "is_a":
+            current["is_a"].append(value.split("!", 1)[0].strip())
+        elif key == "is_obsolete" and value == "true":
+            current["obsolete"] = True
+
+    names = {t["id"]: t["name"] for t in terms if "id" in t and "name" in t}
+    for t in terms:
+        if "name" not in t or t.get("obsolete"):
+            continue
+        parent = names.get(t["is_a"][0]) if t["is_a"] else None
+        index.add_term(t["name"], t["synonyms"] + ([t["id"]] if "id" in t else []), parent)
+
+
+def _load_json(index: OntologyIndex, path: str) -> None:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if isinstance(data, dict) and "classes" in data:
+        data = data["classes"]
+
+    if isinstance(data, list):
+        for entry in data:
+            if not isinstance(entry, dict) or "name" not in entry:
+                raise OntologyError(f"Ontology JSON entries need a 'name' key: {path}")
+            index.add_term(entry["name"], entry.get("synonyms", []), entry.get("parent"))
+    elif isinstance(data, dict):
+        for canonical, spec in data.items():
+            if isinstance(spec, dict):
+                index.add_term(canonical, spec.get("synonyms", []), spec.get("parent"))
+            else:
+                index.add_term(canonical, list(spec or []))
+    else:
+        raise OntologyError(f"Ontology JSON must be an object or a list: {path}")
+
+
+def _load_table(index: OntologyIndex, path: str) -> None:
+    with open(path, encoding="utf-8", newline="") as fh:
+        sample = fh.readline()
+        fh.seek(0)
+        delimiter = "," if path.lower().endswith(".csv") else "\t"
+        if delimiter not in sample and "," in sample:
+            delimiter = ","
+        reader = csv.DictReader(fh, delimiter=delimiter)
+        if not reader.fieldnames or "canonical" not in reader.fieldnames:
+            raise OntologyError(f"Ontology table needs a 'canonical' column (optional: synonym, parent): {path}")
+        for row in reader:
+            synonym = (row.get("synonym") or "").strip()
+            index.add_term(row["canonical"], [synonym] if synonym else [], (row.get("parent") or "").strip() or None)
+
+
+def _cache_path(paths, include_builtin: bool, cache_dir: str | None) -> Path | None:
+    if cache_dir == "":
+        return None
+    root = Path(cache_dir or os.getenv("AMR_FUSION_CACHE_DIR") or Path.home() / ".cache" / "amr-fusion-lab")
+
+    h = hashlib.sha256(f"v{ONTOLOGY_INDEX_VERSION}|builtin={include_builtin}".encode())
+    if include_builtin:
+        h.update(json.dumps(_DRUG_CLASS_SYNONYMS, sort_keys=True).encode())
+    for path in paths:
+        st = os.stat(path)
+        h.update(f"|{Path(path).resolve()}|{st.st_size}|{st.st_mtime_ns}".encode())
+    return root / "ontology" / f"{h.hexdigest()[:32]}.idx"
+
+
+def _load_cached(path: Path) -> OntologyIndex | None:
+    try:
+        with path.open("rb") as fh:
+            payload = pickle.load(fh)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    if not isinstance(payload, dict) or payload.get("version") != ONTOLOGY_INDEX_VERSION:
+        return None
+    return payload.get("index")
 
-    for canonical, variants in _DRUG_CLASS_SYNONYMS.items():
-        if text == canonical:
-            return canonical
-        if any(v in text for v in variants):
-            return canonical
 
-    # fallback: keep cleaned string for traceability
-    return text
+def _store_cached(path: Path, index: OntologyIndex) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp.open("wb") as fh:
+            pickle.dump({"version": ONTOLOGY_INDEX_VERSION, "index": index}, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError:
+        # caching is best-effort; an unwritable cache dir must not fail the run
+        pass
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import math
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from .compression import detect_compression, read_output_csv, uncompressed_size
+from .fusion import GENE_LEVELS, build_disagreement_table, build_gene_summary
+from .genes import GeneIndex, canonicalize_genes
+
+# Columns build_gene_summary reads; everything else is dropped while spilling
+_FUSION_COLUMNS = [
+    "sample_id",
+    "tool",
+    "gene",
+    "gene_canonical",
+    "gene_family",
+    "drug_class_normalized",
+    "identity",
+    "coverage",
+    "confidence_score",
+]
+
+# Key columns read as strings so a value hashes to the same partition whatever dtype a chunk would infer
+_STRING_COLUMNS = {"sample_id": str, "tool": str, "gene": str, "gene_canonical": str, "gene_family": str}
+
+# In-memory DataFrame size relative to on-disk CSV size (object columns dominate)
+_EXPANSION_FACTOR = 4
+
+# Typical CSV compression ratio, used for compressed tables that do not record their decompressed size
+_COMPRESSION_RATIO = 8
+
+
+def discover_fused_tables(paths: list[str]) -> list[Path]:
+    """Expand directories into the *.amr_fused.csv tables they contain."""
+    found: list[Path] = []
+    for raw in paths:
+        p = Path(raw)
+        if p.is_dir():
+            found.extend(sorted(p.rglob("*.amr_fused.csv*")))
+        elif p.exists():
+            found.append(p)
+        else:
+            raise FileNotFoundError(f"Input not found: {raw}")
+    return found
+
+
+def fuse_out_of_core(
+    inputs: list[str],
+    outdir: str,
+    memory_budget_mb: int = 512,
+    partitions: int | None = None,
+    level: str = "gene",
+    gene_index: GeneIndex | None = None,
+    workdir: str | None = None,
+    chunksize: int | None = None,
+) -> dict[str, Any]:
+    """
+    Fuse scored hits that do not fit in memory.
+
+    Hits are streamed in chunks sized to the memory budget, hash-partitioned on
+    (sample_id, gene key) into on-disk spill files, and each partition is fused
+    independently with build_gene_summary/build_disagreement_table. Because a
+    (sample_id, gene) group never spans partitions, the appended results match
+    an in-memory run row for row. With ``gene_index`` the gene_canonical /
+    gene_family keys are recomputed instead of taken from the inputs.
+    """
+    if level not in GENE_LEVELS:
+        raise ValueError(f"Unsupported gene level: {level}. Use one of: {', '.join(GENE_LEVELS)}")
+    files = discover_fused_tables(inputs)
+    if not files:
+        raise ValueError("No fused hit tables found in the given inputs")
+
+    budget = max(1, memory_budget_mb) * 1024 * 1024
+    total_bytes = sum(_csv_bytes(f) for f in files)
+    if partitions is None:
+        partitions = max(1, math.ceil(total_bytes * _EXPANSION_FACTOR / budget))
+    if chunksize is None:
+        chunksize = _chunk_rows(files[0], budget)
+
+    key = GENE_LEVELS[level]
+    out = Path(outdir)
+    out.mkdir(parents=True, exist_ok=True)
+    summary_path = out / "cohort.gene_summary.csv"
+    disagreements_path = out / "cohort.disagreements.csv"
+
+    rows_in = 0
+    with tempfile.TemporaryDirectory(prefix="amr-fusion-spill-", dir=workdir) as tmp:
+        spill_paths = [Path(tmp) / f"part-{i:05d}.pkl" for i in range(partitions)]
+        for f in files:
+            for chunk in read_output_csv(
+                f, chunksize=chunksize, usecols=lambda c: c in _FUSION_COLUMNS, dtype=_STRING_COLUMNS
+            ):
+                rows_in += len(chunk)
+                if gene_index is not None or key not in chunk.columns:
+                    chunk = canonicalize_genes(chunk, gene_index)
+                part = pd.util.hash_pandas_object(chunk[["sample_id", key]], index=False).to_numpy() % partitions
+                for i, piece in chunk.groupby(part, sort=False):
+                    # append-open per piece keeps file descriptors bounded for large partition counts
+                    with spill_paths[int(i)].open("ab") as fh:
+                        pickle.dump(piece, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+        genes_out = disagreements_out = 0
+        for path in spill_paths:
+            if not path.exists():
+                continue
+            pieces = list(_read_spill(path))
+            path.unlink()
+            summary = build_gene_summary(pd.concat(pieces, ignore_index=True), level=level)
+            disagreements = build_disagreement_table(summary)
+            first = genes_out == 0
+            summary.to_csv(summary_path, mode="w" if first else "a", header=first, index=False)
+            disagreements.to_csv(disagreements_path, mode="w" if first else "a", header=first, index=False)
+            genes_out += len(summary)
+            disagreements_out += len(disagreements)
+
+    if genes_out == 0:
+        empty = build_gene_summary(pd.DataFrame())
+        empty.to_csv(summary_path, index=False)
+        empty.to_csv(disagreements_path, index=False)
+
+    return {
+        "input_files": len(files),
+        "input_rows": rows_in,
+        "partitions": partitions,
+        "chunksize": chunksize,
+        "gene_summary_rows": genes_out,
+        "disagreement_rows": disagreements_out,
+        "gene_summary": str(summary_path),
+        "disagreements": str(disagreements_path),
+    }
+
+
+def _chunk_rows(sample_file: Path, budget: int) -> int:
+    """Size read chunks so one chunk plus its partition copies stays well inside the budget."""
+    probe = read_output_csv(sample_file, nrows=1000, usecols=lambda c: c in _FUSION_COLUMNS, dtype=_STRING_COLUMNS)
+    per_row = max(1, int(probe.memory_usage(deep=True).sum() / max(1, len(probe))))
+    return max(1000, budget // (4 * per_row))
+
+
+def _csv_bytes(path: Path) -> int:
+    size = path.stat().st_size
+    if detect_compression(path) is None:
+        return size
+    known = uncompressed_size(path)
+    return known if known is not None else size * _COMPRESSION_RATIO
+
+
+def _read_spill(path: Path):
+    with path.open("rb") as fh:
+        while True:
+            try:
+                yield pickle.load(fh)
+            except EOFError:
+                return
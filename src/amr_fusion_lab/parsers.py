@@ -1,80 +1,395 @@
 from __future__ import annotations
 
+import hashlib
+import io
+import os
+import tempfile
+from typing import IO, Any, Iterable, Iterator, Union
+
 import pandas as pd
 
+from .compression import (
+    MMAP_THRESHOLD_BYTES,
+    detect_compression,
+    input_delimiter,
+    pandas_compression,
+    read_head,
+    strip_compression_suffix,
+)
+from .jsonstream import iter_object_items
 
-def parse_resfinder(path: str, sample_id: str) -> pd.DataFrame:
-    """Parse a simplified ResFinder TSV/CSV export into canonical schema."""
-    df = _read_any(path)
-    mapping = {
-        "Gene": "gene",
-        "Resistance gene": "gene",
-        "%Identity": "identity",
-        "Identity": "identity",
-        "%Coverage": "coverage",
-        "Coverage": "coverage",
-        "Phenotype": "drug_class",
-    }
-    out = _canonicalize(df, mapping)
-    out["sample_id"] = sample_id
+# A tool output given as a path, raw/compressed bytes, a readable buffer, or an already-loaded table
+InputSource = Union[str, "os.PathLike[str]", bytes, IO, pd.DataFrame]
+
+# Source column -> canonical column for each tool's tabular export
+RESFINDER_COLUMNS = {
+    "Gene": "gene",
+    "Resistance gene": "gene",
+    "%Identity": "identity",
+    "Identity": "identity",
+    "%Coverage": "coverage",
+    "Coverage": "coverage",
+    "Phenotype": "drug_class",
+}
+
+AMRFINDER_COLUMNS = {
+    "Gene symbol": "gene",
+    "Gene": "gene",
+    "% Identity to reference sequence": "identity",
+    "% Coverage of reference sequence": "coverage",
+    "Class": "drug_class",
+    "Subclass": "drug_class",
+}
+
+RGI_COLUMNS = {
+    "Best_Hit_ARO": "gene",
+    "Best Hit ARO": "gene",
+    "Drug Class": "drug_class",
+    "% Identity": "identity",
+    "% Length of Reference Sequence": "coverage",
+}
+
+ABRICATE_COLUMNS = {
+    "GENE": "gene",
+    "%IDENTITY": "identity",
+    "%COVERAGE": "coverage",
+    "RESISTANCE": "drug_class",
+}
+
+CANONICAL_COLUMNS = ["gene", "drug_class", "identity", "coverage"]
+
+PARSER_COLUMNS = {
+    "resfinder": RESFINDER_COLUMNS,
+    "amrfinder": AMRFINDER_COLUMNS,
+    "rgi": RGI_COLUMNS,
+    "abricate": ABRICATE_COLUMNS,
+}
+
+# Tools whose native JSON output can be parsed (AMRFinderPlus only writes TSV)
+JSON_TOOLS = ("resfinder", "rgi")
+
+# Canonical rows accumulated per DataFrame while streaming JSON inputs
+JSON_BATCH_ROWS = 10_000
+
+# Readable buffers larger than this are spooled to a temporary file (then streamed/memory-mapped) instead of held as bytes
+SPOOL_THRESHOLD_BYTES = 16 * 1024 * 1024
+
+_SPOOL_CHUNK_BYTES = 1024 * 1024
+
+# Sample IDs name per-sample output directories and files, so they may not contain path separators
+_PATH_SEPARATORS = ("/", "\\")
+
+
+def parse_resfinder(
+    path: InputSource,
+    sample_id: str | None = None,
+    sample_column: str | None = None,
+    columns: dict[str, str] | None = None,
+    sep: str | None = None,
+) -> pd.DataFrame:
+    """
+    Parse a simplified ResFinder TSV/CSV export (or ResFinder 4 JSON) into canonical schema.
+
+    A detected column mapping (``columns``) and delimiter (``sep``) are reused instead of re-reading the input.
+    """
+    path = as_input_source(path)
+    if sep is None and is_json_input(path):
+        out = _from_json_batches(iter_resfinder_json(path), sample_column)
+    else:
+        out = _canonicalize(_read_any(path, sep), columns or RESFINDER_COLUMNS, sample_column, columns is not None)
+    out = _assign_sample(out, sample_id, sample_column)
     out["tool"] = "resfinder"
     return out
 
 
-def parse_amrfinder(path: str, sample_id: str) -> pd.DataFrame:
-    """Parse a simplified AMRFinder TSV/CSV export into canonical schema."""
-    df = _read_any(path)
-    mapping = {
-        "Gene symbol": "gene",
-        "Gene": "gene",
-        "% Identity to reference sequence": "identity",
-        "% Coverage of reference sequence": "coverage",
-        "Class": "drug_class",
-        "Subclass": "drug_class",
-    }
-    out = _canonicalize(df, mapping)
-    out["sample_id"] = sample_id
+def parse_amrfinder(
+    path: InputSource,
+    sample_id: str | None = None,
+    sample_column: str | None = None,
+    columns: dict[str, str] | None = None,
+    sep: str | None = None,
+) -> pd.DataFrame:
+    """Parse a simplified AMRFinder TSV/CSV export into canonical schema (``columns``/``sep`` as for parse_resfinder)."""
+    df = _read_any(as_input_source(path), sep)
+    out = _canonicalize(df, columns or AMRFINDER_COLUMNS, sample_column, columns is not None)
+    out = _assign_sample(out, sample_id, sample_column)
     out["tool"] = "amrfinder"
     return out
 
 
-def parse_rgi(path: str, sample_id: str) -> pd.DataFrame:
-    """Parse a simplified RGI TSV export into canonical schema."""
-    df = _read_any(path)
-    mapping = {
-        "Best_Hit_ARO": "gene",
-        "Best Hit ARO": "gene",
-        "Drug Class": "drug_class",
-        "% Identity": "identity",
-        "% Length of Reference Sequence": "coverage",
-    }
-    out = _canonicalize(df, mapping)
+def parse_rgi(
+    path: InputSource,
+    sample_id: str | None = None,
+    sample_column: str | None = None,
+    columns: dict[str, str] | None = None,
+    sep: str | None = None,
+) -> pd.DataFrame:
+    """Parse a simplified RGI TSV export (or RGI main JSON output) into canonical schema (``columns``/``sep`` as for parse_resfinder)."""
+    path = as_input_source(path)
+    if sep is None and is_json_input(path):
+        out = _from_json_batches(iter_rgi_json(path), sample_column)
+    else:
+        out = _canonicalize(_read_any(path, sep), columns or RGI_COLUMNS, sample_column, columns is not None)
+        # RGI Best_Hit_ARO may look like 'ARO:3000001|blaTEM-1'
+        out["gene"] = out["gene"].astype(str).str.split("|").str[-1]
 
-    # RGI Best_Hit_ARO may look like 'ARO:3000001|blaTEM-1'
-    out["gene"] = out["gene"].astype(str).str.split("|").str[-1]
-
-    out["sample_id"] = sample_id
+    out = _assign_sample(out, sample_id, sample_column)
     out["tool"] = "rgi"
     return out
 
 
-def _read_any(path: str) -> pd.DataFrame:
-    if path.lower().endswith(".csv"):
-        return pd.read_csv(path)
-    return pd.read_csv(path, sep=None, engine="python")
+def parse_abricate(
+    path: InputSource,
+    sample_id: str | None = None,
+    sample_column: str | None = None,
+    columns: dict[str, str] | None = None,
+    sep: str | None = None,
+) -> pd.DataFrame:
+    """Parse an ABRicate report (one sample, or a concatenated report with ``sample_column="#FILE"``)."""
+    df = _read_any(as_input_source(path), sep)
+    out = _canonicalize(df, columns or ABRICATE_COLUMNS, sample_column, columns is not None)
+    out = _assign_sample(out, sample_id, sample_column)
+    out["tool"] = "abricate"
+    return out
+
+
+def split_by_sample(df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Split a canonical multi-sample table into per-sample tables in one groupby pass."""
+    if df.empty or "sample_id" not in df.columns:
+        return {}
+    check_sample_ids(df["sample_id"].unique())
+    return {
+        str(sample_id): group.reset_index(drop=True)
+        for sample_id, group in df.groupby("sample_id", sort=False)
+    }
+
+
+def check_sample_ids(sample_ids: Iterable[Any]) -> None:
+    """Reject missing sample IDs and IDs that are unsafe as directory/file names ('..', path separators)."""
+    for sid in sample_ids:
+        if sid is None or (isinstance(sid, float) and sid != sid) or sid is pd.NA:
+            raise ValueError("Missing sample ID in the sample column; every row needs a sample ID")
+        text = str(sid)
+        if not text.strip() or text in (".", "..") or any(sep in text for sep in _PATH_SEPARATORS):
+            raise ValueError(f"Invalid sample ID {text!r}: sample IDs name output directories and may not be empty, '.', '..' or contain path separators")
+
+
+def is_json_input(path: str | bytes | pd.DataFrame) -> bool:
+    """True for .json(.gz/...) inputs or files whose first non-blank character opens a JSON object."""
+    if isinstance(path, pd.DataFrame):
+        return False
+    if strip_compression_suffix(path).lower().endswith(".json"):
+        return True
+    try:
+        return read_head(path, size=256).lstrip().startswith("{")
+    except (OSError, ValueError):
+        return False
+
+
+def iter_rgi_json(path: str | bytes, batch_rows: int = JSON_BATCH_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Stream RGI's main JSON output as canonical DataFrame batches.
+
+    The document maps ORF -> {hit id -> hit}; each ORF is decoded on its own
+    and reduced to its best hit (highest bit_score), matching the tabular
+    export's Best_Hit_ARO row.
+    """
+
+    def rows() -> Iterator[dict[str, Any]]:
+        for orf, hits in iter_object_items(path):
+            if orf.startswith("_") or not isinstance(hits, dict):
+                continue  # _metadata and other non-ORF members
+            candidates = [h for h in hits.values() if isinstance(h, dict)]
+            if not candidates:
+                continue
+            best = max(candidates, key=lambda h: _as_float(h.get("bit_score")) or 0.0)
+            yield {
+                "gene": best.get("ARO_name") or best.get("model_name"),
+                "drug_class": _rgi_drug_classes(best.get("ARO_category")),
+                "identity": _as_float(best.get("perc_identity")),
+                "coverage": _as_float(best.get("percentage_length_reference_sequence")),
+            }
 
+    return _batched(rows(), batch_rows)
 
-def _canonicalize(df: pd.DataFrame, mapping: dict[str, str]) -> pd.DataFrame:
-    renamed = {}
-    for col in df.columns:
-        if col in mapping:
-            renamed[col] = mapping[col]
-    out = df.rename(columns=renamed).copy()
 
-    for c in ["gene", "drug_class", "identity", "coverage"]:
+def iter_resfinder_json(path: str | bytes, batch_rows: int = JSON_BATCH_ROWS) -> Iterator[pd.DataFrame]:
+    """Stream the seq_regions of a ResFinder 4 JSON result as canonical DataFrame batches."""
+
+    def rows() -> Iterator[dict[str, Any]]:
+        for _, region in iter_object_items(path, ("seq_regions",)):
+            if not isinstance(region, dict):
+                continue
+            phenotypes = region.get("phenotypes") or []
+            yield {
+                "gene": region.get("name"),
+                "drug_class": ", ".join(map(str, phenotypes)) if isinstance(phenotypes, list) else phenotypes,
+                "identity": _as_float(region.get("identity")),
+                "coverage": _as_float(region.get("coverage")),
+            }
+
+    return _batched(rows(), batch_rows)
+
+
+def _rgi_drug_classes(categories: Any) -> str | None:
+    if not isinstance(categories, dict):
+        return None
+    names = [
+        c.get("category_aro_name")
+        for c in categories.values()
+        if isinstance(c, dict) and c.get("category_aro_class_name") == "Drug Class"
+    ]
+    return "; ".join(n for n in names if n) or None
+
+
+def _as_float(value: Any) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _batched(rows: Iterable[dict[str, Any]], batch_rows: int) -> Iterator[pd.DataFrame]:
+    batch: list[dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_rows:
+            yield pd.DataFrame(batch, columns=CANONICAL_COLUMNS)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch, columns=CANONICAL_COLUMNS)
+
+
+def _from_json_batches(batches: Iterator[pd.DataFrame], sample_column: str | None) -> pd.DataFrame:
+    if sample_column is not None:
+        raise ValueError("sample_column is not supported for JSON inputs; they hold a single sample")
+    frames = list(batches)
+    if not frames:
+        return pd.DataFrame(columns=CANONICAL_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+class SpooledInput(str):
+    """Path of a temporary copy of a readable buffer; the file is removed once the path object is garbage collected."""
+
+    def __new__(cls, tmpdir: tempfile.TemporaryDirectory, name: str, sha256: str):
+        path = super().__new__(cls, os.path.join(tmpdir.name, name))
+        path._tmpdir = tmpdir
+        # content digest, so checkpoints key spooled buffers like in-memory bytes
+        path.sha256 = sha256
+        return path
+
+
+def as_input_source(source: InputSource) -> str | bytes | pd.DataFrame:
+    """
+    Normalize an input to a path string, in-memory bytes, or a DataFrame.
+
+    Readable buffers stay streamable: an unread file object opened from disk is
+    used by its path, small buffers become bytes and larger ones are spooled to
+    a temporary file (see SpooledInput) rather than read into memory.
+    """
+    if isinstance(source, pd.DataFrame):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, "read"):
+        return _buffer_source(source)
+    return os.fspath(source)
+
+
+def _buffer_source(fh: IO) -> str | bytes:
+    name = getattr(fh, "name", None)
+    if isinstance(name, str) and os.path.isfile(name) and fh.seekable() and fh.tell() == 0:
+        return name
+
+    def read() -> bytes:
+        data = fh.read(_SPOOL_CHUNK_BYTES)
+        return data.encode("utf-8") if isinstance(data, str) else bytes(data)
+
+    head, chunk = bytearray(), read()
+    while chunk and len(head) <= SPOOL_THRESHOLD_BYTES:
+        head += chunk
+        chunk = read()
+    if not chunk:
+        return bytes(head)
+
+    tmpdir = tempfile.TemporaryDirectory(prefix="amr-fusion-input-")
+    digest = hashlib.sha256(head)
+    with open(os.path.join(tmpdir.name, "input"), "wb") as out:
+        out.write(head)
+        while chunk:
+            out.write(chunk)
+            digest.update(chunk)
+            chunk = read()
+    return SpooledInput(tmpdir, "input", digest.hexdigest())
+
+
+def _read_any(path: str | bytes | pd.DataFrame, sep: str | None = None) -> pd.DataFrame:
+    if isinstance(path, pd.DataFrame):
+        return path
+    # gzip/bz2/xz/zstd inputs are decompressed while streaming, never unpacked to disk
+    compression = detect_compression(path)
+    if sep is None:
+        sep = input_delimiter(path, lambda: read_head(path, compression=compression))
+
+    in_memory = isinstance(path, bytes)
+    memory_map = not in_memory and compression is None and os.path.getsize(path) >= MMAP_THRESHOLD_BYTES
+    return pd.read_csv(
+        # plain str: library-side caches (urlsplit) must not keep a SpooledInput (and its temp file) alive
+        io.BytesIO(path) if in_memory else str(path),
+        sep=sep,
+        compression=pandas_compression(compression),
+        memory_map=memory_map,
+    )
+
+
+def _canonicalize(
+    df: pd.DataFrame,
+    mapping: dict[str, str],
+    sample_column: str | None = None,
+    resolved: bool = False,
+) -> pd.DataFrame:
+    """
+    Rename a tool table to the canonical columns.
+
+    ``mapping`` is header column -> canonical column, or with ``resolved`` the
+    already matched canonical column -> header column of a Detection. Either
+    way the first header column for each canonical column is used.
+    """
+    if sample_column is not None and sample_column not in df.columns:
+        raise ValueError(f"Sample column '{sample_column}' not found in input columns: {list(df.columns)}")
+
+    if not resolved:
+        first: dict[str, str] = {}
+        for col in df.columns:
+            if col in mapping and col != sample_column:
+                first.setdefault(mapping[col], col)
+        mapping = first
+    renamed = {col: canonical for canonical, col in mapping.items() if col != sample_column and col in df.columns}
+    if sample_column is not None:
+        renamed[sample_column] = "sample_id"
+    out = df[list(renamed)].rename(columns=renamed)
+
+    for c in CANONICAL_COLUMNS:
         if c not in out.columns:
             out[c] = None
 
     # keep only canonical columns
-    out = out[["gene", "drug_class", "identity", "coverage"]]
+    keep = list(CANONICAL_COLUMNS)
+    if sample_column is not None:
+        keep.append("sample_id")
+    out = out[keep]
+    return out
+
+
+def _assign_sample(out: pd.DataFrame, sample_id: str | None, sample_column: str | None) -> pd.DataFrame:
+    if sample_column is not None:
+        # checked before the cast, which would turn missing IDs into the string 'nan'
+        check_sample_ids(out["sample_id"].unique())
+        out["sample_id"] = out["sample_id"].astype(str)
+        return out
+    if sample_id is None:
+        raise ValueError("Provide either sample_id or sample_column")
+    check_sample_ids([sample_id])
+    out["sample_id"] = sample_id
     return out
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    from reportlab.platypus.tableofcontents import TableOfContents
+except ImportError:  # pragma: no cover - exercised only without reportlab
+    colors = None
+
+# Gene summary columns shown in PDF tables, with their header labels
+PDF_TABLE_COLUMNS = {
+    "gene": "Gene",
+    "consensus_tier": "Tier",
+    "tool_count": "Tools",
+    "tools_detected": "Detected by",
+    "normalized_drug_classes": "Drug classes",
+    "best_identity": "Identity",
+    "best_coverage": "Coverage",
+}
+
+# Cells longer than this are wrapped as paragraphs; shorter ones stay plain strings (much cheaper to lay out)
+_WRAP_CHARS = 28
+
+# Gene rows per sample in the cohort PDF; per-sample PDFs list every gene
+COHORT_TABLE_ROWS = 60
+
+# Upper bound on PDFs handed to a worker process per task
+_MAX_BATCH = 64
+
+# Points per millimetre (reportlab.lib.units.mm, kept here so the module imports without reportlab)
+_MM = 72 / 25.4
+
+_COL_WIDTHS = [w * _MM for w in (30, 20, 12, 38, 40, 16, 18)]
+
+_MARGINS = {"leftMargin": 15 * _MM, "rightMargin": 15 * _MM, "topMargin": 15 * _MM, "bottomMargin": 15 * _MM}
+
+
+def pdf_available() -> bool:
+    return colors is not None
+
+
+def report_section(
+    sample_id: str,
+    lines: list[str],
+    gene_summary: pd.DataFrame | None,
+    max_rows: int | None = None,
+) -> dict[str, Any]:
+    """Plain data for one sample's PDF pages: summary bullet lines and gene table rows (cheap to pickle)."""
+    rows: list[list[str]] = []
+    total = 0
+    if gene_summary is not None and len(gene_summary):
+        table = gene_summary.reindex(columns=list(PDF_TABLE_COLUMNS))
+        total = len(table)
+        if max_rows is not None:
+            table = table.head(max_rows)
+        rows = table.astype(object).where(table.notna(), "").astype(str).values.tolist()
+    bullets = [line[2:] for line in lines if line.startswith("- ")]
+    return {"sample_id": sample_id, "bullets": bullets, "rows": rows, "total_rows": total}
+
+
+def render_sample_pdf(path: str | Path, section: dict[str, Any]) -> bool:
+    """Write one sample's PDF report; returns False when reportlab is not installed."""
+    if not pdf_available():
+        return False
+    styles = _styles()
+    doc = SimpleDocTemplate(str(path), pagesize=A4, **_MARGINS, title=f"AMR Fusion Report - {section['sample_id']}")
+    doc.build([Paragraph(_escape(f"AMR Fusion Report - {section['sample_id']}"), styles["title"]), *_section_body(section)])
+    return True
+
+
+def render_sample_pdfs(jobs: list[tuple[str | Path, dict[str, Any]]], workers: int | None = None) -> list[str | None]:
+    """
+    Render (path, section) sample PDFs; returns an error message, or None, per job.
+
+    Jobs render in this process unless ``workers`` > 1, in which case they go to
+    a process pool in batches so each worker builds its styles once.
+    """
+    if workers is None or workers <= 1 or len(jobs) <= 1:
+        return _render_batch(jobs)
+    size = max(1, min(_MAX_BATCH, len(jobs) // (workers * 4)))
+    batches = [jobs[i : i + size] for i in range(0, len(jobs), size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [error for batch in pool.map(_render_batch, batches) for error in batch]
+
+
+def _render_batch(jobs: list[tuple[str | Path, dict[str, Any]]]) -> list[str | None]:
+    errors: list[str | None] = []
+    for path, section in jobs:
+        try:
+            render_sample_pdf(path, section)
+            errors.append(None)
+        except Exception as e:  # reported per sample; the rest of the batch still renders
+            errors.append(f"{type(e).__name__}: {e}")
+    return errors
+
+
+def render_cohort_pdf(path: str | Path, sections: list[dict[str, Any]]) -> bool:
+    """Write one PDF covering many samples, with a table of contents; returns False without reportlab."""
+    if not pdf_available():
+        return False
+    styles = _styles()
+    toc = TableOfContents()
+    toc.levelStyles = [styles["toc"]]
+    story: list[Any] = [Paragraph("AMR Fusion Cohort Report", styles["title"]), Spacer(1, 4 * _MM), toc]
+    for section in sections:
+        story.append(PageBreak())
+        story.append(Paragraph(_escape(section["sample_id"]), styles["sample"]))
+        story.extend(_section_body(section))
+    doc = _CohortDocTemplate(str(path), pagesize=A4, **_MARGINS, title="AMR Fusion Cohort Report")
+    # the table of contents needs a second pass to fill in page numbers
+    doc.multiBuild(story)
+    return True
+
+
+def _section_body(section: dict[str, Any]) -> list[Any]:
+    styles = _styles()
+    body: list[Any] = [Paragraph(_escape(b).replace("**", ""), styles["bullet"]) for b in section["bullets"]]
+    body.append(Spacer(1, 3 * _MM))
+    if not section["rows"]:
+        body.append(Paragraph("No genes reported.", styles["body"]))
+        return body
+    body.append(Paragraph("Gene summary", styles["heading"]))
+    header = list(PDF_TABLE_COLUMNS.values())
+    data = [header] + [[_cell(v) for v in row] for row in section["rows"]]
+    body.append(Table(data, colWidths=_COL_WIDTHS, repeatRows=1, style=styles["table"]))
+    hidden = section["total_rows"] - len(section["rows"])
+    if hidden > 0:
+        body.append(Paragraph(f"... {hidden} more genes in the gene_summary table.", styles["body"]))
+    return body
+
+
+def _cell(value: str) -> Any:
+    if len(value) <= _WRAP_CHARS:
+        return value
+    # break list-like cells after separators so long drug class lists wrap inside the column
+    return Paragraph(_escape(value).replace(",", ", ").replace(";", "; "), _styles()["cell"])
+
+
+def _escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+@lru_cache(maxsize=1)
+def _styles() -> dict[str, Any]:
+    """Paragraph and table styles, built once per process and shared by every PDF it renders."""
+    base = getSampleStyleSheet()
+    return {
+        "title": base["Title"],
+        "heading": base["Heading3"],
+        "sample": ParagraphStyle("Sample", parent=base["Heading2"]),
+        "body": base["BodyText"],
+        "bullet": ParagraphStyle("Bullet", parent=base["BodyText"], leftIndent=8, bulletIndent=0, spaceAfter=1),
+        "cell": ParagraphStyle("Cell", parent=base["BodyText"], fontSize=7.5, leading=9),
+        "toc": ParagraphStyle("TOC", parent=base["BodyText"], fontSize=9, leading=11),
+        "table": TableStyle(
+            [
+                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                ("FONTSIZE", (0, 0), (-1, -1), 7.5),
+                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#e8edf3")),
+                ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f7f7f7")]),
+                ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#b0b0b0")),
+                ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ]
+        ),
+    }
+
+
+if colors is not None:
+
+    class _CohortDocTemplate(SimpleDocTemplate):
+        """Registers each sample heading with the table of contents."""
+
+        def afterFlowable(self, flowable):
+            if isinstance(flowable, Paragraph) and flowable.style.name == "Sample":
+                text = flowable.getPlainText()
+                key = f"sample-{self.seq.nextf('sample')}"
+                self.canv.bookmarkPage(key)
+                self.canv.addOutlineEntry(text, key, level=0, closed=True)
+                self.notify("TOCEntry", (0, text, self.page, key))
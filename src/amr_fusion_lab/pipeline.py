@@ -0,0 +1,419 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+import pandas as pd
+
+from .arrow_backend import ArrowBackend, require_pyarrow, split_table_by_sample, write_parquet
+from .checkpoint import StageCache, file_fingerprint, stage_key
+from .compression import check_output_compression
+from .fusion import GENE_LEVELS, build_disagreement_table, build_gene_summary
+from .genes import GeneIndex, canonicalize_genes, load_gene_index
+from .hashing import frame_digest
+from .ontology import OntologyIndex, compile_ontology, harmonize_drug_classes
+from .parsers import InputSource, SpooledInput, as_input_source, split_by_sample
+from .pdf_reports import pdf_available, render_sample_pdfs, report_section
+from .quality import normalize_and_filter_hits
+from .registry import Detection, detect_input, get_parser
+from .reporting import markdown_summary, record_report_files, write_outputs
+from .scoring import score_hits
+from .serialization import JSON_FORMATS
+from .validation import validate_canonical_hits
+
+PIPELINE_STAGES = ["parse", "filter", "harmonize", "score", "fuse"]
+
+BACKENDS = ("pandas", "arrow")
+
+
+class PipelineError(ValueError):
+    pass
+
+
+class ValidationFailed(PipelineError):
+    def __init__(self, messages: list[str]):
+        self.messages = messages
+        super().__init__(next(m for m in messages if m.startswith("ERROR:")))
+
+
+@dataclass
+class FusionResult:
+    sample_id: str | None
+    hits: pd.DataFrame
+    gene_summary: pd.DataFrame
+    disagreements: pd.DataFrame
+    validation_messages: list[str] = field(default_factory=list)
+    timings: dict[str, float] = field(default_factory=dict)
+    run_meta: dict[str, Any] = field(default_factory=dict)
+    # Arrow tables behind hits/gene_summary when run on the arrow backend
+    tables: dict[str, Any] | None = None
+    # every sample of a multi-sample input, including samples left without hits by the filters
+    sample_ids: list[str] | None = None
+
+    def split(self) -> dict[str, "FusionResult"]:
+        """
+        Per-sample results; a single-sample result maps its sample_id to itself.
+
+        Samples whose hits were all filtered out get empty results, so they
+        still get outputs.
+        """
+        if self.sample_id is not None:
+            return {self.sample_id: self}
+        hit_parts = split_by_sample(self.hits)
+        summaries = split_by_sample(self.gene_summary)
+        disagreement_parts = split_by_sample(self.disagreements)
+        return {
+            sid: FusionResult(
+                sample_id=sid,
+                hits=hit_parts.get(sid, self.hits.iloc[0:0]),
+                gene_summary=summaries.get(sid, self.gene_summary.iloc[0:0]),
+                disagreements=disagreement_parts.get(sid, self.disagreements.iloc[0:0]),
+                validation_messages=self.validation_messages,
+                timings=self.timings,
+                run_meta=self.run_meta,
+            )
+            for sid in (self.sample_ids if self.sample_ids is not None else hit_parts)
+        }
+
+    def write(
+        self,
+        outdir: str,
+        json_format: str = "json",
+        json_pretty: bool = True,
+        run_meta: dict[str, Any] | None = None,
+        compression: str | None = None,
+        compression_level: int | None = None,
+        pdf: bool = True,
+        pdf_workers: int | None = None,
+    ) -> dict[str, str]:
+        """
+        Write report files; multi-sample results go to OUTDIR/<sample>. Returns sample_id -> output dir.
+
+        PDFs of multi-sample results are rendered afterwards in one batched
+        stage from the in-memory results, in this process or on a pool of
+        ``pdf_workers`` processes (callers using more than one worker need an
+        ``if __name__ == "__main__"`` guard on spawn platforms).
+        """
+        if json_format not in JSON_FORMATS:
+            raise PipelineError(f"json_format must be one of: {', '.join(JSON_FORMATS)}")
+        try:
+            check_output_compression(compression, compression_level)
+        except ValueError as e:
+            raise PipelineError(str(e)) from e
+        meta = {**self.run_meta, **(run_meta or {})}
+        parts = self.split()
+        parquet = self._parquet_parts(list(parts))
+        batch_pdf = pdf and self.sample_id is None and pdf_available()
+        written = {}
+        pdf_jobs = []
+        for sid, part in parts.items():
+            sample_outdir = outdir if self.sample_id is not None else str(Path(outdir) / sid)
+            extra_files = []
+            if parquet is not None:
+                Path(sample_outdir).mkdir(parents=True, exist_ok=True)
+                for stem, tables in parquet.items():
+                    write_parquet(tables[sid], Path(sample_outdir) / f"{sid}.{stem}.parquet")
+                    extra_files.append(f"{sid}.{stem}.parquet")
+            write_outputs(
+                part.hits,
+                outdir=sample_outdir,
+                sample_id=sid,
+                gene_summary=part.gene_summary,
+                disagreements=part.disagreements,
+                run_meta=meta,
+                json_format=json_format,
+                json_pretty=json_pretty,
+                extra_files=extra_files,
+                compression=compression,
+                compression_level=compression_level,
+                pdf=pdf and not batch_pdf,
+            )
+            written[sid] = sample_outdir
+            if batch_pdf:
+                lines = markdown_summary(part.hits, sid, part.gene_summary, part.disagreements).splitlines()
+                pdf_jobs.append((Path(sample_outdir) / f"{sid}.report.pdf", report_section(sid, lines, part.gene_summary)))
+        for (path, section), error in zip(pdf_jobs, render_sample_pdfs(pdf_jobs, workers=pdf_workers)):
+            sid = section["sample_id"]
+            if error:
+                raise PipelineError(f"PDF rendering failed for {sid}: {error}")
+            record_report_files(path.with_name(f"{sid}.run_manifest.json"), sid, [path.name], text=False)
+        return written
+
+    def _parquet_parts(self, sample_ids: list[str]) -> dict[str, dict[str, Any]] | None:
+        """Per-sample Arrow slices of the result tables, written to Parquet without a pandas round-trip."""
+        if not self.tables:
+            return None
+        stems = {"hits": "amr_fused", "gene_summary": "gene_summary"}
+        if self.sample_id is not None:
+            return {stems[name]: {self.sample_id: table} for name, table in self.tables.items()}
+        parts = {}
+        for name, table in self.tables.items():
+            slices = split_table_by_sample(table)
+            parts[stems[name]] = {sid: slices.get(sid, table.slice(0, 0)) for sid in sample_ids}
+        return parts
+
+
+class FusionPipeline:
+    """
+    Reusable in-process fusion pipeline.
+
+    Ontology and gene indexes are compiled once in the constructor and shared
+    by every run() call. Tool inputs may be paths, raw (optionally compressed)
+    bytes, readable buffers or DataFrames of a tool's export; nothing touches
+    the filesystem unless a path is given, a checkpoint directory is set, or
+    FusionResult.write() is called.
+    """
+
+    def __init__(
+        self,
+        min_identity: float = 0.0,
+        min_coverage: float = 0.0,
+        deduplicate: bool = True,
+        strict_validation: bool = False,
+        ontology: list[str] | OntologyIndex | None = None,
+        gene_level: str = "gene",
+        gene_aliases: str | GeneIndex | None = None,
+        checkpoint_dir: str | None = None,
+        backend: str = "pandas",
+    ):
+        if backend not in BACKENDS:
+            raise PipelineError(f"backend must be one of: {', '.join(BACKENDS)}")
+        if not 0 <= min_identity <= 100:
+            raise PipelineError("min_identity must be between 0 and 100")
+        if not 0 <= min_coverage <= 100:
+            raise PipelineError("min_coverage must be between 0 and 100")
+        if gene_level not in GENE_LEVELS:
+            raise PipelineError(f"gene_level must be one of: {', '.join(GENE_LEVELS)}")
+
+        self.min_identity = min_identity
+        self.min_coverage = min_coverage
+        self.deduplicate = deduplicate
+        self.strict_validation = strict_validation
+        self.gene_level = gene_level
+        self.checkpoint_dir = checkpoint_dir
+        self.backend = backend
+        self._backend = _backend_ops(backend)
+
+        if isinstance(ontology, OntologyIndex):
+            # keyed on content: an index rebuilt from an edited source file must not reuse old harmonize snapshots
+            self.ontology_index = ontology
+            self._ontology_key = stage_key(ontology.exact, ontology.rank, ontology.parents)
+        else:
+            self.ontology_index = compile_ontology(ontology or [])
+            self._ontology_key = [file_fingerprint(p) for p in ontology or []]
+        if isinstance(gene_aliases, GeneIndex):
+            self.gene_index, self.gene_aliases = gene_aliases, None
+            self._aliases_key = stage_key(gene_aliases.aliases, gene_aliases.families)
+        else:
+            self.gene_index = load_gene_index(gene_aliases)
+            self.gene_aliases, self._aliases_key = gene_aliases, file_fingerprint(gene_aliases)
+
+    def run(
+        self,
+        sample_id: str | None = None,
+        resfinder: InputSource | None = None,
+        amrfinder: InputSource | None = None,
+        rgi: InputSource | None = None,
+        sample_column: str | None = None,
+        inputs: list[InputSource | Detection | tuple[str, InputSource]] | None = None,
+    ) -> FusionResult:
+        """
+        Parse, filter, harmonize, score, validate and fuse one sample (or a multi-sample table).
+
+        ``inputs`` takes outputs of any registered tool: plain sources are
+        identified from their header, ``(tool, source)`` pairs are used as given.
+        """
+        if not sample_id and not sample_column:
+            raise PipelineError("Provide sample_id, or sample_column for multi-sample inputs")
+        # (tool, source, detection): a detection carries the header mapping and delimiter the parser reuses
+        sources: list[tuple[str, Any, Detection | None]] = [
+            (tool, as_input_source(src), None)
+            for tool, src in [("resfinder", resfinder), ("amrfinder", amrfinder), ("rgi", rgi)]
+            if src is not None
+        ]
+        for item in inputs or []:
+            if isinstance(item, tuple):
+                tool, src = item
+                get_parser(tool)
+                sources.append((tool, as_input_source(src), None))
+            else:
+                detection = item if isinstance(item, Detection) else detect_input(item)
+                sources.append((detection.tool, as_input_source(detection.source), detection))
+        if not sources:
+            raise PipelineError("Provide at least one input: resfinder, amrfinder, rgi, or inputs")
+
+        timer = _StageTimer()
+        cache = StageCache(self.checkpoint_dir)
+
+        # chained stage keys: a parameter change invalidates its stage and everything downstream
+        parse_key = stage_key("parse", self.backend, [[tool, _source_key(src)] for tool, src, _ in sources], sample_id, sample_column)
+        filter_key = stage_key("filter", parse_key, self.min_identity, self.min_coverage, self.deduplicate)
+        harmonize_key = stage_key("harmonize", filter_key, self._ontology_key, self._aliases_key)
+        score_key = stage_key("score", harmonize_key)
+        fuse_key = stage_key("fuse", score_key, self.gene_level)
+
+        ops = self._backend
+
+        def parsed():
+            return ops.concat([ops.parse(tool, src, sample_id, sample_column, det) for tool, src, det in sources])
+
+        parse_result: list[Any] = []
+
+        def parse_stage():
+            # shared by the filter stage and the sample list, so the inputs are parsed at most once
+            if not parse_result:
+                parse_result.append(cache.stage("parse", parse_key, timer.wrap("parse", parsed)))
+            return parse_result[0]
+
+        def filtered():
+            return cache.stage(
+                "filter",
+                filter_key,
+                timer.wrap(
+                    "filter",
+                    lambda: ops.filter(
+                        parse_stage(),
+                        self.min_identity,
+                        self.min_coverage,
+                        self.deduplicate,
+                    ),
+                ),
+            )
+
+        def harmonized():
+            return cache.stage(
+                "harmonize",
+                harmonize_key,
+                timer.wrap("harmonize", lambda: ops.harmonize(filtered(), self.ontology_index, self.gene_index)),
+            )
+
+        scored = cache.stage("score", score_key, timer.wrap("score", lambda: ops.score(harmonized())))
+        hits = timer.wrap("to_pandas", lambda: ops.to_pandas(scored))()
+        # the filters may drop every hit of a sample; its ID still comes from the parsed inputs
+        sample_ids = None
+        if sample_column is not None:
+            sample_ids = cache.stage("samples", parse_key, timer.wrap("parse", lambda: ops.sample_ids(parse_stage())))
+
+        # scoring only appends columns, so validating the scored table checks the harmonized hits
+        messages = timer.wrap("validate", lambda: validate_canonical_hits(hits, strict=self.strict_validation))()
+        if any(m.startswith("ERROR:") for m in messages):
+            raise ValidationFailed(messages)
+
+        summary = cache.stage("fuse", fuse_key, timer.wrap("fuse", lambda: ops.fuse(scored, self.gene_level)))
+        disagreements = timer.wrap("fuse", lambda: ops.disagreements(summary))()
+        gene_summary, disagreement_frame = timer.wrap(
+            "to_pandas", lambda: (ops.to_pandas(summary), ops.to_pandas(disagreements))
+        )()
+
+        run_meta = {
+            "quality_filters": {
+                "min_identity": self.min_identity,
+                "min_coverage": self.min_coverage,
+                "deduplicate": self.deduplicate,
+                "strict_validation": self.strict_validation,
+            },
+            "ontology_sources": self.ontology_index.sources,
+            "gene_level": self.gene_level,
+            "gene_aliases": self.gene_aliases,
+            "backend": self.backend,
+            "validation_messages": messages,
+            "stages": cache.report(PIPELINE_STAGES),
+        }
+        if sample_column is not None:
+            run_meta["sample_column"] = sample_column
+
+        return FusionResult(
+            sample_id=sample_id if sample_column is None else None,
+            hits=hits,
+            gene_summary=gene_summary,
+            disagreements=disagreement_frame,
+            validation_messages=messages,
+            timings=timer.timings,
+            run_meta=run_meta,
+            tables={"hits": scored, "gene_summary": summary} if ops is not _PandasBackend else None,
+            sample_ids=sample_ids,
+        )
+
+
+class _PandasBackend:
+    """Default stages on pandas DataFrames."""
+
+    @staticmethod
+    def parse(
+        tool: str, source, sample_id: str | None, sample_column: str | None, detection: Detection | None = None
+    ) -> pd.DataFrame:
+        return get_parser(tool).parse_input(source, sample_id, sample_column, detection)
+
+    @staticmethod
+    def concat(frames: list[pd.DataFrame]) -> pd.DataFrame:
+        return pd.concat(frames, ignore_index=True)
+
+    @staticmethod
+    def filter(df: pd.DataFrame, min_identity: float, min_coverage: float, deduplicate: bool) -> pd.DataFrame:
+        return normalize_and_filter_hits(df, min_identity=min_identity, min_coverage=min_coverage, deduplicate=deduplicate)
+
+    @staticmethod
+    def harmonize(df: pd.DataFrame, ontology: OntologyIndex, genes: GeneIndex) -> pd.DataFrame:
+        return canonicalize_genes(harmonize_drug_classes(df, ontology), genes)
+
+    @staticmethod
+    def score(df: pd.DataFrame) -> pd.DataFrame:
+        return score_hits(df)
+
+    @staticmethod
+    def fuse(df: pd.DataFrame, level: str) -> pd.DataFrame:
+        return build_gene_summary(df, level=level)
+
+    @staticmethod
+    def disagreements(summary: pd.DataFrame) -> pd.DataFrame:
+        return build_disagreement_table(summary)
+
+    @staticmethod
+    def to_pandas(df: pd.DataFrame) -> pd.DataFrame:
+        return df
+
+    @staticmethod
+    def sample_ids(df: pd.DataFrame) -> list[str]:
+        return [str(s) for s in df["sample_id"].unique()]
+
+
+def _backend_ops(name: str):
+    if name == "arrow":
+        require_pyarrow()
+        return ArrowBackend
+    return _PandasBackend
+
+
+class _StageTimer:
+    """Exclusive wall time per stage; lazily nested upstream stages are not double counted."""
+
+    def __init__(self):
+        self.timings: dict[str, float] = {}
+        self._nested = [0.0]
+
+    def wrap(self, name: str, fn: Callable[[], Any]) -> Callable[[], Any]:
+        def timed():
+            self._nested.append(0.0)
+            start = time.perf_counter()
+            try:
+                return fn()
+            finally:
+                elapsed = time.perf_counter() - start
+                inner = self._nested.pop()
+                self._nested[-1] += elapsed
+                self.timings[name] = round(self.timings.get(name, 0.0) + elapsed - inner, 6)
+
+        return timed
+
+
+def _source_key(source: str | bytes | pd.DataFrame) -> Any:
+    if isinstance(source, pd.DataFrame):
+        return ["frame", frame_digest(source)]
+    if isinstance(source, bytes):
+        return ["bytes", hashlib.sha256(source).hexdigest()]
+    if isinstance(source, SpooledInput):
+        return ["bytes", source.sha256]
+    return file_fingerprint(source)
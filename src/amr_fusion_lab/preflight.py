@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import csv
+import lzma
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+
+import pandas as pd
+
+from .compression import detect_compression, input_delimiter, read_head
+from .parsers import CANONICAL_COLUMNS
+from .registry import Detection, ParserRegistryError, detect_header, detect_json, registered_parsers
+
+# Only the header is needed, so a few KB per file is enough even for wide exports
+PREFLIGHT_HEAD_CHARS = 8 * 1024
+
+# Inputs checked per thread-pool task
+_BATCH = 64
+
+PREFLIGHT_COLUMNS = [
+    "sample_id",
+    "tool",
+    "path",
+    "status",
+    "size",
+    "compression",
+    "delimiter",
+    "matched",
+    "messages",
+]
+
+
+@dataclass
+class InputCheck:
+    tool: str
+    path: str
+    sample_id: str | None = None
+    size: int | None = None
+    compression: str | None = None
+    delimiter: str | None = None
+    columns: list[str] = field(default_factory=list)
+    matched: dict[str, str] = field(default_factory=dict)
+    messages: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not any(m.startswith("ERROR:") for m in self.messages)
+
+    @property
+    def status(self) -> str:
+        if not self.ok:
+            return "error"
+        return "warn" if self.messages else "ok"
+
+    def detection(self) -> Detection | None:
+        """The header detection this check made, so the parse need not read the head again."""
+        if not self.ok or self.tool == "auto":
+            return None
+        if self.delimiter == "json":
+            return Detection(self.tool, self.path, "json")
+        return Detection(self.tool, self.path, "table", tuple(self.columns), self.delimiter)
+
+
+def check_input(tool: str, path: str, sample_column: str | None = None) -> InputCheck:
+    """
+    Check one input from its first few KB: existence, size, compression, delimiter and header mapping.
+
+    With ``tool="auto"`` the tool is identified from the header and recorded on the check.
+    """
+    check = InputCheck(tool=tool, path=str(path))
+    parsers = registered_parsers()
+    if tool != "auto" and tool not in parsers:
+        check.messages.append(f"ERROR: unknown tool '{tool}'")
+        return check
+
+    p = Path(path)
+    try:
+        check.size = p.stat().st_size
+    except OSError:
+        check.messages.append("ERROR: file not found")
+        return check
+    if not p.is_file():
+        check.messages.append("ERROR: not a regular file")
+        return check
+    if check.size == 0:
+        check.messages.append("ERROR: file is empty")
+        return check
+
+    check.compression = detect_compression(p)
+    try:
+        head = read_head(p, size=PREFLIGHT_HEAD_CHARS, compression=check.compression)
+    except (OSError, EOFError, lzma.LZMAError, UnicodeDecodeError, ValueError) as e:
+        check.messages.append(f"ERROR: unreadable ({e})")
+        return check
+
+    lines = head.lstrip().splitlines()
+    if not lines:
+        check.messages.append("ERROR: no header line")
+        return check
+
+    if lines[0].startswith("{"):
+        check.delimiter = "json"
+        if tool == "auto":
+            try:
+                check.tool = detect_json(head) or tool
+            except ParserRegistryError as e:
+                check.messages.append(f"ERROR: {e}")
+            if check.tool == "auto" and check.ok:
+                check.messages.append("ERROR: could not identify the tool from the JSON document")
+        elif not parsers[tool].json_markers:
+            check.messages.append(f"ERROR: JSON input is not supported for {tool}")
+        if sample_column is not None:
+            check.messages.append("ERROR: JSON inputs hold a single sample; sample column not supported")
+        return check
+
+    check.delimiter = input_delimiter(p, lambda: lines[0])
+    check.columns = next(csv.reader([lines[0]], delimiter=check.delimiter))
+    if tool == "auto":
+        try:
+            detected = detect_header(tuple(check.columns))
+        except ParserRegistryError as e:
+            check.messages.append(f"ERROR: {e}")
+            return check
+        if detected is None:
+            check.messages.append(f"ERROR: no registered parser recognises the header: {check.columns}")
+            return check
+        check.tool = tool = detected
+    spec = parsers[tool]
+    check.matched = spec.column_map(tuple(check.columns))
+
+    if "gene" not in check.matched:
+        check.messages.append(
+            f"ERROR: no {tool} gene column (expected one of: {_expected(spec.columns, 'gene')}); header: {check.columns}"
+        )
+    for canonical in CANONICAL_COLUMNS:
+        if canonical != "gene" and canonical not in check.matched:
+            check.messages.append(f"WARN: no {canonical} column; values will be empty")
+    if sample_column is not None and sample_column not in check.columns:
+        check.messages.append(f"ERROR: sample column '{sample_column}' not in header")
+    # the whole (decompressed) file fit in the head, so a lone header line really means no rows
+    if len(head) < PREFLIGHT_HEAD_CHARS and not any(line.strip() for line in lines[1:]):
+        check.messages.append("WARN: header only, no data rows")
+    return check
+
+
+def preflight_inputs(
+    inputs: list[tuple[str | None, str, str]],
+    sample_column: str | None = None,
+    max_workers: int | None = None,
+) -> list[InputCheck]:
+    """
+    Check (sample_id, tool, path) inputs on a thread pool.
+
+    Each distinct (tool, path) is read once, so a cohort table shared by many
+    samples costs a single header read. Results keep the order of ``inputs``.
+    """
+    unique = list(dict.fromkeys((tool, str(path)) for _, tool, path in inputs))
+    if max_workers is None:
+        max_workers = min(64, (os.cpu_count() or 1) * 8)
+
+    # batches keep per-future overhead negligible next to a header read
+    batches = [unique[i : i + _BATCH] for i in range(0, len(unique), _BATCH)]
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        results = pool.map(lambda batch: [check_input(t, p, sample_column) for t, p in batch], batches)
+        checked = dict(zip(unique, (c for batch in results for c in batch)))
+    return [replace(checked[(tool, str(path))], sample_id=sid) for sid, tool, path in inputs]
+
+
+def preflight_frame(checks: list[InputCheck]) -> pd.DataFrame:
+    """One row per checked input, for CSV reports."""
+    return pd.DataFrame(
+        [
+            {
+                "sample_id": c.sample_id,
+                "tool": c.tool,
+                "path": c.path,
+                "status": c.status,
+                "size": c.size,
+                "compression": c.compression,
+                "delimiter": c.delimiter,
+                "matched": "; ".join(f"{k}<-{v}" for k, v in c.matched.items()),
+                "messages": " | ".join(c.messages),
+            }
+            for c in checks
+        ],
+        columns=PREFLIGHT_COLUMNS,
+    )
+
+
+def _expected(mapping: dict[str, str], canonical: str) -> str:
+    return ", ".join(repr(src) for src, dst in mapping.items() if dst == canonical)
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import csv
+import re
+import warnings
+from dataclasses import dataclass, field
+from functools import lru_cache
+from importlib.metadata import entry_points
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from .compression import input_delimiter, read_head
+from .parsers import (
+    ABRICATE_COLUMNS,
+    AMRFINDER_COLUMNS,
+    RESFINDER_COLUMNS,
+    RGI_COLUMNS,
+    InputSource,
+    as_input_source,
+    parse_abricate,
+    parse_amrfinder,
+    parse_resfinder,
+    parse_rgi,
+)
+
+# Entry point group third-party packages use to contribute ParserSpec objects
+ENTRY_POINT_GROUP = "amr_fusion_lab.parsers"
+
+# Decompressed characters read to identify an input; one header line (or the start of a JSON document) fits easily
+DETECT_HEAD_CHARS = 16 * 1024
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class ParserRegistryError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ParserSpec:
+    """
+    A tool parser and how to recognise its output.
+
+    ``signatures`` are alternative sets of header columns; an input matches when
+    every column of one set is present, and the most specific match wins.
+    ``json_markers`` are whitespace-free snippets, any of which identifies the
+    tool's JSON output. ``parse(source, sample_id, sample_column=None)`` returns
+    the canonical hit table; with ``hints`` it also accepts ``columns=`` and
+    ``sep=`` so a detected table is parsed with its detected column mapping and
+    delimiter instead of being sniffed again.
+    """
+
+    tool: str
+    parse: Callable[..., pd.DataFrame]
+    columns: dict[str, str] = field(default_factory=dict)
+    signatures: tuple[tuple[str, ...], ...] = ()
+    json_markers: tuple[str, ...] = ()
+    hints: bool = False
+
+    def column_map(self, header: tuple[str, ...]) -> dict[str, str]:
+        """Canonical column -> first matching header column (compiled once per distinct header)."""
+        return dict(_column_map(tuple(self.columns.items()), tuple(header)))
+
+    def parse_input(
+        self,
+        source: str | bytes | pd.DataFrame,
+        sample_id: str | None,
+        sample_column: str | None = None,
+        detection: Detection | None = None,
+    ) -> pd.DataFrame:
+        """Parse ``source``, reusing a Detection's column mapping and delimiter when the parser takes hints."""
+        if detection is not None and detection.kind == "table" and self.hints:
+            return self.parse(
+                source, sample_id, sample_column=sample_column, columns=detection.columns, sep=detection.delimiter
+            )
+        return self.parse(source, sample_id, sample_column=sample_column)
+
+    def match(self, header: tuple[str, ...]) -> int:
+        """Size of the largest signature contained in ``header`` (0 if none)."""
+        present = set(header)
+        return max((len(sig) for sig in self.signatures if present.issuperset(sig)), default=0)
+
+
+@dataclass
+class Detection:
+    tool: str
+    source: str | bytes | pd.DataFrame
+    kind: str  # 'table' or 'json'
+    header: tuple[str, ...] = ()
+    delimiter: str | None = None
+
+    @property
+    def spec(self) -> ParserSpec:
+        return get_parser(self.tool)
+
+    @property
+    def columns(self) -> dict[str, str]:
+        return self.spec.column_map(self.header) if self.kind == "table" else {}
+
+
+BUILTIN_PARSERS = (
+    ParserSpec(
+        "resfinder",
+        parse_resfinder,
+        RESFINDER_COLUMNS,
+        signatures=(("Resistance gene", "Identity", "Coverage"), ("Gene", "%Identity", "%Coverage")),
+        json_markers=('"software_name":"ResFinder"', '"seq_regions":'),
+        hints=True,
+    ),
+    ParserSpec(
+        "amrfinder",
+        parse_amrfinder,
+        AMRFINDER_COLUMNS,
+        signatures=(("Gene symbol", "% Identity to reference sequence"), ("Gene symbol", "Class", "Subclass")),
+        hints=True,
+    ),
+    ParserSpec(
+        "rgi",
+        parse_rgi,
+        RGI_COLUMNS,
+        signatures=(("Best_Hit_ARO",), ("Best Hit ARO",)),
+        json_markers=('"ARO_name":', '"ARO_accession":', '"model_type_id":'),
+        hints=True,
+    ),
+    ParserSpec(
+        "abricate",
+        parse_abricate,
+        ABRICATE_COLUMNS,
+        signatures=(("GENE", "%IDENTITY", "%COVERAGE"),),
+        hints=True,
+    ),
+)
+
+_REGISTRY: dict[str, ParserSpec] = {spec.tool: spec for spec in BUILTIN_PARSERS}
+_plugins_loaded = False
+
+
+def register_parser(spec: ParserSpec, replace: bool = False) -> None:
+    """Add a parser (e.g. from a notebook or test); registered tools can be detected and fused like the builtins."""
+    if not replace and spec.tool in _REGISTRY:
+        raise ParserRegistryError(f"A parser for '{spec.tool}' is already registered")
+    _REGISTRY[spec.tool] = spec
+
+
+def registered_parsers() -> dict[str, ParserSpec]:
+    """All parsers, with third-party entry points loaded on first use."""
+    _load_plugins()
+    return dict(_REGISTRY)
+
+
+def get_parser(tool: str) -> ParserSpec:
+    parsers = registered_parsers()
+    if tool not in parsers:
+        raise ParserRegistryError(f"Unknown tool '{tool}'. Registered parsers: {', '.join(parsers)}")
+    return parsers[tool]
+
+
+def detect_header(header: tuple[str, ...]) -> str | None:
+    """Tool whose header signature matches best, or None; equally specific matches are ambiguous."""
+    scores = {tool: spec.match(header) for tool, spec in registered_parsers().items()}
+    best = max(scores.values(), default=0)
+    if best == 0:
+        return None
+    tools = [tool for tool, score in scores.items() if score == best]
+    if len(tools) > 1:
+        raise ParserRegistryError(f"Header matches several parsers ({', '.join(tools)}): {list(header)}")
+    return tools[0]
+
+
+def detect_json(head: str) -> str | None:
+    """Tool whose JSON markers occur in the start of a JSON document, or None."""
+    compact = _WHITESPACE_RE.sub("", head)
+    tools = [tool for tool, spec in registered_parsers().items() if any(m in compact for m in spec.json_markers)]
+    if len(tools) > 1:
+        raise ParserRegistryError(f"JSON document matches several parsers ({', '.join(tools)})")
+    return tools[0] if tools else None
+
+
+def detect_input(source: InputSource) -> Detection:
+    """Identify a tool output from its header line (or the start of a JSON document) without parsing it."""
+    source = as_input_source(source)
+    if isinstance(source, pd.DataFrame):
+        header = tuple(map(str, source.columns))
+        return Detection(_require_tool(detect_header(header), header, "DataFrame"), source, "table", header)
+
+    label = "input bytes" if isinstance(source, bytes) else source
+    try:
+        head = read_head(source, size=DETECT_HEAD_CHARS)
+    except (OSError, EOFError, UnicodeDecodeError, ValueError) as e:
+        raise ParserRegistryError(f"Cannot read {label}: {e}") from e
+    text = head.lstrip()
+    if text.startswith("{"):
+        tool = detect_json(text)
+        if tool is None:
+            raise ParserRegistryError(f"{label} is not a recognised tool's JSON output")
+        return Detection(tool, source, "json")
+
+    first = text.splitlines()[0] if text else ""
+    delimiter = input_delimiter(source, lambda: first)
+    header = tuple(next(csv.reader([first], delimiter=delimiter), []))
+    return Detection(_require_tool(detect_header(header), header, label), source, "table", header, delimiter)
+
+
+def discover_inputs(paths: list[str]) -> tuple[list[Detection], list[str]]:
+    """
+    Detect the tool of each file; directories contribute their (non-hidden) files.
+
+    Returns (detections, skipped): unrecognised files inside a directory are
+    skipped, while an unrecognised file named explicitly is an error.
+    """
+    detections: list[Detection] = []
+    skipped: list[str] = []
+    for raw in paths:
+        p = Path(raw)
+        if p.is_dir():
+            for child in sorted(p.iterdir()):
+                if child.name.startswith(".") or not child.is_file():
+                    continue
+                try:
+                    detections.append(detect_input(str(child)))
+                except ParserRegistryError:
+                    skipped.append(str(child))
+        elif p.exists():
+            detections.append(detect_input(str(p)))
+        else:
+            raise ParserRegistryError(f"Input not found: {raw}")
+    return detections, skipped
+
+
+def _require_tool(tool: str | None, header: tuple[str, ...], label: str) -> str:
+    if tool is None:
+        raise ParserRegistryError(f"No registered parser recognises {label}; header: {list(header)}")
+    return tool
+
+
+@lru_cache(maxsize=256)
+def _column_map(columns: tuple[tuple[str, str], ...], header: tuple[str, ...]) -> dict[str, str]:
+    mapping = dict(columns)
+    out: dict[str, str] = {}
+    for col in header:
+        if col in mapping:
+            out.setdefault(mapping[col], col)
+    return out
+
+
+def _load_plugins() -> None:
+    global _plugins_loaded
+    if _plugins_loaded:
+        return
+    _plugins_loaded = True
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            spec = ep.load()
+            spec = spec() if not isinstance(spec, ParserSpec) and callable(spec) else spec
+            if not isinstance(spec, ParserSpec):
+                raise TypeError(f"expected a ParserSpec, got {type(spec).__name__}")
+        except Exception as e:  # a broken plugin must not take down the builtin parsers
+            warnings.warn(f"Skipping parser plugin '{ep.name}': {e}", stacklevel=2)
+            continue
+        _REGISTRY.setdefault(spec.tool, spec)
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import json
+import os
 from pathlib import Path
 from datetime import datetime, timezone
-import json
 import pandas as pd
 
+from .compression import check_output_compression, open_text_writer, output_suffix
+from .hashing import frame_digest
+from .pdf_reports import render_sample_pdf, report_section
+from .serialization import write_json, write_records
+
 
 def write_outputs(
     df: pd.DataFrame,
@@ -13,56 +19,131 @@ def write_outputs(
     gene_summary: pd.DataFrame | None = None,
     disagreements: pd.DataFrame | None = None,
     run_meta: dict | None = None,
+    json_format: str = "json",
+    json_pretty: bool = True,
+    extra_files: list[str] | None = None,
+    compression: str | None = None,
+    compression_level: int | None = None,
+    pdf: bool = True,
 ) -> None:
+    codec = check_output_compression(compression, compression_level)
+    suffix = output_suffix(codec)
     p = Path(outdir)
     p.mkdir(parents=True, exist_ok=True)
 
-    df.to_csv(p / f"{sample_id}.amr_fused.csv", index=False)
-    df.to_json(p / f"{sample_id}.amr_fused.json", orient="records", indent=2)
+    def table(frame: pd.DataFrame, stem: str) -> None:
+        with open_text_writer(p / f"{sample_id}.{stem}.csv{suffix}", codec, compression_level) as fh:
+            frame.to_csv(fh, index=False)
 
-    if gene_summary is not None:
-        gene_summary.to_csv(p / f"{sample_id}.gene_summary.csv", index=False)
-        gene_summary.to_json(p / f"{sample_id}.gene_summary.json", orient="records", indent=2)
+    def records(frame: pd.DataFrame, stem: str) -> None:
+        write_records(
+            frame,
+            p / f"{sample_id}.{stem}.{json_format}{suffix}",
+            fmt=json_format,
+            pretty=json_pretty,
+            compression=codec,
+            compression_level=compression_level,
+        )
 
-    if disagreements is not None:
-        disagreements.to_csv(p / f"{sample_id}.disagreements.csv", index=False)
+    table(df, "amr_fused")
+    records(df, "amr_fused")
 
-    summary = _markdown_summary(df, sample_id, gene_summary, disagreements)
-    (p / f"{sample_id}.report.md").write_text(summary, encoding="utf-8")
+    if gene_summary is not None:
+        table(gene_summary, "gene_summary")
+        records(gene_summary, "gene_summary")
 
-    report_html = _to_basic_html(summary)
-    (p / f"{sample_id}.report.html").write_text(report_html, encoding="utf-8")
+    if disagreements is not None:
+        table(disagreements, "disagreements")
 
-    pdf_written = _write_simple_pdf(summary, p / f"{sample_id}.report.pdf")
+    report_files = write_reports(p, sample_id, df, gene_summary, disagreements, pdf=pdf)
+    pdf_written = f"{sample_id}.report.pdf" in report_files
 
     output_files = [
-        f"{sample_id}.amr_fused.csv",
-        f"{sample_id}.amr_fused.json",
-        f"{sample_id}.gene_summary.csv",
-        f"{sample_id}.gene_summary.json",
-        f"{sample_id}.disagreements.csv",
-        f"{sample_id}.report.md",
-        f"{sample_id}.report.html",
+        f"{sample_id}.amr_fused.csv{suffix}",
+        f"{sample_id}.amr_fused.{json_format}{suffix}",
+        f"{sample_id}.gene_summary.csv{suffix}",
+        f"{sample_id}.gene_summary.{json_format}{suffix}",
+        f"{sample_id}.disagreements.csv{suffix}",
+        *report_files,
     ]
-    if pdf_written:
-        output_files.append(f"{sample_id}.report.pdf")
+    # files written alongside by the caller (e.g. Parquet tables from the arrow backend)
+    output_files.extend(extra_files or [])
 
     manifest = {
         "sample_id": sample_id,
         "generated_at_utc": datetime.now(timezone.utc).isoformat(),
         "output_files": output_files,
+        # lets `amr-fusion diff` skip samples whose results did not change
+        "content_hashes": {
+            "amr_fused": frame_digest(df),
+            "gene_summary": frame_digest(gene_summary) if gene_summary is not None else None,
+        },
         "run_meta": run_meta or {},
-        "pdf_export": "enabled" if pdf_written else "skipped_reportlab_missing",
+        # 'deferred' PDFs are rendered afterwards by the batched PDF stage or `report --pdf-only`
+        "pdf_export": "enabled" if pdf_written else ("skipped_reportlab_missing" if pdf else "deferred"),
+        "compression": {"codec": codec, "level": compression_level} if codec else None,
     }
-    (p / f"{sample_id}.run_manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    write_json(p / f"{sample_id}.run_manifest.json", manifest, pretty=True)
 
 
-def _markdown_summary(
+def record_report_files(
+    path: str | Path,
+    sample_id: str,
+    files: list[str],
+    pdf: bool = True,
+    text: bool = True,
+    manifest: dict | None = None,
+) -> None:
+    """Add re-rendered report files to a run manifest, dropping a PDF that no longer matches the text reports."""
+    path = Path(path)
+    if manifest is None:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    pdf_name = f"{sample_id}.report.pdf"
+    output_files = list(manifest.get("output_files", []))
+    if text and pdf_name not in files:
+        # an older PDF would no longer match the re-rendered text reports
+        (path.parent / pdf_name).unlink(missing_ok=True)
+        output_files = [f for f in output_files if f != pdf_name]
+        manifest["pdf_export"] = "skipped_reportlab_missing" if pdf else "deferred"
+    output_files.extend(f for f in files if f not in output_files)
+    manifest["output_files"] = output_files
+    if pdf_name in files:
+        manifest["pdf_export"] = "enabled"
+    manifest["reports_rendered_at_utc"] = datetime.now(timezone.utc).isoformat()
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    write_json(tmp, manifest, pretty=True)
+    os.replace(tmp, path)
+
+
+def write_reports(
+    outdir: str | Path,
+    sample_id: str,
+    df: pd.DataFrame,
+    gene_summary: pd.DataFrame | None = None,
+    disagreements: pd.DataFrame | None = None,
+    pdf: bool = True,
+    text: bool = True,
+) -> list[str]:
+    """Write the markdown/HTML (``text``) and, when reportlab is installed, PDF reports; returns the file names written."""
+    p = Path(outdir)
+    summary = markdown_summary(df, sample_id, gene_summary, disagreements)
+    written = []
+    if text:
+        (p / f"{sample_id}.report.md").write_text(summary, encoding="utf-8")
+        (p / f"{sample_id}.report.html").write_text(_to_basic_html(summary), encoding="utf-8")
+        written += [f"{sample_id}.report.md", f"{sample_id}.report.html"]
+    if pdf and render_sample_pdf(p / f"{sample_id}.report.pdf", report_section(sample_id, summary.splitlines(), gene_summary)):
+        written.append(f"{sample_id}.report.pdf")
+    return written
+
+
+def markdown_summary(
     df: pd.DataFrame,
     sample_id: str,
     gene_summary: pd.DataFrame | None,
     disagreements: pd.DataFrame | None,
 ) -> str:
+    """Markdown report text; only gene/confidence hits and gene/consensus_tier summary columns are read."""
     total = len(df)
     by_conf = df["confidence"].value_counts(dropna=False).to_dict() if "confidence" in df.columns else {}
     top_genes = ", ".join(df["gene"].dropna().astype(str).head(10).tolist())
@@ -105,28 +186,3 @@ def _to_basic_html(markdown_text: str) -> str:
         f"{body}"
         "</body></html>"
     )
-
-
-def _write_simple_pdf(text: str, path: Path) -> bool:
-    """Write a simple text PDF report; return False if reportlab missing."""
-    try:
-        from reportlab.lib.pagesizes import A4
-        from reportlab.pdfgen import canvas
-    except Exception:
-        return False
-
-    c = canvas.Canvas(str(path), pagesize=A4)
-    _, height = A4
-    y = height - 40
-    line_height = 14
-
-    for raw in text.splitlines():
-        line = raw[:140]
-        if y < 40:
-            c.showPage()
-            y = height - 40
-        c.drawString(40, y, line)
-        y -= line_height
-
-    c.save()
-    return True
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from .ai_summary import generate_ai_summary
+from .compression import read_output_csv
+from .pdf_reports import COHORT_TABLE_ROWS, PDF_TABLE_COLUMNS, render_cohort_pdf, report_section
+from .reporting import markdown_summary, record_report_files, write_reports
+
+# Columns the reports show; the rest of each table is skipped while parsing
+REPORT_HIT_COLUMNS = ["gene", "confidence"]
+REPORT_SUMMARY_COLUMNS = ["gene", "consensus_tier"]
+REPORT_DISAGREEMENT_COLUMNS = ["gene"]
+PDF_SUMMARY_COLUMNS = list(dict.fromkeys(REPORT_SUMMARY_COLUMNS + list(PDF_TABLE_COLUMNS)))
+
+_MANIFEST_SUFFIX = ".run_manifest.json"
+
+# Upper bound on samples handed to a worker process per task
+_MAX_BATCH = 64
+
+
+def rerender_reports(
+    results_dir: str,
+    samples: list[str] | None = None,
+    workers: int | None = None,
+    pdf: bool = True,
+    ai: dict[str, Any] | None = None,
+    text: bool = True,
+    cohort_pdf: str | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Regenerate the reports of every run under ``results_dir`` from its fused outputs.
+
+    Only run manifests and the report columns of the amr_fused / gene_summary /
+    disagreements tables are read (compressed outputs included); raw tool
+    outputs are never touched. ``ai`` holds generate_ai_summary options
+    (provider, model, api_base, api_key); AI summaries need the full tables.
+    ``text=False`` renders PDFs only, which makes this the batched PDF stage
+    for runs written with ``pdf=False``. Samples are rendered in batches on a
+    process pool, so each worker reuses its PDF styles across many samples;
+    ``cohort_pdf`` additionally combines every sample into one PDF with a table
+    of contents. Returns one {sample_id, outdir, files, error} entry per sample.
+    """
+    root = Path(results_dir)
+    if not root.is_dir():
+        raise FileNotFoundError(f"Results directory not found: {results_dir}")
+    manifests = sorted(root.rglob(f"*{_MANIFEST_SUFFIX}"))
+    if samples:
+        wanted = set(samples)
+        manifests = [m for m in manifests if m.name[: -len(_MANIFEST_SUFFIX)] in wanted]
+
+    tasks = [(str(m), pdf, text, ai, cohort_pdf is not None) for m in manifests]
+    workers = max(1, workers or os.cpu_count() or 1)
+    if workers == 1 or len(tasks) <= 1:
+        results = [_render_task(task) for task in tasks]
+    else:
+        # batches amortise inter-process overhead; several per worker keep the pool balanced
+        chunksize = max(1, min(_MAX_BATCH, len(tasks) // (workers * 4)))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_render_task, tasks, chunksize=chunksize))
+
+    sections = [r.pop("section") for r in results if "section" in r]
+    if cohort_pdf is not None:
+        Path(cohort_pdf).parent.mkdir(parents=True, exist_ok=True)
+        render_cohort_pdf(cohort_pdf, sorted((s for s in sections if s), key=lambda s: s["sample_id"]))
+    return results
+
+
+def _render_task(task: tuple[str, bool, bool, dict[str, Any] | None, bool]) -> dict[str, Any]:
+    manifest_path, pdf, text, ai, cohort = task
+    path = Path(manifest_path)
+    sample_id = path.name[: -len(_MANIFEST_SUFFIX)]
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+        sample_id = str(manifest.get("sample_id", sample_id))
+        run_dir = path.parent
+        full = ai is not None
+
+        hits = _read_output(run_dir, manifest, sample_id, "amr_fused", None if full else REPORT_HIT_COLUMNS)
+        if hits is None:
+            raise FileNotFoundError(f"No amr_fused table for {sample_id} in {run_dir}")
+        summary_columns = PDF_SUMMARY_COLUMNS if pdf or cohort else REPORT_SUMMARY_COLUMNS
+        summary = _read_output(run_dir, manifest, sample_id, "gene_summary", None if full else summary_columns)
+        disagreements = _read_output(
+            run_dir, manifest, sample_id, "disagreements", None if full else REPORT_DISAGREEMENT_COLUMNS
+        )
+
+        files = write_reports(run_dir, sample_id, hits, summary, disagreements, pdf=pdf, text=text)
+        if ai is not None:
+            generate_ai_summary(
+                sample_id=sample_id,
+                scored_df=hits,
+                gene_summary_df=summary if summary is not None else pd.DataFrame(),
+                disagreements_df=disagreements if disagreements is not None else pd.DataFrame(),
+                outdir=str(run_dir),
+                **ai,
+            )
+        record_report_files(path, sample_id, files, pdf=pdf, text=text, manifest=manifest)
+        result = {"sample_id": sample_id, "outdir": str(run_dir), "files": files, "error": None}
+        if cohort:
+            lines = markdown_summary(hits, sample_id, summary, disagreements).splitlines()
+            result["section"] = report_section(sample_id, lines, summary, max_rows=COHORT_TABLE_ROWS)
+        return result
+    except Exception as e:  # reported per sample; the remaining samples still render
+        return {"sample_id": sample_id, "outdir": str(path.parent), "files": [], "error": f"{type(e).__name__}: {e}"}
+
+
+def _read_output(run_dir: Path, manifest: dict, sample_id: str, stem: str, columns: list[str] | None) -> pd.DataFrame | None:
+    prefix = f"{sample_id}.{stem}.csv"
+    name = next((n for n in manifest.get("output_files", []) if n.startswith(prefix)), prefix)
+    path = run_dir / name
+    if not path.exists():
+        return None
+    if columns is None:
+        return read_output_csv(path)
+    return read_output_csv(path, usecols=lambda c: c in columns)
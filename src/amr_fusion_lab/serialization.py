@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+import math
+from pathlib import Path
+from typing import Any, IO
+
+import pandas as pd
+
+from .compression import open_binary_writer
+
+try:  # optional fast encoder
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+JSON_FORMATS = ("json", "ndjson")
+
+# Rows converted to Python records at a time when streaming tables
+DEFAULT_CHUNKSIZE = 50_000
+
+
+def dumps(obj: Any, pretty: bool = False) -> bytes:
+    """
+    Encode obj as UTF-8 JSON, using orjson when installed.
+
+    Both encoders give the same output: non-string keys become strings and
+    NaN/Infinity become null (JSON has no NaN).
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if pretty else 0
+        return orjson.dumps(obj, default=_default, option=option | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    try:
+        return _std_dumps(obj, pretty)
+    except ValueError:
+        # non-finite floats are rare; only then walk the object to replace them
+        return _std_dumps(_finite(obj), pretty)
+
+
+def write_json(path: str | Path, obj: Any, pretty: bool = True) -> None:
+    """Write a single JSON document (manifests, AI summaries)."""
+    Path(path).write_bytes(dumps(obj, pretty=pretty))
+
+
+def write_records(
+    df: pd.DataFrame,
+    path: str | Path,
+    fmt: str = "json",
+    pretty: bool = True,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    compression: str | None = None,
+    compression_level: int | None = None,
+) -> None:
+    """
+    Stream a table as a JSON array ('json') or line-delimited records ('ndjson').
+
+    Records are encoded chunk by chunk so the full document is never held in memory.
+    NDJSON is always compact (one record per line). With ``compression`` the
+    stream is compressed as it is written; ``path`` should carry the matching suffix.
+    """
+    if fmt not in JSON_FORMATS:
+        raise ValueError(f"Unsupported JSON format: {fmt}. Use one of: {', '.join(JSON_FORMATS)}")
+
+    with open_binary_writer(path, compression, compression_level) as fh:
+        _write_records(fh, df, fmt, pretty, chunksize)
+
+
+def _write_records(fh: IO[bytes], df: pd.DataFrame, fmt: str, pretty: bool, chunksize: int) -> None:
+    if fmt == "ndjson":
+        for records in _iter_records(df, chunksize):
+            fh.write(b"".join(dumps(r) + b"\n" for r in records))
+        return
+
+    sep = b",\n  " if pretty else b","
+    fh.write(b"[")
+    first = True
+    for records in _iter_records(df, chunksize):
+        encoded = [dumps(r, pretty=pretty) for r in records]
+        if pretty:
+            encoded = [e.replace(b"\n", b"\n  ") for e in encoded]
+        fh.write((b"\n  " if pretty else b"") if first else sep)
+        fh.write(sep.join(encoded))
+        first = False
+    fh.write(b"\n]" if pretty and not first else b"]")
+
+
+def _iter_records(df: pd.DataFrame, chunksize: int):
+    for start in range(0, len(df), max(1, chunksize)):
+        chunk = df.iloc[start : start + chunksize]
+        # missing values become JSON null, matching DataFrame.to_json
+        yield chunk.astype(object).where(chunk.notna(), None).to_dict(orient="records")
+
+
+def _std_dumps(obj: Any, pretty: bool) -> bytes:
+    text = json.dumps(
+        obj,
+        indent=2 if pretty else None,
+        separators=None if pretty else (",", ":"),
+        ensure_ascii=False,
+        default=_default,
+        allow_nan=False,
+    )
+    return text.encode("utf-8")
+
+
+def _finite(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _finite(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(v) for v in value]
+    if hasattr(value, "item") and not hasattr(value, "__len__"):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _default(value: Any) -> Any:
+    if hasattr(value, "item"):
+        return value.item()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
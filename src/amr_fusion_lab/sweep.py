@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from .fusion import GENE_LEVELS
+from .genes import canonicalize_genes
+
+SWEEP_COLUMNS = [
+    "scope",
+    "min_identity",
+    "min_coverage",
+    "hits",
+    "unique_genes",
+    "multi_tool_genes",
+    "consensus_rate",
+    "disagreements",
+]
+
+# Samples histogrammed at once; bounds the (sample, identity, coverage) count arrays
+_SCOPE_BLOCK = 2_000
+
+
+def parse_grid(spec: str) -> list[float]:
+    """Parse 'start:stop:step' (inclusive) or a comma-separated list of thresholds."""
+    spec = spec.strip()
+    if ":" in spec:
+        parts = [float(p) for p in spec.split(":")]
+        if len(parts) != 3 or parts[2] <= 0:
+            raise ValueError(f"Grid range must be start:stop:step with step > 0: {spec}")
+        start, stop, step = parts
+        values = np.arange(start, stop + step / 2, step)
+    else:
+        values = [float(p) for p in spec.split(",") if p.strip()]
+    if len(values) == 0:
+        raise ValueError(f"Empty threshold grid: {spec}")
+    return sorted({round(float(v), 6) for v in values})
+
+
+def threshold_sweep(
+    hits: pd.DataFrame,
+    identity_thresholds: list[float],
+    coverage_thresholds: list[float],
+    level: str = "gene",
+    per_sample: bool = True,
+) -> pd.DataFrame:
+    """
+    Evaluate every identity x coverage threshold pair in one pass over the hits.
+
+    Mirrors normalize_and_filter_hits (a hit passes when each metric is missing
+    or >= the threshold) and build_gene_summary grouping. Each hit is mapped to
+    the number of thresholds it clears on each axis, so it passes a whole
+    "quadrant" of the grid. A gene is present on the union of its hits'
+    quadrants (a staircase), which decomposes into signed quadrants from its
+    Pareto-optimal hits; reverse cumulative sums over a 2D histogram of those
+    corners then give counts for every grid point without re-filtering.
+    """
+    if level not in GENE_LEVELS:
+        raise ValueError(f"Unsupported gene level: {level}. Use one of: {', '.join(GENE_LEVELS)}")
+
+    ti = np.array(sorted(set(identity_thresholds)), dtype=float)
+    tc = np.array(sorted(set(coverage_thresholds)), dtype=float)
+    n_i, n_c = len(ti), len(tc)
+
+    key = GENE_LEVELS[level]
+    work = hits if key in hits.columns else canonicalize_genes(hits)
+    if work.empty:
+        return pd.DataFrame(columns=SWEEP_COLUMNS)
+
+    # number of thresholds each hit clears (missing metrics clear all of them)
+    ident = pd.to_numeric(work["identity"], errors="coerce").to_numpy(dtype=float)
+    cov = pd.to_numeric(work["coverage"], errors="coerce").to_numpy(dtype=float)
+    ai = np.where(np.isnan(ident), n_i, np.searchsorted(ti, np.nan_to_num(ident), side="right")).astype(np.int64)
+    bi = np.where(np.isnan(cov), n_c, np.searchsorted(tc, np.nan_to_num(cov), side="right")).astype(np.int64)
+
+    sample_codes, samples = pd.factorize(work["sample_id"].astype(str), sort=True)
+    tool_codes, tools = pd.factorize(work["tool"].astype(str))
+    gene_codes, genes = pd.factorize(work[key], use_na_sentinel=False)
+    pair_codes, _ = pd.factorize(sample_codes.astype(np.int64) * max(1, len(genes)) + gene_codes)
+    pair_sample = np.zeros(pair_codes.max() + 1, dtype=np.int64)
+    pair_sample[pair_codes] = sample_codes
+
+    if not per_sample:
+        sample_codes = np.zeros_like(sample_codes)
+        pair_sample = np.zeros_like(pair_sample)
+        samples = pd.Index([])
+
+    # unique genes: staircase of each (sample, gene) over all of its hits
+    gene_pts = _staircase_corners(pair_codes, ai, bi)
+    # multi-tool genes: staircase per (gene, tool), then corners reachable by two different tools
+    tool_pts = _staircase_corners(pair_codes * max(1, len(tools)) + tool_codes, ai, bi, keep_tags=(pair_codes, tool_codes))
+    _, tool_a, tool_b, _, tool_pairs, tool_ids = tool_pts
+    multi_pts = _staircase_corners(*_cross_tool_points(tool_pairs, tool_ids, tool_a, tool_b))
+
+    corners = {
+        "hits": (sample_codes, ai, bi, np.ones(len(ai), dtype=np.int64)),
+        "unique_genes": _signed(pair_sample, gene_pts),
+        "multi_tool_genes": _signed(pair_sample, multi_pts),
+    }
+
+    grid_i, grid_c = np.meshgrid(ti, tc, indexing="ij")
+    n_scopes = len(samples) if per_sample else 1
+    cohort = {name: np.zeros((n_i, n_c), dtype=np.int64) for name in corners}
+    frames = []
+    for lo in range(0, n_scopes, _SCOPE_BLOCK):
+        hi = min(n_scopes, lo + _SCOPE_BLOCK)
+        counts = {name: _grid_counts(*pts, lo, hi, n_i, n_c) for name, pts in corners.items()}
+        for name in cohort:
+            cohort[name] += counts[name].sum(axis=0)
+        if per_sample:
+            frames.append(_frame(list(samples[lo:hi]), counts, grid_i, grid_c))
+    frames.append(_frame(["cohort"], {k: v[None] for k, v in cohort.items()}, grid_i, grid_c))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _staircase_corners(groups, ai, bi, keep_tags=None):
+    """
+    Pareto corners of each group's union of quadrants.
+
+    Returns (group, a, b, b_prev[, *tags]) for every Pareto-optimal point, where
+    the union equals sum_j Q(a_j, b_j) - Q(a_j, b_prev_j).
+    """
+    groups = np.asarray(groups, dtype=np.int64)
+    if len(groups) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return (empty, empty, empty, empty) + ((empty,) * len(keep_tags) if keep_tags else ())
+
+    # one packed int64 sort key: group ascending, then a and b descending
+    a_span, b_span = int(ai.max()) + 1, int(bi.max()) + 1
+    packed = (groups * a_span + (a_span - 1 - ai)) * b_span + (b_span - 1 - bi)
+    order = np.argsort(packed)
+    g, a, b = groups[order], ai[order], bi[order]
+    start = np.r_[True, g[1:] != g[:-1]]
+
+    # group-local running max of b: offset each group above the previous one
+    span = int(b.max()) + 1
+    base = np.cumsum(start) * span
+    running = np.maximum.accumulate(base + b) - base
+    prev = np.r_[0, running[:-1]]
+    prev[start] = 0
+
+    front = b > prev
+    out = (g[front], a[front], b[front], prev[front])
+    if keep_tags:
+        out += tuple(np.asarray(t)[order][front] for t in keep_tags)
+    return out
+
+
+def _cross_tool_points(pairs, tools, a, b):
+    """Quadrant corners reachable by hits of two different tools within the same (sample, gene)."""
+    order = np.argsort(pairs * (int(tools.max()) + 1) + tools)
+    pairs, tools, a, b = pairs[order], tools[order], a[order], b[order]
+    n = len(pairs)
+    out_p, out_a, out_b = [], [], []
+    d = 1
+    while d < n:
+        same = pairs[d:] == pairs[:-d]
+        if not same.any():
+            break
+        pick = same & (tools[d:] != tools[:-d])
+        out_p.append(pairs[d:][pick])
+        out_a.append(np.minimum(a[d:], a[:-d])[pick])
+        out_b.append(np.minimum(b[d:], b[:-d])[pick])
+        d += 1
+    if not out_p:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    return np.concatenate(out_p), np.concatenate(out_a), np.concatenate(out_b)
+
+
+def _signed(pair_sample, pts):
+    g, a, b, prev = pts[:4]
+    s = pair_sample[g]
+    return (
+        np.concatenate([s, s]),
+        np.concatenate([a, a]),
+        np.concatenate([b, prev]),
+        np.concatenate([np.ones(len(g), dtype=np.int64), -np.ones(len(g), dtype=np.int64)]),
+    )
+
+
+def _grid_counts(s, a, b, w, lo: int, hi: int, n_i: int, n_c: int) -> np.ndarray:
+    """counts[s, i, c] = weighted corners (a, b) with a > i and b > c, for scopes lo..hi."""
+    mask = (s >= lo) & (s < hi)
+    flat = ((s[mask] - lo) * (n_i + 1) + a[mask]) * (n_c + 1) + b[mask]
+    size = (hi - lo) * (n_i + 1) * (n_c + 1)
+    hist = np.bincount(flat, weights=w[mask], minlength=size).reshape(hi - lo, n_i + 1, n_c + 1)
+    suffix = hist[:, ::-1, ::-1].cumsum(axis=1).cumsum(axis=2)[:, ::-1, ::-1]
+    return np.rint(suffix[:, 1:, 1:]).astype(np.int64)
+
+
+def _frame(scopes: list[str], counts: dict[str, np.ndarray], grid_i, grid_c) -> pd.DataFrame:
+    n = grid_i.size
+    h, g, m = (counts[k].reshape(len(scopes), n) for k in ("hits", "unique_genes", "multi_tool_genes"))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rate = np.where(g > 0, m / np.maximum(g, 1), np.nan)
+    return pd.DataFrame(
+        {
+            "scope": pd.Categorical(np.repeat(scopes, n)),
+            "min_identity": np.tile(grid_i.ravel(), len(scopes)),
+            "min_coverage": np.tile(grid_c.ravel(), len(scopes)),
+            "hits": h.ravel(),
+            "unique_genes": g.ravel(),
+            "multi_tool_genes": m.ravel(),
+            "consensus_rate": np.round(rate.ravel(), 4),
+            "disagreements": (g - m).ravel(),
+        }
+    )
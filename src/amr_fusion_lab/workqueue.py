@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import socket
+import threading
+import time
+import warnings
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+from uuid import uuid4
+
+from .parsers import check_sample_ids
+
+# Claim files are touched this often while a sample is being processed
+HEARTBEAT_SECONDS = 30.0
+
+# Claims not touched for this long belong to a dead worker and may be taken over
+STALE_AFTER_SECONDS = 300.0
+
+# Upper bound on the wait between queue scans while other workers hold the remaining claims
+POLL_SECONDS = 2.0
+
+
+class WorkQueueError(ValueError):
+    pass
+
+
+@dataclass
+class WorkerStats:
+    worker_id: str
+    processed: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+    reclaimed: list[str] = field(default_factory=list)
+    # samples taken over by another worker while this one processed them; their results were discarded
+    lost: list[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class SampleClaim:
+    """Exclusive claim on one sample; a background thread refreshes the claim file's mtime until release."""
+
+    def __init__(self, path: Path, token: str, heartbeat: float, reclaimed: bool = False):
+        self.path = path
+        self.token = token
+        self.heartbeat = heartbeat
+        # True when the claim was taken over from a worker that stopped heartbeating
+        self.reclaimed = reclaimed
+        # True once another worker's token replaced ours (our claim was judged stale); heartbeats then stop
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name=f"heartbeat-{path.stem}", daemon=True)
+
+    def __enter__(self) -> "SampleClaim":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    def held(self) -> bool:
+        """True while the claim file still carries this claim's token."""
+        if not self.lost and _read_token(self.path) != self.token:
+            self.lost = True
+        return not self.lost
+
+    def release(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        # never remove a claim that was taken over after this one went stale
+        if _read_token(self.path) == self.token:
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _beat(self) -> None:
+        while not self._stop.wait(self.heartbeat):
+            if _read_token(self.path) != self.token:
+                # never refresh another worker's claim; its owner keeps it alive
+                self.lost = True
+                warnings.warn(
+                    f"Claim {self.path.name} was taken over by another worker; this worker's result may be "
+                    "replaced by the new owner's",
+                    stacklevel=1,
+                )
+                return
+            try:
+                os.utime(self.path)
+            except FileNotFoundError:
+                pass
+
+
+class WorkQueue:
+    """
+    Sample queue shared by any number of workers through a directory on a shared filesystem.
+
+    Workers claim a sample by creating ``claims/<sample>`` with O_CREAT|O_EXCL,
+    keep the claim alive by touching it, and record ``done/<sample>.json`` (or
+    ``failed/``) when finished. A claim whose mtime is older than ``stale_after``
+    is taken over by renaming it aside, which only one worker can win. Results
+    are built in a private temporary directory and renamed into place, so a
+    sample processed twice (after a reclaim) still leaves one complete result.
+    Claim ages are measured against the file server's clock (a probe file in
+    the queue directory), so clock skew between nodes does not matter. A failed
+    sample is retried until its marker records ``max_attempts`` attempts.
+    """
+
+    def __init__(
+        self,
+        queue_dir: str | Path,
+        outdir: str | Path,
+        heartbeat: float = HEARTBEAT_SECONDS,
+        stale_after: float = STALE_AFTER_SECONDS,
+        max_attempts: int = 1,
+    ):
+        if heartbeat <= 0 or stale_after <= heartbeat:
+            raise WorkQueueError("stale_after must be greater than the heartbeat interval (both positive)")
+        if max_attempts < 1:
+            raise WorkQueueError("max_attempts must be at least 1")
+        self.root = Path(queue_dir)
+        self.outdir = Path(outdir)
+        self.heartbeat = heartbeat
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        for sub in ("claims", "done", "failed"):
+            (self.root / sub).mkdir(parents=True, exist_ok=True)
+        self.outdir.mkdir(parents=True, exist_ok=True)
+
+    def finished(self) -> set[str]:
+        """Samples with a done marker, or a failed marker that used up ``max_attempts``."""
+        return self._markers("done") | self._exhausted(self._markers("failed"))
+
+    def claim(self, sample_id: str, worker_id: str) -> SampleClaim | None:
+        """Claim a sample, taking over a stale claim if needed; None if another live worker holds it."""
+        path = self.root / "claims" / sample_id
+        token = f"{worker_id}:{uuid4().hex}"
+        reclaimed = False
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                previous = self._release_stale(path)
+                if previous == "live":
+                    return None
+                reclaimed = reclaimed or previous == "stale"
+                continue
+            except OSError as e:
+                raise WorkQueueError(f"Cannot claim sample {sample_id}: {e}") from e
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump({"token": token, "worker": worker_id, "claimed_at": time.time()}, fh)
+            return SampleClaim(path, token, self.heartbeat, reclaimed=reclaimed)
+        return None
+
+    def publish(self, sample_id: str, build: Callable[[Path], Any], claim: SampleClaim | None = None) -> Path | None:
+        """
+        Run ``build(tmpdir)`` and atomically move the directory it filled to OUTDIR/<sample>.
+
+        Returns None, discarding the new result, when ``claim`` was taken over
+        by another worker meanwhile; that worker's result stands.
+        """
+        final = self.outdir / sample_id
+        tmp = self.outdir / f".{sample_id}.{uuid4().hex}.partial"
+        try:
+            build(tmp)
+            if claim is not None and not claim.held():
+                return None
+            for _ in range(3):
+                try:
+                    os.rename(tmp, final)
+                    return final
+                except OSError:
+                    if not final.exists():
+                        raise
+                # an earlier attempt already published this sample: swap the new result in
+                old = self.outdir / f".{sample_id}.{uuid4().hex}.old"
+                try:
+                    os.rename(final, old)
+                except FileNotFoundError:
+                    continue
+                shutil.rmtree(old, ignore_errors=True)
+            raise WorkQueueError(f"Could not publish results for {sample_id}")
+        finally:
+            if tmp.exists():
+                shutil.rmtree(tmp, ignore_errors=True)
+
+    def mark(self, sample_id: str, state: str, info: dict[str, Any]) -> None:
+        """Record a 'done' or 'failed' marker (counting attempts); a done marker clears any earlier failure."""
+        path = self.root / state / f"{sample_id}.json"
+        if state == "failed":
+            info = {**info, "attempts": self.attempts(sample_id) + 1}
+        tmp = path.with_name(f".{path.name}.{uuid4().hex}.tmp")
+        tmp.write_text(json.dumps({"sample_id": sample_id, "finished_at": time.time(), **info}), encoding="utf-8")
+        os.replace(tmp, path)
+        if state == "done":
+            try:
+                (self.root / "failed" / f"{sample_id}.json").unlink()
+            except FileNotFoundError:
+                pass
+
+    def attempts(self, sample_id: str) -> int:
+        """Failed attempts recorded for a sample."""
+        try:
+            marker = json.loads((self.root / "failed" / f"{sample_id}.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return 0
+        # markers written before attempts were counted stand for one attempt
+        return int(marker.get("attempts", 1))
+
+    def status(self, sample_ids: list[str]) -> dict[str, int]:
+        """Counts of done / failed (attempts used up) / claimed / pending samples."""
+        done = self._markers("done")
+        failed = self._exhausted(self._markers("failed") - done)
+        claimed = {n for n in os.listdir(self.root / "claims") if not n.startswith(".")} - done - failed
+        ids = set(sample_ids)
+        return {
+            "done": len(ids & done),
+            "failed": len(ids & failed),
+            "claimed": len(ids & claimed),
+            "pending": len(ids - done - failed - claimed),
+        }
+
+    def _markers(self, state: str) -> set[str]:
+        return {
+            name[: -len(".json")]
+            for name in os.listdir(self.root / state)
+            if name.endswith(".json") and not name.startswith(".")
+        }
+
+    def _exhausted(self, failed: set[str]) -> set[str]:
+        if self.max_attempts == 1:
+            return failed
+        return {sid for sid in failed if self.attempts(sid) >= self.max_attempts}
+
+    def _server_now(self) -> float:
+        """Current time on the queue's filesystem: the mtime of a freshly touched probe file."""
+        probe = self.root / ".clock"
+        try:
+            os.utime(probe)
+        except FileNotFoundError:
+            probe.touch()
+        return probe.stat().st_mtime
+
+    def _release_stale(self, path: Path) -> str:
+        """'stale' if a dead worker's claim was removed, 'gone' if it was already released, else 'live'."""
+        try:
+            age = self._server_now() - path.stat().st_mtime
+        except FileNotFoundError:
+            return "gone"
+        if age < self.stale_after:
+            return "live"
+        aside = path.with_name(f".{path.name}.{uuid4().hex}.stale")
+        try:
+            os.rename(path, aside)
+        except FileNotFoundError:
+            return "live"  # another worker took it over first
+        # the claim was refreshed or replaced between stat() and rename(): put the live claim back
+        if self._server_now() - aside.stat().st_mtime < self.stale_after:
+            try:
+                os.link(aside, path)
+            except FileExistsError:
+                # a third worker claimed the sample meanwhile; the displaced owner notices at its next heartbeat
+                pass
+            aside.unlink()
+            return "live"
+        aside.unlink()
+        return "stale"
+
+
+def run_worker(
+    samples: list[dict[str, Any]],
+    queue: WorkQueue,
+    process: Callable[[dict[str, Any], Path], Any],
+    worker_id: str | None = None,
+    max_samples: int | None = None,
+    wait: bool = True,
+    poll_seconds: float | None = None,
+) -> WorkerStats:
+    """
+    Claim and process samples until none are left.
+
+    ``process(row, outdir)`` writes one sample's results into ``outdir``. Each
+    worker starts at a different offset of the sample list so concurrent
+    workers rarely contend for the same claim. With ``wait`` the worker keeps
+    polling while other workers hold claims, so samples of a worker that dies
+    are picked up once its claims go stale.
+    """
+    worker_id = worker_id or default_worker_id()
+    by_id = {str(row["sample_id"]): row for row in samples}
+    try:
+        check_sample_ids(by_id)
+    except ValueError as e:
+        raise WorkQueueError(str(e)) from e
+    stats = WorkerStats(worker_id=worker_id)
+    start = time.perf_counter()
+    ids = list(by_id)
+    if ids:
+        offset = zlib.crc32(worker_id.encode("utf-8")) % len(ids)
+        ids = ids[offset:] + ids[:offset]
+    poll = min(queue.heartbeat, POLL_SECONDS) if poll_seconds is None else poll_seconds
+
+    while max_samples is None or len(stats.processed) + len(stats.failed) < max_samples:
+        finished = queue.finished()
+        pending = [sid for sid in ids if sid not in finished]
+        if not pending:
+            break
+        progressed = False
+        for sid in pending:
+            if max_samples is not None and len(stats.processed) + len(stats.failed) >= max_samples:
+                break
+            # a concurrent worker may have finished it since the listing
+            if (queue.root / "done" / f"{sid}.json").exists():
+                continue
+            try:
+                claim = queue.claim(sid, worker_id)
+            except WorkQueueError as e:  # e.g. a name the filesystem rejects; the worker moves on
+                queue.mark(sid, "failed", {"worker": worker_id, "error": str(e)})
+                stats.failed.append(sid)
+                progressed = True
+                continue
+            if claim is None:
+                continue
+            progressed = True
+            if claim.reclaimed:
+                stats.reclaimed.append(sid)
+            with claim:
+                if (queue.root / "done" / f"{sid}.json").exists():
+                    continue
+                t0 = time.perf_counter()
+                try:
+                    published = queue.publish(sid, lambda tmp, row=by_id[sid]: process(row, tmp), claim=claim)
+                except Exception as e:  # recorded for the operator; other samples continue
+                    if not claim.held():
+                        stats.lost.append(sid)
+                        continue
+                    queue.mark(sid, "failed", {"worker": worker_id, "error": f"{type(e).__name__}: {e}"})
+                    stats.failed.append(sid)
+                    continue
+                if published is None or not claim.held():
+                    # the sample's new owner records its result and status
+                    warnings.warn(f"Dropped result for {sid}: its claim was taken over by another worker", stacklevel=1)
+                    stats.lost.append(sid)
+                    continue
+                queue.mark(sid, "done", {"worker": worker_id, "seconds": round(time.perf_counter() - t0, 3)})
+                stats.processed.append(sid)
+        if not progressed:
+            if not wait:
+                break
+            time.sleep(poll)
+
+    stats.seconds = round(time.perf_counter() - start, 3)
+    return stats
+
+
+def _read_token(path: Path) -> str | None:
+    try:
+        return json.loads(path.read_text(encoding="utf-8")).get("token")
+    except (OSError, ValueError):
+        return None
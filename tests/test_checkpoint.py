@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+
+from amr_fusion_lab.checkpoint import StageCache, stage_key
+from amr_fusion_lab.ontology import compile_ontology
+from amr_fusion_lab.pipeline import FusionPipeline
+
+
+def test_stage_cache_reuses_snapshot_and_skips_upstream(tmp_path):
+    calls = []
+
+    def parse():
+        calls.append("parse")
+        return pd.DataFrame({"gene": ["blaTEM-1", "tetA"], "coverage": [98.0, 65.0]})
+
+    def run(min_coverage):
+        cache = StageCache(str(tmp_path))
+        parse_key = stage_key("parse", "input-v1")
+        filter_key = stage_key("filter", parse_key, min_coverage)
+
+        def filtered():
+            df = cache.stage("parse", parse_key, parse)
+            calls.append("filter")
+            return df[df["coverage"] >= min_coverage]
+
+        out = cache.stage("filter", filter_key, filtered)
+        return out, cache.report(["parse", "filter"])
+
+    out, stages = run(70)
+    assert out["gene"].tolist() == ["blaTEM-1"]
+    assert stages == {"parse": "computed", "filter": "computed"}
+
+    out, stages = run(70)
+    assert stages == {"parse": "skipped", "filter": "reused"}
+    assert calls == ["parse", "filter"]
+
+    out, stages = run(60)
+    assert len(out) == 2
+    assert stages == {"parse": "reused", "filter": "computed"}
+    assert calls == ["parse", "filter", "filter"]
+
+
+def test_stage_cache_disabled_always_computes():
+    cache = StageCache(None)
+    df = cache.stage("parse", stage_key("parse"), lambda: pd.DataFrame({"a": [1]}))
+    assert len(df) == 1 and cache.stages == {"parse": "computed"}
+
+
+def test_prebuilt_ontology_index_keyed_on_content(tmp_path):
+    amrfinder = pd.DataFrame({"Gene symbol": ["blaKPC-2"], "Class": ["meropenem"]})
+    onto = tmp_path / "classes.tsv"
+
+    def run(synonym):
+        onto.write_text(f"canonical\tsynonym\ncarbapenem\t{synonym}\n", encoding="utf-8")
+        index = compile_ontology([str(onto)], cache_dir="")
+        result = FusionPipeline(ontology=index, checkpoint_dir=str(tmp_path / "ckpt")).run(sample_id="S1", amrfinder=amrfinder)
+        return result.hits["drug_class_normalized"].iloc[0]
+
+    assert run("meropenem") == "carbapenem"
+    # same source name, edited content: the harmonize snapshot must not be reused
+    assert run("imipenem") == "meropenem"
+
+
+def test_stage_cache_writes_arrow_tables_as_ipc(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    table = pa.table({"gene": ["blaTEM-1", "tetA"], "coverage": [98.0, 65.0]})
+    StageCache(str(tmp_path)).stage("score", stage_key("score"), lambda: table)
+    assert [p.suffix for p in tmp_path.iterdir()] == [".arrow"]
+
+    cache = StageCache(str(tmp_path))
+    reused = cache.stage("score", stage_key("score"), lambda: pytest.fail("snapshot not reused"))
+    assert reused.equals(table) and cache.stages == {"score": "reused"}
@@ -0,0 +1,95 @@
+import bz2
+import gzip
+import json
+import lzma
+
+import pandas as pd
+import pytest
+
+from amr_fusion_lab.compression import detect_compression, read_head, read_output_csv, sniff_delimiter, uncompressed_size
+from amr_fusion_lab.diff import diff_results
+from amr_fusion_lab.fusion import build_disagreement_table, build_gene_summary
+from amr_fusion_lab.parsers import parse_resfinder
+from amr_fusion_lab.reporting import write_outputs
+
+TSV = "Gene\t%Identity\t%Coverage\tPhenotype\nblaTEM-1\t99.2\t97.5\tbeta-lactam\n"
+
+
+@pytest.mark.parametrize(
+    "suffix,opener,expected",
+    [(".tsv.gz", gzip.open, "gzip"), (".tsv.bz2", bz2.open, "bz2"), (".tsv.xz", lzma.open, "xz")],
+)
+def test_parse_compressed_inputs(tmp_path, suffix, opener, expected):
+    p = tmp_path / f"resfinder{suffix}"
+    with opener(p, "wt", encoding="utf-8") as fh:
+        fh.write(TSV)
+
+    assert detect_compression(p) == expected
+    df = parse_resfinder(str(p), sample_id="S1")
+    assert df.iloc[0]["gene"] == "blaTEM-1"
+    assert df.iloc[0]["identity"] == 99.2
+
+
+def test_detect_compression_uses_magic_bytes(tmp_path):
+    p = tmp_path / "resfinder.tsv"
+    with gzip.open(p, "wt", encoding="utf-8") as fh:
+        fh.write(TSV)
+
+    assert detect_compression(p) == "gzip"
+    assert sniff_delimiter(read_head(p)) == "\t"
+    assert parse_resfinder(str(p), sample_id="S1").iloc[0]["gene"] == "blaTEM-1"
+
+
+@pytest.mark.parametrize("codec,suffix,opener", [("gzip", ".gz", gzip.open), ("xz", ".xz", lzma.open)])
+def test_write_outputs_compressed(tmp_path, codec, suffix, opener):
+    hits = pd.DataFrame(
+        [
+            {"sample_id": "S1", "tool": t, "gene": "blaTEM-1", "drug_class_normalized": "beta-lactam", "identity": 99.0, "coverage": 95.0, "confidence_score": 1.0}
+            for t in ("resfinder", "amrfinder")
+        ]
+    )
+    summary = build_gene_summary(hits)
+    write_outputs(
+        hits,
+        outdir=str(tmp_path / "new" / "S1"),
+        sample_id="S1",
+        gene_summary=summary,
+        disagreements=build_disagreement_table(summary),
+        json_format="ndjson",
+        compression=codec,
+        compression_level=1,
+    )
+    out = tmp_path / "new" / "S1"
+    manifest = json.loads((out / "S1.run_manifest.json").read_text())
+    assert f"S1.amr_fused.csv{suffix}" in manifest["output_files"]
+    assert f"S1.gene_summary.ndjson{suffix}" in manifest["output_files"]
+    assert all((out / name).exists() for name in manifest["output_files"])
+
+    assert detect_compression(out / f"S1.amr_fused.csv{suffix}") == codec
+    pd.testing.assert_frame_equal(read_output_csv(out / f"S1.amr_fused.csv{suffix}"), hits)
+    with opener(out / f"S1.amr_fused.ndjson{suffix}", "rt") as fh:
+        assert [json.loads(line)["tool"] for line in fh] == ["resfinder", "amrfinder"]
+
+    # readers elsewhere in the package follow the manifest to the compressed tables
+    write_outputs(hits.iloc[:1], outdir=str(tmp_path / "old" / "S1"), sample_id="S1", gene_summary=build_gene_summary(hits.iloc[:1]))
+    assert diff_results(str(tmp_path / "old"), str(tmp_path / "new"))["summary"]["hits"]["added"] == 1
+
+
+def test_write_outputs_zstd(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    hits = pd.DataFrame([{"sample_id": "S1", "tool": "rgi", "gene": "tetA", "drug_class_normalized": "tetracycline", "identity": 91.0, "coverage": 75.0, "confidence_score": 0.6}])
+    write_outputs(hits, outdir=str(tmp_path), sample_id="S1", gene_summary=build_gene_summary(hits), compression="zstd", compression_level=19)
+
+    path = tmp_path / "S1.amr_fused.csv.zst"
+    assert detect_compression(path) == "zstd"
+    with zstandard.ZstdDecompressor().stream_reader(path.open("rb")) as fh:
+        assert fh.read().decode("utf-8").startswith("sample_id,")
+    pd.testing.assert_frame_equal(read_output_csv(path), hits)
+
+
+def test_uncompressed_size_from_container_metadata(tmp_path):
+    data = TSV.encode("utf-8") * 50
+    (tmp_path / "a.csv.gz").write_bytes(gzip.compress(data))
+    (tmp_path / "a.csv.xz").write_bytes(lzma.compress(data))
+    assert uncompressed_size(tmp_path / "a.csv.gz") == len(data)
+    assert uncompressed_size(tmp_path / "a.csv.xz") is None
@@ -1,4 +1,4 @@
-from amr_fusion_lab.config import load_config, ConfigError
+from amr_fusion_lab.config import load_config, load_sample_sheet, ConfigError
 import pytest
 
 
@@ -14,3 +14,17 @@ def test_load_config_missing_keys(tmp_path):
     p.write_text("sample_id: S1\n", encoding="utf-8")
     with pytest.raises(ConfigError):
         load_config(str(p))
+
+
+def test_load_sample_sheet(tmp_path):
+    p = tmp_path / "samples.tsv"
+    p.write_text("sample_id\tresfinder\trgi\nS1\tS1.res.tsv\tS1.rgi.tsv\nS2\tS2.res.tsv\t\n", encoding="utf-8")
+    rows = load_sample_sheet(str(p))
+    assert rows == [
+        {"sample_id": "S1", "resfinder": "S1.res.tsv", "rgi": "S1.rgi.tsv"},
+        {"sample_id": "S2", "resfinder": "S2.res.tsv", "rgi": None},
+    ]
+
+    p.write_text("sample_id\tresfinder\nS1\ta.tsv\nS1\tb.tsv\n", encoding="utf-8")
+    with pytest.raises(ConfigError):
+        load_sample_sheet(str(p))
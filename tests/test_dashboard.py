@@ -0,0 +1,35 @@
+import pandas as pd
+
+from amr_fusion_lab.dashboard import build_cohort_dashboard
+
+
+def _write_summary(path, sample_id, rows):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame(
+        [
+            {"sample_id": sample_id, "gene": g, "tools_detected": tools, "tool_count": len(tools.split(",")), "consensus_tier": tier}
+            for g, tools, tier in rows
+        ]
+    ).to_csv(path, index=False)
+
+
+def test_dashboard_incremental_refresh(tmp_path):
+    results = tmp_path / "results"
+    _write_summary(results / "S1" / "S1.gene_summary.csv", "S1", [("blaTEM-1", "amrfinder,resfinder", "very-high"), ("tetA", "amrfinder", "moderate")])
+    _write_summary(results / "S2" / "S2.gene_summary.csv", "S2", [("blaTEM-1", "resfinder", "high")])
+
+    out = tmp_path / "dash"
+    first = build_cohort_dashboard(str(results), str(out))
+    assert first["samples"] == 2 and first["samples_read"] == 2
+    assert (out / "index.html").exists()
+    assert set(first["sections_written"]) == {"overview", "gene_prevalence", "tiers", "disagreements", "tool_rates", "samples"}
+    assert '["blaTEM-1",2,100.0]' in (out / "data" / "gene_prevalence.js").read_text(encoding="utf-8")
+
+    again = build_cohort_dashboard(str(results), str(out))
+    assert again["samples_read"] == 0 and again["sections_written"] == []
+
+    _write_summary(results / "S3" / "S3.gene_summary.csv", "S3", [("sul1", "amrfinder,rgi", "very-high")])
+    third = build_cohort_dashboard(str(results), str(out))
+    assert third["samples_read"] == 1
+    assert "disagreements" not in third["sections_written"]
+    assert "gene_prevalence" in third["sections_written"]
@@ -0,0 +1,38 @@
+import pandas as pd
+
+from amr_fusion_lab.diff import diff_results
+from amr_fusion_lab.fusion import build_gene_summary, build_disagreement_table
+from amr_fusion_lab.reporting import write_outputs
+
+
+def _hits(sample_id, rows):
+    return pd.DataFrame(
+        [
+            {"sample_id": sample_id, "tool": t, "gene": g, "drug_class_normalized": "x", "identity": i, "coverage": 95.0, "confidence_score": s, "confidence": "high"}
+            for t, g, i, s in rows
+        ]
+    )
+
+
+def _write(root, sample_id, hits):
+    g = build_gene_summary(hits)
+    write_outputs(hits, outdir=str(root / sample_id), sample_id=sample_id, gene_summary=g, disagreements=build_disagreement_table(g))
+
+
+def test_diff_reports_changes_and_skips_unchanged(tmp_path):
+    base = [("resfinder", "blaTEM-1", 99.0, 1.0), ("amrfinder", "blaTEM-1", 98.0, 1.0), ("rgi", "tetA", 91.0, 0.65)]
+    _write(tmp_path / "old", "S1", _hits("S1", base))
+    _write(tmp_path / "new", "S1", _hits("S1", base))
+    _write(tmp_path / "old", "S2", _hits("S2", base))
+    _write(tmp_path / "new", "S2", _hits("S2", base[:1] + [("rgi", "tetA", 93.0, 0.65), ("amrfinder", "tetA", 92.0, 0.65)]))
+
+    result = diff_results(str(tmp_path / "old"), str(tmp_path / "new"))
+    summary = result["summary"]
+
+    assert summary["samples"]["unchanged_skipped"] == 1
+    assert summary["samples"]["changed"] == ["S2"]
+    assert summary["hits"] == {"added": 1, "removed": 1, "changed": 1}
+
+    disagreements = result["disagreements"]
+    assert set(zip(disagreements["gene"], disagreements["change"])) == {("blaTEM-1", "entered"), ("tetA", "left")}
+    assert set(result["tiers"]["gene"]) <= {"blaTEM-1", "tetA"}
@@ -0,0 +1,36 @@
+import pandas as pd
+
+from amr_fusion_lab.fusion import build_gene_summary, build_disagreement_table
+from amr_fusion_lab.genes import canonicalize_genes, load_gene_index
+
+
+def test_canonicalize_genes_resolves_aliases_and_families(tmp_path):
+    aliases = tmp_path / "aliases.tsv"
+    aliases.write_text("alias\tcanonical\tfamily\naac(3)-IIa\taac(3)-IIa\taac(3)\n", encoding="utf-8")
+    index = load_gene_index(str(aliases))
+
+    df = pd.DataFrame(
+        {"gene": ["blaTEM-1", "blaTEM-1B", "TEM-1", "ARO:3000873|TEM-1", "qnrS1", "aac(3)-IIa", "sul1", "sul2", "mcr-1.1", None]}
+    )
+    out = canonicalize_genes(df, index)
+
+    assert out["gene_canonical"].tolist()[:4] == ["blaTEM-1", "blaTEM-1B", "blaTEM-1", "blaTEM-1"]
+    assert out["gene_family"].tolist()[:9] == ["blaTEM", "blaTEM", "blaTEM", "blaTEM", "qnrS1", "aac(3)", "sul1", "sul2", "mcr-1"]
+    assert pd.isna(out["gene_canonical"].iloc[-1])
+
+
+def test_gene_summary_family_level_merges_cross_tool_names():
+    df = pd.DataFrame(
+        [
+            {"sample_id": "S1", "tool": "resfinder", "gene": "blaTEM-1B", "drug_class_normalized": "beta-lactam", "identity": 99.0, "coverage": 98.0, "confidence_score": 1.0},
+            {"sample_id": "S1", "tool": "rgi", "gene": "TEM-1", "drug_class_normalized": "beta-lactam", "identity": 98.0, "coverage": 97.0, "confidence_score": 1.0},
+        ]
+    )
+
+    assert len(build_disagreement_table(build_gene_summary(df))) == 2
+
+    g = build_gene_summary(df, level="family")
+    assert g["gene"].tolist() == ["blaTEM"]
+    assert g.iloc[0]["tool_count"] == 2
+    assert g.iloc[0]["gene_variants"] == "TEM-1,blaTEM-1B"
+    assert build_disagreement_table(g).empty
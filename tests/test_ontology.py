@@ -1,6 +1,6 @@
 import pandas as pd
 
-from amr_fusion_lab.ontology import harmonize_drug_classes
+from amr_fusion_lab.ontology import compile_ontology, default_index, harmonize_drug_classes
 
 
 def test_harmonize_drug_classes_maps_synonyms():
@@ -19,3 +19,38 @@ def test_harmonize_drug_classes_maps_synonyms():
     assert out.loc[1, "drug_class_normalized"] == "fluoroquinolone"
     assert out.loc[2, "drug_class_normalized"] == "polymyxin"
     assert out.loc[3, "drug_class_normalized"] == "unknown class"
+
+
+def test_compile_ontology_obo_with_rollups_and_cache(tmp_path):
+    obo = tmp_path / "aro.obo"
+    obo.write_text(
+        "format-version: 1.2\n\n"
+        "[Term]\nid: ARO:3000007\nname: beta-lactam antibiotic\n\n"
+        "[Term]\nid: ARO:3000008\nname: penam\nsynonym: \"penicillin\" EXACT []\nis_a: ARO:3000007 ! beta-lactam antibiotic\n\n"
+        "[Term]\nid: ARO:3000009\nname: carbapenem\nis_a: ARO:3000007 ! beta-lactam antibiotic\n",
+        encoding="utf-8",
+    )
+    lab = tmp_path / "lab.tsv"
+    lab.write_text("canonical\tsynonym\npenam\tampicillin class\n", encoding="utf-8")
+
+    cache_dir = tmp_path / "cache"
+    index = compile_ontology([str(obo), str(lab)], cache_dir=str(cache_dir))
+    assert list(cache_dir.rglob("*.idx"))
+
+    df = pd.DataFrame([{"drug_class": "Penicillin"}, {"drug_class": "carbapenem; penam"}, {"drug_class": "ampicillin class"}])
+    out = harmonize_drug_classes(df, index)
+    assert out["drug_class_normalized"].tolist() == ["penam", "penam", "penam"]
+    assert out["drug_class_parent"].tolist() == ["beta-lactam antibiotic"] * 3
+
+    cached = compile_ontology([str(obo), str(lab)], cache_dir=str(cache_dir))
+    assert cached.exact == index.exact
+
+
+def test_normalize_matches_plurals_and_drug_names_by_substring():
+    index = default_index()
+    assert index.normalize("beta-lactams") == "beta-lactam"
+    assert index.normalize("Sulfamethoxazole") == "sulfonamide"
+    assert index.normalize("rifampicin resistance") == "rifamycin"
+    # substring and token matches are ranked together: the earliest-defined class wins
+    assert index.normalize("tetracycline; beta-lactams") == "beta-lactam"
+    assert index.normalize("fosfomycin") == "fosfomycin"
@@ -0,0 +1,52 @@
+import pandas as pd
+
+from amr_fusion_lab.fusion import build_gene_summary, build_disagreement_table
+from amr_fusion_lab.genes import canonicalize_genes, load_gene_index
+from amr_fusion_lab.outofcore import fuse_out_of_core
+
+
+def test_out_of_core_matches_in_memory(tmp_path):
+    rows = []
+    for s in range(12):
+        for g, tools in [("blaTEM-1", ["resfinder", "amrfinder"]), ("tetA", ["rgi"]), (f"gene{s % 4}", ["amrfinder"])]:
+            for t in tools:
+                rows.append({"sample_id": f"S{s}", "tool": t, "gene": g, "drug_class_normalized": "x", "identity": 90.0 + s % 7, "coverage": 80.0 + s % 5, "confidence_score": 0.5 + (s % 3) / 10, "confidence": "low"})
+    hits = pd.DataFrame(rows)
+    hits.iloc[:20].to_csv(tmp_path / "a.amr_fused.csv", index=False)
+    hits.iloc[20:].to_csv(tmp_path / "b.amr_fused.csv", index=False)
+
+    info = fuse_out_of_core([str(tmp_path)], outdir=str(tmp_path / "out"), partitions=3, chunksize=7)
+    assert info["input_rows"] == len(hits)
+
+    expected = build_gene_summary(hits)
+    got = pd.read_csv(info["gene_summary"])
+    key = ["sample_id", "gene"]
+    pd.testing.assert_frame_equal(
+        got.sort_values(key).reset_index(drop=True),
+        expected.sort_values(key).reset_index(drop=True),
+        check_dtype=False,
+    )
+    assert len(pd.read_csv(info["disagreements"])) == len(build_disagreement_table(expected))
+
+
+def test_out_of_core_recomputes_gene_keys_and_hashes_ids_stably(tmp_path):
+    rows = [
+        {"sample_id": sid, "tool": t, "gene": g, "drug_class_normalized": "x", "identity": 99.0, "coverage": 95.0, "confidence_score": 0.8}
+        for sid in ("001", "2", "S3")
+        for t, g in (("resfinder", "aadA1"), ("rgi", "aadA2"))
+    ]
+    # run outputs already carry gene keys computed without the alias file
+    hits = canonicalize_genes(pd.DataFrame(rows))
+    # numeric-looking IDs first, so the second file's chunks infer a different dtype for sample_id
+    hits.iloc[:4].to_csv(tmp_path / "a.amr_fused.csv", index=False)
+    hits.iloc[4:].to_csv(tmp_path / "b.amr_fused.csv", index=False)
+    aliases = tmp_path / "aliases.tsv"
+    aliases.write_text("alias\tcanonical\tfamily\naadA1\taadA1\taadA\naadA2\taadA2\taadA\n", encoding="utf-8")
+
+    info = fuse_out_of_core(
+        [str(tmp_path)], outdir=str(tmp_path / "out"), partitions=4, chunksize=2,
+        level="family", gene_index=load_gene_index(str(aliases)),
+    )
+    got = pd.read_csv(info["gene_summary"], dtype={"sample_id": str})
+    assert sorted(got["sample_id"]) == ["001", "2", "S3"]
+    assert set(got["gene"]) == {"aadA"} and set(got["tool_count"]) == {2}
@@ -1,4 +1,14 @@
-from amr_fusion_lab.parsers import parse_rgi
+import gc
+import gzip
+import io
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from amr_fusion_lab import jsonstream, parsers
+from amr_fusion_lab.parsers import parse_amrfinder, parse_resfinder, parse_rgi, split_by_sample
 
 
 def test_parse_rgi_smoke(tmp_path):
@@ -13,3 +23,128 @@ def test_parse_rgi_smoke(tmp_path):
     assert len(df) == 1
     assert df.iloc[0]["tool"] == "rgi"
     assert df.iloc[0]["gene"] == "blaTEM-1"
+
+
+def test_parse_amrfinder_sample_column_split(tmp_path):
+    p = tmp_path / "cohort.tsv"
+    p.write_text(
+        "Name\tGene symbol\t% Identity to reference sequence\t% Coverage of reference sequence\tClass\n"
+        "S1\tblaTEM-1\t99.0\t98.0\tbeta-lactam\n"
+        "S2\ttetA\t91.0\t75.0\ttetracycline\n"
+        "S1\tqnrS1\t93.0\t88.0\tfluoroquinolone\n",
+        encoding="utf-8",
+    )
+
+    df = parse_amrfinder(str(p), sample_column="Name")
+    assert set(df["sample_id"]) == {"S1", "S2"}
+
+    parts = split_by_sample(df)
+    assert sorted(parts) == ["S1", "S2"]
+    assert parts["S1"]["gene"].tolist() == ["blaTEM-1", "qnrS1"]
+
+
+def test_parse_rgi_json_best_hit(tmp_path, monkeypatch):
+    doc = {
+        "orf_1": {
+            "h1": {
+                "ARO_name": "TEM-1",
+                "bit_score": 500.0,
+                "perc_identity": 99.5,
+                "percentage_length_reference_sequence": 100.0,
+                "ARO_category": {
+                    "1": {"category_aro_class_name": "Drug Class", "category_aro_name": "penam"},
+                    "2": {"category_aro_class_name": "Resistance Mechanism", "category_aro_name": "inactivation"},
+                    "3": {"category_aro_class_name": "Drug Class", "category_aro_name": "cephalosporin"},
+                },
+            },
+            "h2": {"ARO_name": "TEM-2", "bit_score": 120.0, "perc_identity": 80.0},
+        },
+        "orf_2": {"h3": {"ARO_name": "tet(A)", "bit_score": 300, "perc_identity": 95.0}},
+        "_metadata": {"data_type": {"software_version": "6.0.3"}},
+    }
+    p = tmp_path / "rgi.json.gz"
+    with gzip.open(p, "wt", encoding="utf-8") as fh:
+        json.dump(doc, fh, indent=2)
+
+    # tiny refills force members to straddle buffer boundaries
+    monkeypatch.setattr(jsonstream, "_CHUNK_CHARS", 7)
+    df = parse_rgi(str(p), sample_id="S1")
+
+    assert df["gene"].tolist() == ["TEM-1", "tet(A)"]
+    assert df.iloc[0]["drug_class"] == "penam; cephalosporin"
+    assert df.iloc[0]["identity"] == 99.5 and df.iloc[0]["coverage"] == 100.0
+    assert set(df["tool"]) == {"rgi"} and set(df["sample_id"]) == {"S1"}
+
+
+def test_parse_resfinder_json_seq_regions(tmp_path):
+    doc = {
+        "type": "software_result",
+        "software_name": "ResFinder",
+        "seq_regions": {
+            "blaTEM-1B;;1;;AY458016": {
+                "name": "blaTEM-1B",
+                "identity": 100.0,
+                "coverage": 100.0,
+                "phenotypes": ["amoxicillin", "ampicillin"],
+            },
+            "tet(A);;6;;AJ517790": {"name": "tet(A)", "identity": 99.9, "coverage": 98.0, "phenotypes": ["doxycycline"]},
+        },
+        "phenotypes": {"ampicillin": {"amr_resistant": True}},
+    }
+    p = tmp_path / "resfinder_results.json"
+    p.write_text(json.dumps(doc), encoding="utf-8")
+
+    df = parse_resfinder(str(p), sample_id="S1")
+    assert df["gene"].tolist() == ["blaTEM-1B", "tet(A)"]
+    assert df.iloc[0]["drug_class"] == "amoxicillin, ampicillin"
+    assert df.iloc[1]["coverage"] == 98.0
+
+
+def test_sample_ids_must_be_safe_directory_names():
+    header = "Name\tGene symbol\t% Identity to reference sequence\t% Coverage of reference sequence\tClass\n"
+    for bad in ("../x", "a/b", "a\\b", ""):
+        with pytest.raises(ValueError, match="sample ID"):
+            parse_amrfinder((header + f"{bad}\ttetA\t91.0\t75.0\ttetracycline\n").encode(), sample_column="Name")
+    with pytest.raises(ValueError, match="Missing sample ID"):
+        parse_amrfinder((header + "S1\ttetA\t91\t75\tx\n\tsul1\t99\t99\tx\n").encode(), sample_column="Name")
+    with pytest.raises(ValueError, match="Invalid sample ID"):
+        parse_amrfinder((header + "S1\ttetA\t91\t75\tx\n").encode(), sample_id="..")
+    with pytest.raises(ValueError, match="Missing sample ID"):
+        split_by_sample(pd.DataFrame({"sample_id": ["S1", None], "gene": ["a", "b"]}))
+
+
+def test_json_stream_rejects_truncated_members_with_bounded_buffer(tmp_path, monkeypatch):
+    p = tmp_path / "truncated.json"
+    p.write_text('{"orf_1": {"h1": {"ARO_name": "TEM-1"}}, "orf_2": {"h2": {"ARO_name": "' + "x" * 5000, encoding="utf-8")
+    monkeypatch.setattr(jsonstream, "_CHUNK_CHARS", 16)
+    with pytest.raises(jsonstream.JsonStreamError, match="Malformed JSON"):
+        list(jsonstream.iter_object_items(str(p)))
+
+    monkeypatch.setattr(jsonstream, "MAX_MEMBER_CHARS", 1000)
+    items = jsonstream.iter_object_items(str(p))
+    assert next(items)[0] == "orf_1"
+    with pytest.raises(jsonstream.JsonStreamError, match="exceeds 1000 characters"):
+        next(items)
+
+
+def test_buffers_stay_streamable(tmp_path, monkeypatch):
+    table = (
+        "Gene symbol\t% Identity to reference sequence\t% Coverage of reference sequence\tClass\n"
+        + "tetA\t91.0\t75.0\ttetracycline\n" * 50
+    ).encode("utf-8")
+    path = tmp_path / "amr.tsv"
+    path.write_bytes(table)
+    with open(path, "rb") as fh:
+        assert parsers.as_input_source(fh) == str(path)
+    assert parsers.as_input_source(io.BytesIO(table)) == table
+
+    monkeypatch.setattr(parsers, "SPOOL_THRESHOLD_BYTES", 100)
+    monkeypatch.setattr(parsers, "_SPOOL_CHUNK_BYTES", 64)
+    spooled = parsers.as_input_source(io.StringIO(table.decode("utf-8")))
+    assert isinstance(spooled, parsers.SpooledInput) and open(spooled, "rb").read() == table
+    assert len(parsers.parse_amrfinder(spooled, sample_id="S1")) == 50
+
+    spool_file = str(spooled)
+    del spooled
+    gc.collect()
+    assert not os.path.exists(spool_file)
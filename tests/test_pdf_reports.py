@@ -0,0 +1,63 @@
+import json
+
+import pandas as pd
+import pytest
+
+from amr_fusion_lab.pdf_reports import render_cohort_pdf, render_sample_pdf, render_sample_pdfs, report_section
+from amr_fusion_lab.pipeline import FusionPipeline
+from amr_fusion_lab.rerender import rerender_reports
+
+pytest.importorskip("reportlab")
+
+
+def test_sample_and_cohort_pdfs(tmp_path):
+    summary = pd.DataFrame(
+        [
+            {"gene": f"gene{i}", "consensus_tier": "high", "tool_count": 2, "normalized_drug_classes": "aminoglycoside;" * 6}
+            for i in range(5)
+        ]
+    )
+    lines = ["# AMR Fusion Report - S1", "", "- Total hits: **5**", "not a bullet"]
+    section = report_section("S1", lines, summary, max_rows=3)
+    assert section["bullets"] == ["Total hits: **5**"]
+    assert len(section["rows"]) == 3 and section["total_rows"] == 5
+    assert section["rows"][0][:3] == ["gene0", "high", "2"] and section["rows"][0][3] == ""
+
+    assert render_sample_pdf(tmp_path / "S1.pdf", section)
+    assert render_cohort_pdf(tmp_path / "cohort.pdf", [section, report_section("S2", [], None)])
+    cohort = (tmp_path / "cohort.pdf").read_bytes()
+    assert cohort.startswith(b"%PDF") and b"/Outlines" in cohort
+
+    jobs = [(tmp_path / f"S{i}.pdf", report_section(f"S{i}", lines, summary)) for i in range(3)]
+    jobs.append((tmp_path / "missing" / "S9.pdf", section))
+    errors = render_sample_pdfs(jobs, workers=2)
+    assert errors[:3] == [None, None, None] and errors[3] is not None
+
+
+def test_multi_sample_run_renders_pdfs_in_batched_stage(tmp_path):
+    table = (
+        "Name\tGene symbol\t% Identity to reference sequence\t% Coverage of reference sequence\tClass\n"
+        "S1\tblaTEM-1\t99.0\t98.0\tbeta-lactam\n"
+        "S2\ttetA\t91.0\t75.0\ttetracycline\n"
+    ).encode("utf-8")
+    result = FusionPipeline().run(amrfinder=table, sample_column="Name")
+    # an older run nested in the output tree must not be re-rendered
+    old = tmp_path / "old" / "S1"
+    old.mkdir(parents=True)
+    (old / "S1.run_manifest.json").write_text('{"sample_id": "S1", "output_files": []}')
+
+    result.write(str(tmp_path))
+    for sid in ("S1", "S2"):
+        manifest = json.loads((tmp_path / sid / f"{sid}.run_manifest.json").read_text())
+        assert manifest["pdf_export"] == "enabled"
+        assert f"{sid}.report.pdf" in manifest["output_files"]
+        assert (tmp_path / sid / f"{sid}.report.pdf").read_bytes().startswith(b"%PDF")
+    assert sorted(p.name for p in old.iterdir()) == ["S1.run_manifest.json"]
+    (old / "S1.run_manifest.json").unlink()
+    old.rmdir()
+
+    (tmp_path / "S1" / "S1.report.md").unlink()
+    results = rerender_reports(str(tmp_path), workers=1, text=False, cohort_pdf=str(tmp_path / "cohort.pdf"))
+    assert all(r["files"] == [f"{r['sample_id']}.report.pdf"] and "section" not in r for r in results)
+    assert not (tmp_path / "S1" / "S1.report.md").exists()
+    assert (tmp_path / "cohort.pdf").stat().st_size > 0
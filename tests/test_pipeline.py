@@ -0,0 +1,115 @@
+import gzip
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from amr_fusion_lab.arrow_backend import split_table_by_sample
+from amr_fusion_lab.pipeline import FusionPipeline
+
+
+@pytest.fixture(params=["pandas", "arrow"])
+def backend(request):
+    if request.param == "arrow":
+        pytest.importorskip("pyarrow")
+    return request.param
+
+
+def test_pipeline_in_memory_inputs_and_optional_write(tmp_path, monkeypatch, backend):
+    monkeypatch.chdir(tmp_path)
+    amrfinder = pd.DataFrame(
+        {
+            "Gene symbol": ["blaTEM-1", "tetA"],
+            "% Identity to reference sequence": [99.0, 91.0],
+            "% Coverage of reference sequence": [98.0, 60.0],
+            "Class": ["BETA-LACTAM", "TETRACYCLINE"],
+        }
+    )
+    rgi = gzip.compress(
+        b"Best_Hit_ARO\tDrug Class\t% Identity\t% Length of Reference Sequence\n"
+        b"ARO:1|blaTEM-1\tpenam\t99.5\t100.0\n"
+    )
+
+    pipeline = FusionPipeline(min_coverage=70, backend=backend)
+    result = pipeline.run(sample_id="S1", amrfinder=amrfinder, rgi=rgi)
+
+    assert sorted(result.hits["tool"]) == ["amrfinder", "rgi"]
+    assert result.gene_summary["gene"].tolist() == ["blaTEM-1"]
+    assert result.gene_summary.iloc[0]["tool_count"] == 2
+    assert {"parse", "filter", "harmonize", "score", "fuse"} <= set(result.timings)
+    assert list(tmp_path.iterdir()) == []
+
+    # the compiled pipeline is reused across calls
+    other = pipeline.run(sample_id="S2", amrfinder=amrfinder)
+    assert other.gene_summary["sample_id"].tolist() == ["S2"]
+
+    written = result.write(str(tmp_path / "out"))
+    assert written == {"S1": str(tmp_path / "out")}
+    assert (tmp_path / "out" / "S1.gene_summary.csv").exists()
+    assert (tmp_path / "out" / "S1.gene_summary.parquet").exists() == (backend == "arrow")
+
+
+def test_pipeline_multi_sample_split(tmp_path, backend):
+    table = (
+        "Name\tGene symbol\t% Identity to reference sequence\t% Coverage of reference sequence\tClass\n"
+        "S1\tblaTEM-1\t99.0\t98.0\tbeta-lactam\n"
+        "S2\ttetA\t91.0\t75.0\ttetracycline\n"
+        "S3\tsul1\t99.0\t40.0\tsulfonamide\n"
+    ).encode("utf-8")
+
+    pipeline = FusionPipeline(min_coverage=70, backend=backend, checkpoint_dir=str(tmp_path / "ckpt"))
+    result = pipeline.run(amrfinder=table, sample_column="Name")
+    parts = result.split()
+    assert sorted(parts) == ["S1", "S2", "S3"]
+    assert parts["S2"].gene_summary["gene"].tolist() == ["tetA"]
+    # S3's only hit fails the coverage filter; it still gets (empty) outputs
+    assert parts["S3"].hits.empty and parts["S3"].gene_summary.empty
+
+    written = result.write(str(tmp_path / "out"))
+    assert written["S1"] == str(tmp_path / "out" / "S1")
+    assert (tmp_path / "out" / "S3" / "S3.run_manifest.json").exists()
+
+    # the sample list is checkpointed with the parsed inputs
+    again = pipeline.run(amrfinder=table, sample_column="Name")
+    assert again.run_meta["stages"]["score"] == "reused" and again.sample_ids == ["S1", "S2", "S3"]
+
+
+def test_arrow_backend_matches_pandas():
+    pytest.importorskip("pyarrow")
+    examples = Path(__file__).resolve().parents[1] / "examples"
+    inputs = {tool: str(examples / f"{tool}_sample.tsv") for tool in ("resfinder", "amrfinder", "rgi")}
+    for level in ("gene", "family"):
+        expected = FusionPipeline(min_coverage=70, gene_level=level).run(sample_id="S1", **inputs)
+        got = FusionPipeline(min_coverage=70, gene_level=level, backend="arrow").run(sample_id="S1", **inputs)
+        for name in ("hits", "gene_summary", "disagreements"):
+            assert getattr(got, name).to_csv(index=False) == getattr(expected, name).to_csv(index=False)
+
+
+def test_arrow_backend_canonicalizes_aliased_headers_like_pandas(tmp_path):
+    pytest.importorskip("pyarrow")
+    # a literal 'gene' column is not an AMRFinder alias; 'Gene' beats 'Gene symbol' and 'Subclass' beats 'Class'
+    path = tmp_path / "amr.tsv"
+    path.write_text(
+        "gene\tGene\tGene symbol\t% Identity to reference sequence\t% Coverage of reference sequence\tSubclass\tClass\n"
+        "x\ttetA\tignored\t91.0\t75.0\tTETRACYCLINE\tother\n",
+        encoding="utf-8",
+    )
+    for inputs in ({"amrfinder": str(path)}, {"inputs": [str(path)]}):
+        expected = FusionPipeline().run(sample_id="S1", **inputs).hits
+        got = FusionPipeline(backend="arrow").run(sample_id="S1", **inputs).hits
+        assert got.to_csv(index=False) == expected.to_csv(index=False)
+        assert got[["gene", "drug_class"]].values.tolist() == [["tetA", "TETRACYCLINE"]]
+
+
+def test_split_table_by_sample_slices_grouped_tables():
+    pa = pytest.importorskip("pyarrow")
+
+    grouped = pa.table({"sample_id": ["S2", "S2", "S1"], "gene": ["a", "b", "c"]})
+    parts = split_table_by_sample(grouped)
+    assert parts["S2"]["gene"].to_pylist() == ["a", "b"]
+    # zero-copy: the slice shares the input's buffers
+    assert parts["S2"]["gene"].chunk(0).buffers()[1].address == grouped["gene"].chunk(0).buffers()[1].address
+
+    interleaved = pa.table({"sample_id": ["S1", "S2", "S1"], "gene": ["a", "b", "c"]})
+    parts = split_table_by_sample(interleaved)
+    assert parts["S1"]["gene"].to_pylist() == ["a", "c"] and parts["S2"]["gene"].to_pylist() == ["b"]
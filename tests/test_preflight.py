@@ -0,0 +1,50 @@
+import gzip
+
+from amr_fusion_lab.preflight import check_input, preflight_frame, preflight_inputs
+
+
+def test_preflight_reports_mappings_and_problems(tmp_path):
+    good = tmp_path / "amr.tsv.gz"
+    with gzip.open(good, "wt", encoding="utf-8") as fh:
+        fh.write(
+            "Gene symbol\t% Identity to reference sequence\t% Coverage of reference sequence\tClass\n"
+            "blaTEM-1\t99.0\t98.0\tbeta-lactam\n"
+        )
+    renamed = tmp_path / "res.csv"
+    renamed.write_text("Resistance_Gene,Identity,Coverage\nblaTEM-1,99,98\n", encoding="utf-8")
+    empty = tmp_path / "rgi.tsv"
+    empty.write_text("", encoding="utf-8")
+
+    checks = preflight_inputs(
+        [
+            ("S1", "amrfinder", str(good)),
+            ("S2", "amrfinder", str(good)),
+            ("S1", "resfinder", str(renamed)),
+            ("S1", "rgi", str(empty)),
+            ("S1", "rgi", str(tmp_path / "missing.tsv")),
+        ],
+        max_workers=4,
+    )
+
+    ok, shared, bad_header, empty_check, missing = checks
+    assert ok.status == "ok" and shared.sample_id == "S2"
+    assert ok.compression == "gzip" and ok.delimiter == "\t"
+    assert ok.matched["gene"] == "Gene symbol"
+    assert ok.matched["drug_class"] == "Class"
+
+    assert bad_header.delimiter == ","
+    assert not bad_header.ok
+    assert any("gene column" in m for m in bad_header.messages)
+    assert "ERROR: file is empty" in empty_check.messages
+    assert "ERROR: file not found" in missing.messages
+
+    frame = preflight_frame(checks)
+    assert frame["status"].tolist() == ["ok", "ok", "error", "error", "error"]
+
+
+def test_check_input_sample_column(tmp_path):
+    p = tmp_path / "cohort.tsv"
+    p.write_text("Name\tGene symbol\nS1\tblaTEM-1\n", encoding="utf-8")
+
+    assert check_input("amrfinder", str(p), sample_column="Name").ok
+    assert not check_input("amrfinder", str(p), sample_column="Sample").ok
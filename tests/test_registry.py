@@ -0,0 +1,91 @@
+import dataclasses
+import gzip
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from amr_fusion_lab import registry
+from amr_fusion_lab.pipeline import FusionPipeline
+from amr_fusion_lab.preflight import check_input
+from amr_fusion_lab.registry import ParserRegistryError, ParserSpec, detect_input, discover_inputs
+
+EXAMPLES = Path(__file__).resolve().parents[1] / "examples"
+
+ABRICATE = (
+    "#FILE\tSEQUENCE\tSTART\tEND\tSTRAND\tGENE\tCOVERAGE\tCOVERAGE_MAP\tGAPS\t%COVERAGE\t%IDENTITY\tDATABASE\tACCESSION\tPRODUCT\tRESISTANCE\n"
+    "S1.fa\tc1\t1\t861\t+\tblaTEM-1\t1-861/861\t===\t0/0\t100.00\t99.88\tncbi\tAY458016\tblaTEM-1\tAMPICILLIN\n"
+)
+
+
+def test_detects_tools_from_headers_in_a_mixed_directory(tmp_path):
+    for name in ("resfinder_sample.tsv", "amrfinder_sample.tsv"):
+        (tmp_path / name.replace("_sample", "")).write_bytes((EXAMPLES / name).read_bytes())
+    with gzip.open(tmp_path / "x.out.gz", "wb") as fh:
+        fh.write((EXAMPLES / "rgi_sample.tsv").read_bytes())
+    (tmp_path / "report.tab").write_text(ABRICATE, encoding="utf-8")
+    (tmp_path / "res.json").write_text(json.dumps({"software_name": "ResFinder", "seq_regions": {}}), encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("unrelated\n", encoding="utf-8")
+
+    detections, skipped = discover_inputs([str(tmp_path)])
+    assert {Path(d.source).name: d.tool for d in detections} == {
+        "amrfinder.tsv": "amrfinder",
+        "report.tab": "abricate",
+        "res.json": "resfinder",
+        "resfinder.tsv": "resfinder",
+        "x.out.gz": "rgi",
+    }
+    assert skipped == [str(tmp_path / "notes.txt")]
+    abricate = next(d for d in detections if d.tool == "abricate")
+    assert abricate.columns == {"gene": "GENE", "coverage": "%COVERAGE", "identity": "%IDENTITY", "drug_class": "RESISTANCE"}
+    with pytest.raises(ParserRegistryError):
+        detect_input(str(tmp_path / "notes.txt"))
+
+    result = FusionPipeline().run(sample_id="S1", inputs=[str(tmp_path / "report.tab"), ("rgi", str(tmp_path / "x.out.gz"))])
+    assert set(result.hits["tool"]) == {"abricate", "rgi"}
+    assert result.gene_summary.set_index("gene").loc["blaTEM-1", "tool_count"] == 2
+
+
+def test_parsers_reuse_detected_columns_and_delimiter(tmp_path, monkeypatch):
+    path = tmp_path / "amr.txt"
+    path.write_bytes((EXAMPLES / "amrfinder_sample.tsv").read_bytes())
+    detection = detect_input(str(path))
+    assert check_input("auto", str(path)).detection() == detection
+
+    calls = []
+    spec = registry.get_parser("amrfinder")
+
+    def spy(source, sample_id=None, sample_column=None, **hints):
+        calls.append(hints)
+        return spec.parse(source, sample_id, sample_column, **hints)
+
+    monkeypatch.setattr(registry, "_REGISTRY", {**registry._REGISTRY, "amrfinder": dataclasses.replace(spec, parse=spy)})
+    hinted = FusionPipeline().run(sample_id="S1", inputs=[detection]).hits
+    assert calls == [{"columns": detection.columns, "sep": "\t"}]
+    pd.testing.assert_frame_equal(hinted, FusionPipeline().run(sample_id="S1", amrfinder=str(path)).hits)
+
+
+def test_entry_point_parsers_are_registered(monkeypatch):
+    def parse_staramr(source, sample_id=None, sample_column=None):
+        df = source.rename(columns={"Gene": "gene", "%Identity": "identity", "%Overlap": "coverage", "Predicted Phenotype": "drug_class"})
+        return df.assign(sample_id=sample_id, tool="staramr")[["gene", "drug_class", "identity", "coverage", "sample_id", "tool"]]
+
+    spec = ParserSpec("staramr", parse_staramr, {"Gene": "gene"}, signatures=(("Isolate ID", "Gene", "%Overlap"),))
+
+    class EntryPoint:
+        name = "staramr"
+
+        def load(self):
+            return lambda: spec
+
+    monkeypatch.setattr(registry, "entry_points", lambda group: [EntryPoint()] if group == registry.ENTRY_POINT_GROUP else [])
+    monkeypatch.setattr(registry, "_plugins_loaded", False)
+    monkeypatch.setattr(registry, "_REGISTRY", dict(registry._REGISTRY))
+
+    df = pd.DataFrame({"Isolate ID": ["S1"], "Gene": ["tet(A)"], "%Identity": [99.0], "%Overlap": [100.0], "Predicted Phenotype": ["tetracycline"]})
+    assert detect_input(df).tool == "staramr"
+    result = FusionPipeline().run(sample_id="S1", inputs=[df])
+    assert result.hits[["tool", "gene"]].values.tolist() == [["staramr", "tet(A)"]]
+    with pytest.raises(ParserRegistryError):
+        registry.register_parser(spec)
@@ -0,0 +1,55 @@
+import json
+
+import pandas as pd
+
+from amr_fusion_lab.fusion import build_disagreement_table, build_gene_summary
+from amr_fusion_lab.reporting import write_outputs
+from amr_fusion_lab.rerender import rerender_reports
+
+
+def _write(root, sample_id, compression=None):
+    hits = pd.DataFrame(
+        [
+            {"sample_id": sample_id, "tool": t, "gene": g, "drug_class_normalized": "x", "identity": 99.0, "coverage": 95.0, "confidence_score": s, "confidence": c}
+            for t, g, s, c in [("resfinder", "blaTEM-1", 1.0, "high"), ("amrfinder", "blaTEM-1", 1.0, "high"), ("rgi", "tetA", 0.65, "medium")]
+        ]
+    )
+    summary = build_gene_summary(hits)
+    outdir = root / sample_id
+    write_outputs(hits, outdir=str(outdir), sample_id=sample_id, gene_summary=summary, disagreements=build_disagreement_table(summary), compression=compression)
+    return outdir
+
+
+def test_rerender_matches_original_reports(tmp_path):
+    plain = _write(tmp_path, "S1")
+    packed = _write(tmp_path, "S2", compression="gzip")
+    original = (plain / "S1.report.md").read_text()
+    for path in list(plain.glob("S1.report.*")) + list(packed.glob("S2.report.*")):
+        path.unlink()
+    (tmp_path / "S3").mkdir()
+    (tmp_path / "S3" / "S3.run_manifest.json").write_text('{"sample_id": "S3", "output_files": []}')
+
+    results = {r["sample_id"]: r for r in rerender_reports(str(tmp_path), workers=1, pdf=False)}
+
+    assert (plain / "S1.report.md").read_text() == original
+    assert (packed / "S2.report.md").read_text() == original.replace("S1", "S2")
+    assert results["S2"]["files"] == ["S2.report.md", "S2.report.html"] and results["S2"]["error"] is None
+    assert "FileNotFoundError" in results["S3"]["error"]
+
+    only = rerender_reports(str(tmp_path), samples=["S1"], workers=1, pdf=False)
+    assert [r["sample_id"] for r in only] == ["S1"]
+
+
+def test_rerender_without_pdf_drops_the_stale_pdf(tmp_path):
+    outdir = _write(tmp_path, "S1")
+    manifest_path = outdir / "S1.run_manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    manifest.update(pdf_export="enabled", output_files=manifest["output_files"] + ["S1.report.pdf"])
+    manifest_path.write_text(json.dumps(manifest))
+    (outdir / "S1.report.pdf").write_bytes(b"%PDF-stale")
+
+    rerender_reports(str(tmp_path), workers=1, pdf=False)
+
+    manifest = json.loads(manifest_path.read_text())
+    assert not (outdir / "S1.report.pdf").exists()
+    assert manifest["pdf_export"] == "deferred" and "S1.report.pdf" not in manifest["output_files"]
@@ -0,0 +1,48 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from amr_fusion_lab import serialization
+from amr_fusion_lab.serialization import write_records
+
+
+def _frame():
+    return pd.DataFrame(
+        [
+            {"gene": "blaTEM-1", "identity": 99.0, "coverage": None},
+            {"gene": "tetA", "identity": float("nan"), "coverage": 75.2},
+            {"gene": "qnrS1", "identity": 93.0, "coverage": 88.0},
+        ]
+    )
+
+
+def test_write_records_ndjson_in_chunks(tmp_path):
+    p = tmp_path / "out.ndjson"
+    write_records(_frame(), p, fmt="ndjson", chunksize=2)
+
+    lines = p.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 3
+    assert json.loads(lines[1]) == {"gene": "tetA", "identity": None, "coverage": 75.2}
+
+
+def test_write_records_json_matches_pandas_records(tmp_path):
+    df = _frame()
+    expected = json.loads(df.to_json(orient="records"))
+    for pretty in (True, False):
+        p = tmp_path / f"out_{pretty}.json"
+        write_records(df, p, fmt="json", pretty=pretty, chunksize=2)
+        assert json.loads(p.read_text(encoding="utf-8")) == expected
+
+    empty = tmp_path / "empty.json"
+    write_records(df.iloc[0:0], empty, pretty=True)
+    assert json.loads(empty.read_text(encoding="utf-8")) == []
+
+
+def test_dumps_same_output_with_and_without_orjson(monkeypatch):
+    obj = {1: "a", "x": float("nan"), "y": [np.float64("inf"), np.int64(3)], "z": {2.5: None}}
+    outputs = set()
+    for encoder in {serialization.orjson, None}:
+        monkeypatch.setattr(serialization, "orjson", encoder)
+        outputs.add(serialization.dumps(obj))
+    assert outputs == {b'{"1":"a","x":null,"y":[null,3],"z":{"2.5":null}}'}
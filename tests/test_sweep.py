@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from amr_fusion_lab.fusion import build_gene_summary
+from amr_fusion_lab.quality import normalize_and_filter_hits
+from amr_fusion_lab.sweep import parse_grid, threshold_sweep
+
+
+def test_parse_grid():
+    assert parse_grid("90:100:5") == [90.0, 95.0, 100.0]
+    assert parse_grid("99,90,95") == [90.0, 95.0, 99.0]
+
+
+def test_sweep_matches_refiltering():
+    rng = np.random.default_rng(7)
+    n = 400
+    hits = pd.DataFrame(
+        {
+            "sample_id": rng.choice(["S1", "S2", "S3"], n),
+            "tool": rng.choice(["resfinder", "amrfinder", "rgi"], n),
+            "gene": rng.choice(["blaTEM-1", "tetA", "qnrS1", "sul1", "aac(3)-IIa"], n),
+            "identity": np.where(rng.random(n) < 0.1, np.nan, rng.uniform(80, 100, n).round(1)),
+            "coverage": np.where(rng.random(n) < 0.1, np.nan, rng.uniform(50, 100, n).round(1)),
+            "confidence_score": 1.0,
+            "drug_class_normalized": "x",
+        }
+    )
+    identities, coverages = [85.0, 90.0, 95.0, 99.0], [60.0, 75.0, 90.0]
+    result = threshold_sweep(hits, identities, coverages).set_index(["scope", "min_identity", "min_coverage"])
+
+    for mi in identities:
+        for mc in coverages:
+            kept = normalize_and_filter_hits(hits, min_identity=mi, min_coverage=mc, deduplicate=False)
+            g = build_gene_summary(kept)
+            for scope in ["S1", "cohort"]:
+                sub_hits = kept if scope == "cohort" else kept[kept["sample_id"] == scope]
+                sub = g if scope == "cohort" else g[g["sample_id"] == scope]
+                row = result.loc[(scope, mi, mc)]
+                assert row["hits"] == len(sub_hits)
+                assert row["unique_genes"] == len(sub)
+                assert row["multi_tool_genes"] == int((sub["tool_count"] >= 2).sum())
+                assert row["disagreements"] == int((sub["tool_count"] == 1).sum())
@@ -0,0 +1,151 @@
+import json
+import multiprocessing
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from amr_fusion_lab import workqueue
+from amr_fusion_lab.config import ConfigError, load_sample_sheet
+from amr_fusion_lab.pipeline import FusionPipeline
+from amr_fusion_lab.workqueue import WorkQueue, WorkQueueError, run_worker
+
+EXAMPLES = Path(__file__).resolve().parents[1] / "examples"
+
+
+def _samples(n):
+    return [
+        {"sample_id": f"S{i:02d}", "resfinder": str(EXAMPLES / "resfinder_sample.tsv"), "amrfinder": str(EXAMPLES / "amrfinder_sample.tsv")}
+        for i in range(n)
+    ]
+
+
+def _worker(queue_dir, outdir, worker_id, n):
+    pipeline = FusionPipeline()
+
+    def process(row, sample_outdir):
+        pipeline.run(sample_id=row["sample_id"], resfinder=row["resfinder"], amrfinder=row["amrfinder"]).write(str(sample_outdir))
+
+    stats = run_worker(_samples(n), WorkQueue(queue_dir, outdir, heartbeat=0.2, stale_after=5), process, worker_id=worker_id, poll_seconds=0.05)
+    (Path(queue_dir) / f"{worker_id}.stats.json").write_text(json.dumps(stats.processed))
+
+
+def test_workers_in_separate_processes_process_each_sample_once(tmp_path):
+    queue_dir, outdir = tmp_path / "queue", tmp_path / "results"
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_worker, args=(str(queue_dir), str(outdir), f"w{i}", 12)) for i in range(3)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=120)
+        assert p.exitcode == 0
+
+    processed = [sid for i in range(3) for sid in json.loads((queue_dir / f"w{i}.stats.json").read_text())]
+    assert sorted(processed) == [f"S{i:02d}" for i in range(12)]
+    assert sorted(os.listdir(outdir)) == sorted(processed)
+    assert all((outdir / sid / f"{sid}.run_manifest.json").exists() for sid in processed)
+    assert os.listdir(queue_dir / "claims") == []
+    assert WorkQueue(queue_dir, outdir).status(processed) == {"done": 12, "failed": 0, "claimed": 0, "pending": 0}
+
+
+def test_stale_claim_is_reclaimed_and_failures_recorded(tmp_path):
+    queue = WorkQueue(tmp_path / "queue", tmp_path / "results", heartbeat=0.1, stale_after=1)
+    dead = queue.root / "claims" / "S00"
+    dead.write_text(json.dumps({"token": "dead:1", "worker": "dead"}))
+    os.utime(dead, (time.time() - 60, time.time() - 60))
+    (queue.root / "claims" / "S01").write_text(json.dumps({"token": "live:1", "worker": "live"}))
+    assert queue.claim("S01", "w") is None
+
+    def process(row, sample_outdir):
+        if row["sample_id"] == "S02":
+            raise ValueError("broken input")
+        sample_outdir.mkdir()
+        (sample_outdir / "result.txt").write_text(row["sample_id"])
+
+    stats = run_worker(_samples(3), queue, process, worker_id="w", wait=False)
+    assert stats.processed == ["S00"] and stats.reclaimed == ["S00"] and stats.failed == ["S02"]
+    assert "broken input" in json.loads((queue.root / "failed" / "S02.json").read_text())["error"]
+    assert queue.status(["S00", "S01", "S02"]) == {"done": 1, "failed": 1, "claimed": 1, "pending": 0}
+
+    # rerunning a finished sample swaps in the new result without leaving partial directories
+    queue.publish("S00", lambda d: (d.mkdir(), (d / "result.txt").write_text("again")))
+    assert (queue.outdir / "S00" / "result.txt").read_text() == "again"
+    assert sorted(os.listdir(queue.outdir)) == ["S00"]
+
+
+def test_failed_samples_retried_up_to_max_attempts(tmp_path):
+    calls = []
+
+    def process(row, sample_outdir):
+        calls.append(row["sample_id"])
+        if len(calls) < 3:
+            raise OSError("transient NFS error")
+        sample_outdir.mkdir()
+
+    queue = WorkQueue(tmp_path / "queue", tmp_path / "results", heartbeat=0.1, stale_after=1)
+    stats = run_worker(_samples(1), queue, process, worker_id="w", wait=False)
+    assert stats.failed == ["S00"] and queue.finished() == {"S00"}
+
+    # a later run with more attempts picks the failed sample up again
+    retry = WorkQueue(tmp_path / "queue", tmp_path / "results", heartbeat=0.1, stale_after=1, max_attempts=3)
+    assert retry.status(["S00"])["pending"] == 1
+    stats = run_worker(_samples(1), retry, process, worker_id="w", wait=False)
+    assert stats.failed == ["S00"] and stats.processed == ["S00"] and calls == ["S00"] * 3
+    assert retry.status(["S00"]) == {"done": 1, "failed": 0, "claimed": 0, "pending": 0}
+
+
+def test_claim_age_uses_queue_filesystem_clock_and_lost_claims_stop_heartbeat(tmp_path, monkeypatch):
+    queue = WorkQueue(tmp_path / "queue", tmp_path / "results", heartbeat=0.05, stale_after=1)
+    (queue.root / "claims" / "S01").write_text(json.dumps({"token": "live:1", "worker": "live"}))
+    # a worker whose clock runs an hour ahead still sees the fresh claim as live
+    real_time = time.time
+    monkeypatch.setattr(time, "time", lambda: real_time() + 3600)
+    assert queue.claim("S01", "w") is None
+    monkeypatch.setattr(time, "time", real_time)
+
+    claim = queue.claim("S02", "w")
+    with pytest.warns(UserWarning, match="taken over"):
+        with claim:
+            (queue.root / "claims" / "S02").write_text(json.dumps({"token": "other:1"}))
+            time.sleep(0.3)
+    assert claim.lost
+    assert json.loads((queue.root / "claims" / "S02").read_text())["token"] == "other:1"
+
+
+def test_path_like_sample_ids_rejected_and_unclaimable_samples_fail(tmp_path, monkeypatch):
+    sheet = tmp_path / "samples.tsv"
+    sheet.write_text("sample_id\tresfinder\nplate1/S1\tr.tsv\n", encoding="utf-8")
+    with pytest.raises(ConfigError, match="Invalid sample ID 'plate1/S1'"):
+        load_sample_sheet(str(sheet))
+
+    queue = WorkQueue(tmp_path / "queue", tmp_path / "results", heartbeat=0.1, stale_after=1)
+    with pytest.raises(WorkQueueError, match="Invalid sample ID '..'"):
+        run_worker([{"sample_id": ".."}], queue, lambda row, d: d.mkdir(), worker_id="w", wait=False)
+
+    real_open = os.open
+
+    def open_claim(path, *args):
+        if Path(path).name == "S00":
+            raise PermissionError(13, "Permission denied", str(path))
+        return real_open(path, *args)
+
+    monkeypatch.setattr(workqueue.os, "open", open_claim)
+    stats = run_worker(_samples(2), queue, lambda row, d: d.mkdir(), worker_id="w", wait=False)
+    assert stats.failed == ["S00"] and stats.processed == ["S01"]
+    assert "Cannot claim sample S00" in json.loads((queue.root / "failed" / "S00.json").read_text())["error"]
+
+
+def test_result_of_a_lost_claim_is_discarded(tmp_path):
+    queue = WorkQueue(tmp_path / "queue", tmp_path / "results", heartbeat=0.1, stale_after=1)
+
+    def process(row, sample_outdir):
+        # another worker judged this claim stale and took the sample over
+        (queue.root / "claims" / row["sample_id"]).write_text(json.dumps({"token": "other:1"}))
+        sample_outdir.mkdir()
+
+    with pytest.warns(UserWarning, match="Dropped result for S00"):
+        stats = run_worker(_samples(1), queue, process, worker_id="w", wait=False)
+    assert stats.lost == ["S00"] and stats.processed == [] and stats.failed == []
+    assert os.listdir(queue.outdir) == [] and not (queue.root / "done" / "S00.json").exists()
+    assert json.loads((queue.root / "claims" / "S00").read_text())["token"] == "other:1"